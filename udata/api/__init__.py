@@ -37,12 +37,17 @@ DEFAULT_PAGE_SIZE = 50
 HEADER_API_KEY = "X-API-KEY"
 
 
-def add_pagination_arguments(parser: RequestParser, *, page_size: int = 20) -> RequestParser:
+def add_pagination_arguments(
+    parser: RequestParser, *, page_size: int = 20, cursor: bool = False
+) -> RequestParser:
     """Add the standard ``page``/``page_size`` query arguments to ``parser``.
 
     Both are validated as strictly positive integers, so an out-of-range value
     (``0`` or negative) yields a clean 400 instead of failing deeper down — e.g.
     a negative length reaching a Mongo ``$slice`` aggregation, which is a 500.
+
+    With ``cursor``, an opt-in ``cursor`` argument switches to keyset pagination
+    (see ``UDataQuerySet.paginate_cursor``).
     """
     parser.add_argument("page", type=positive, default=1, location="args", help="The page to fetch")
     parser.add_argument(
@@ -52,6 +57,17 @@ def add_pagination_arguments(parser: RequestParser, *, page_size: int = 20) -> R
         location="args",
         help="The page size to fetch",
     )
+    if cursor:
+        parser.add_argument(
+            "cursor",
+            type=str,
+            location="args",
+            help=(
+                "Use cursor pagination: pass an empty cursor for the first page "
+                "then the one from the `next_page` URL. The `page` argument is then ignored "
+                "and no total is computed."
+            ),
+        )
     return parser
 
 
@@ -124,7 +140,7 @@ class UDataApi(Api):
             if apikey:
                 from udata.core.api_token.models import ApiToken
 
-                api_token, error = ApiToken.authenticate(apikey)
+                api_token, error = ApiToken.authenticate_cached(apikey)
                 if api_token is None:
                     if error == "revoked":
                         self.abort(401, "Revoked API token")
@@ -132,7 +148,10 @@ class UDataApi(Api):
                         self.abort(401, "Expired API token")
                     self.abort(401, "Invalid API token")
 
-                if not login_user(api_token.user, False):
+                user = api_token.user
+                if user is None:
+                    self.abort(401, "Invalid API token")
+                if not login_user(user, False):
                     self.abort(401, "Inactive user")
                 api_token.update_usage(request.headers.get("User-Agent"))
             else:
@@ -77,7 +77,11 @@ class NextPageUrl(String):
             return None
         args = multi_to_dict(request.args)
         args.update(request.view_args)
-        args["page"] = obj.page + 1
+        if getattr(obj, "next_cursor", None):
+            args.pop("page", None)
+            args["cursor"] = obj.next_cursor
+        else:
+            args["page"] = obj.page + 1
         for reserved in URL_FOR_RESERVED_ARGS:
             args.pop(reserved, None)
         return url_for(request.endpoint, _external=True, **args)
@@ -6,7 +6,7 @@ class ModelApiParser:
 
     sorts = {}
 
-    def __init__(self, paginate=True):
+    def __init__(self, paginate=True, cursor=False):
         self.parser = api.parser()
         # q parameter
         self.parser.add_argument("q", type=str, location="args", help="The search query")
@@ -16,7 +16,7 @@ class ModelApiParser:
         help_msg = "The field (and direction) on which sorting apply"
         self.parser.add_argument("sort", type=str, location="args", choices=choices, help=help_msg)
         if paginate:
-            add_pagination_arguments(self.parser)
+            add_pagination_arguments(self.parser, cursor=cursor)
 
     def parse(self):
         args = self.parser.parse_args()
@@ -43,7 +43,7 @@ from flask_storage.mongo import ImageField as FlaskStorageImageField
 import udata.api.fields as custom_restx_fields
 from udata.api import add_pagination_arguments, api, base_reference
 from udata.mongo.errors import FieldValidationError
-from udata.mongo.queryset import DBPaginator, UDataQuerySet
+from udata.mongo.queryset import DBPaginator, InvalidCursor, UDataQuerySet
 
 PYTHON_TYPE_TO_RESTX_FIELD = {
     int: restx_fields.Integer,
@@ -478,7 +478,8 @@ def generate_fields(**kwargs) -> Callable:
     It will also
     - generate an API parameter parser
     - sort and filter a list of documents with the provided params using the `apply_sort_filters` helper
-    - apply a pagination with page and page size args with the `apply_pagination` helper
+    - apply a pagination with page and page size args (or an opt-in keyset `cursor`)
+      with the `apply_pagination` helper
 
     """
 
@@ -671,7 +672,7 @@ def generate_fields(**kwargs) -> Callable:
         parser: RequestParser = api.parser()
 
         if paginable:
-            add_pagination_arguments(parser)
+            add_pagination_arguments(parser, cursor=True)
 
         if sortables:
             choices: list[str] = [sortable["key"] for sortable in sortables] + [
@@ -756,11 +757,19 @@ def generate_fields(**kwargs) -> Callable:
 
             return base_query
 
-        def apply_pagination(base_query) -> DBPaginator:
+        def apply_pagination(base_query, cache_count: bool = False) -> DBPaginator:
             args = cls.__index_parser__.parse_args()
 
             if paginable:
-                base_query = base_query.paginate(args["page"], args["page_size"])
+                try:
+                    base_query = base_query.paginate(
+                        args["page"],
+                        args["page_size"],
+                        cursor=args["cursor"],
+                        cache_count=cache_count,
+                    )
+                except InvalidCursor as e:
+                    api.abort(400, str(e))
             return base_query
 
         cls.apply_sort_filters = apply_sort_filters
@@ -215,6 +215,7 @@ def register_extensions(app):
         tasks,
     )
     from udata.auth import proconnect
+    from udata.core import suggest
 
     cors.init_app(app)
     tasks.init_app(app)
@@ -226,6 +227,7 @@ def register_extensions(app):
     csrf.init_app(app)
     mail.init_app(app)
     search.init_app(app)
+    suggest.init_app(app)
     sentry.init_app(app)
     proconnect.init_app(app)
 
@@ -3,7 +3,7 @@ import copy
 import logging
 import os
 import sys
-import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from itertools import groupby
 from uuid import uuid4
 
@@ -126,17 +126,12 @@ def display_op(op):
     format_output(op["output"], success=op["success"], traceback=op.get("traceback"))
 
 
-def check_references(models_to_check=()):
-    # Cannot modify local scope from Python… :-(
-    class Log:
-        errors = []
+# Number of referenced ids checked against their collection at once
+INTEGRITY_BATCH_SIZE = 1000
 
-    def print_and_save(text: str):
-        Log.errors.append(text.strip())
-        print(text)
-
-    errors = collections.defaultdict(int)
 
+def get_references(models_to_check=()):
+    """List the references to check, grouped by model"""
     references = []
     for model in get_all_models():
         if model.__name__ == "Activity":
@@ -161,6 +156,8 @@ def check_references(models_to_check=()):
                 "repr": f"{model.__name__}.{r.name}",
                 "name": r.name,
                 "destination": r.document_type.__name__,
+                "collection": r.document_type._get_collection_name(),
+                "db_path": (r.db_field,),
                 "type": "direct",
             }
             for r in refs
@@ -178,6 +175,8 @@ def check_references(models_to_check=()):
                 "repr": f"{model.__name__}.{r.name}",
                 "name": r.name,
                 "destination": "Generic",
+                "collection": None,
+                "db_path": (r.db_field,),
                 "type": "direct",
             }
             for r in refs
@@ -196,6 +195,8 @@ def check_references(models_to_check=()):
                 "repr": f"{model.__name__}.{lr.name}",
                 "name": lr.name,
                 "destination": lr.field.document_type.__name__,
+                "collection": lr.field.document_type._get_collection_name(),
+                "db_path": (lr.db_field,),
                 "type": "list",
             }
             for lr in list_refs
@@ -219,6 +220,8 @@ def check_references(models_to_check=()):
                     "repr": f"{model.__name__}.{embed.name}__{er.name}",
                     "name": f"{embed.name}__{er.name}",
                     "destination": er.document_type.__name__,
+                    "collection": er.document_type._get_collection_name(),
+                    "db_path": (embed.db_field, er.db_field),
                     "type": "embed_list",
                 }
                 for er in embed_refs
@@ -242,6 +245,8 @@ def check_references(models_to_check=()):
                     "repr": f"{model.__name__}.{embed_field.name}__{er.name}",
                     "name": f"{embed_field.name}__{er.name}",
                     "destination": er.document_type.__name__,
+                    "collection": er.document_type._get_collection_name(),
+                    "db_path": (embed_field.db_field, er.db_field),
                     "type": "embed",
                 }
                 for er in embed_refs
@@ -265,108 +270,141 @@ def check_references(models_to_check=()):
                     "repr": f"{model.__name__}.{embed_field.name}__{lr.name}",
                     "name": f"{embed_field.name}__{lr.name}",
                     "destination": lr.field.document_type.__name__,
+                    "collection": lr.field.document_type._get_collection_name(),
+                    "db_path": (embed_field.db_field, lr.db_field),
                     "type": "embed_list_ref",
                 }
                 for lr in elists_refs
             ]
 
+    return references
+
+
+def referenced_key(reference, value):
+    """The `(collection, id)` targeted by a raw reference value"""
+    if reference["collection"] is None:
+        # GenericReferenceField values are stored as `{"_cls": ..., "_ref": DBRef}`
+        return value["_ref"].collection, value["_ref"].id
+    if isinstance(value, DBRef):
+        return reference["collection"], value.id
+    return reference["collection"], value
+
+
+def extract_references(reference, son):
+    """
+    Yield `(collection, id, location)` for each value of a reference in a raw document,
+    `location` being the reference path as displayed in the report.
+    """
+    value = son.get(reference["db_path"][0])
+    if reference["type"] == "direct":
+        if value is not None:
+            yield *referenced_key(reference, value), f"`{reference['name']}`"
+        return
+    if reference["type"] == "list":
+        for i, item in enumerate(value or []):
+            yield *referenced_key(reference, item), f"{reference['name']}[{i}]"
+        return
+    p1, p2 = reference["name"].split("__")
+    db_p2 = reference["db_path"][1]
+    if reference["type"] == "embed_list":
+        for i, sub in enumerate(value or []):
+            if isinstance(sub, dict) and sub.get(db_p2) is not None:
+                yield *referenced_key(reference, sub[db_p2]), f"{p1}[{i}].{p2}"
+    elif not isinstance(value, dict):
+        return
+    elif reference["type"] == "embed":
+        if value.get(db_p2) is not None:
+            yield *referenced_key(reference, value[db_p2]), f"{p1}.{p2}"
+    elif reference["type"] == "embed_list_ref":
+        for i, item in enumerate(value.get(db_p2) or []):
+            yield *referenced_key(reference, item), f"{p1}.{p2}[{i}]"
+
+
+def check_model_references(model, references, batch_size=INTEGRITY_BATCH_SIZE):
+    """
+    Check the references of all the documents of a model.
+
+    Documents are streamed with only their references fields and the referenced ids
+    are looked up by batches in their collections instead of being dereferenced one by one.
+    Returns the number of checked documents, the errors count by reference and the errors.
+    """
+    db = model._get_db()
+    keys = {}
+    for reference in references:
+        key = f"\t- {reference['repr']}({reference['destination']}) — {reference['type']}…"
+        keys[reference["repr"]] = key
+    errors = {key: 0 for key in keys.values()}
+    messages = []
+    pending = []
+
+    def check_pending():
+        ids_by_collection = collections.defaultdict(set)
+        for _, _, collection, ref_id, _ in pending:
+            ids_by_collection[collection].add(ref_id)
+        existing = {
+            collection: {
+                son["_id"] for son in db[collection].find({"_id": {"$in": list(ids)}}, {"_id": 1})
+            }
+            for collection, ids in ids_by_collection.items()
+        }
+        for reference, obj_id, collection, ref_id, location in pending:
+            if ref_id not in existing[collection]:
+                errors[keys[reference["repr"]]] += 1
+                messages.append(
+                    f"\t{model.__name__}#{obj_id} have a broken reference for {location}"
+                )
+        pending.clear()
+
+    projection = {reference["db_path"][0]: 1 for reference in references}
+    cursor = model._get_collection().find(model.objects._query, projection, batch_size=batch_size)
+    count = 0
+    for son in cursor:
+        count += 1
+        for reference in references:
+            if reference["type"] == "list" and reference["db_path"][0] not in son:
+                # See https://github.com/MongoEngine/mongoengine/issues/267#issuecomment-283065318
+                # Setting it explicitely to an empty list actually removes the field, it shouldn't.
+                errors[keys[reference["repr"]]] += 1
+                messages.append(
+                    f"\t{model.__name__}#{son['_id']} have a non existing field `{reference['name']}`, instead of an empty list"
+                )
+                continue
+            for collection, ref_id, location in extract_references(reference, son):
+                pending.append((reference, son["_id"], collection, ref_id, location))
+        if len(pending) >= batch_size:
+            check_pending()
+    check_pending()
+    return count, errors, messages
+
+
+def check_references(models_to_check=(), workers=4, batch_size=INTEGRITY_BATCH_SIZE):
+    references = get_references(models_to_check)
+
     print("Those references will be inspected:")
     for reference in references:
         print(f"- {reference['repr']}({reference['destination']}) — {reference['type']}")
     print("")
 
     total = 0
-    for model, model_references in groupby(references, lambda i: i["model"]):
-        model_references = list(model_references)
-        count = model.objects.count()
-        print(f"- doing {count} {model.__name__}…")
-        errors[model] = {}
-
-        qs = model.objects().no_cache().all()
-        with click.progressbar(qs, length=count) as models:
-            for obj in models:
-                for reference in model_references:
-                    key = f"\t- {reference['repr']}({reference['destination']}) — {reference['type']}…"
-                    if key not in errors[model]:
-                        errors[model][key] = 0
-
-                    try:
-                        if reference["type"] == "direct":
-                            try:
-                                _ = getattr(obj, reference["name"])
-                            except mongoengine.errors.DoesNotExist:
-                                errors[model][key] += 1
-                                print_and_save(
-                                    f"\t{model.__name__}#{obj.id} have a broken reference for `{reference['name']}`"
-                                )
-                        elif reference["type"] == "list":
-                            field_exists = (
-                                f"{reference['name']}__exists"  # Eg: "contact_points__exists"
-                            )
-                            if model.objects(id=obj.id, **{field_exists: True}).count() == 0:
-                                # See https://github.com/MongoEngine/mongoengine/issues/267#issuecomment-283065318
-                                # Setting it explicitely to an empty list actually removes the field, it shouldn't.
-                                errors[model][key] += 1
-                                print_and_save(
-                                    f"\t{model.__name__}#{obj.id} have a non existing field `{reference['name']}`, instead of an empty list"
-                                )
-                            else:
-                                attr_list = getattr(obj, reference["name"])
-                                for i, sub in enumerate(attr_list):
-                                    # If it's still an instance of DBRef it means that it failed to
-                                    # dereference the ID.
-                                    if isinstance(sub, DBRef):
-                                        errors[model][key] += 1
-                                        print_and_save(
-                                            f"\t{model.__name__}#{obj.id} have a broken reference for {reference['name']}[{i}]"
-                                        )
-                        elif reference["type"] == "embed_list":
-                            p1, p2 = reference["name"].split("__")
-                            attr_list = getattr(obj, p1, [])
-                            for i, sub in enumerate(attr_list):
-                                try:
-                                    getattr(sub, p2)
-                                except mongoengine.errors.DoesNotExist:
-                                    errors[model][key] += 1
-                                    print_and_save(
-                                        f"\t{model.__name__}#{obj.id} have a broken reference for {p1}[{i}].{p2}"
-                                    )
-                        elif reference["type"] == "embed":
-                            p1, p2 = reference["name"].split("__")
-                            sub = getattr(obj, p1)
-                            if sub is None:
-                                continue
-                            try:
-                                getattr(sub, p2)
-                            except mongoengine.errors.DoesNotExist:
-                                errors[model][key] += 1
-                                print_and_save(
-                                    f"\t{model.__name__}#{obj.id} have a broken reference for {p1}.{p2}"
-                                )
-                        elif reference["type"] == "embed_list_ref":
-                            p1, p2 = reference["name"].split("__")
-                            a = getattr(obj, p1)
-                            if a is None:
-                                continue
-                            sub = getattr(a, p2, [])
-                            for i, child in enumerate(sub):
-                                # If it's still an instance of DBRef it means that it failed to
-                                # dereference the ID.
-                                if isinstance(child, DBRef):
-                                    errors[model][key] += 1
-                                    print_and_save(
-                                        f"\t{model.__name__}#{obj.id} have a broken reference for {p1}.{p2}[{i}]"
-                                    )
-                        else:
-                            print_and_save(f"Unknown ref type {reference['type']}")
-                    except mongoengine.errors.FieldDoesNotExist:
-                        print_and_save(
-                            f"[ERROR for {model.__name__} {obj.id}] {traceback.format_exc()}"
-                        )
-
-        for key, nb_errors in errors[model].items():
-            print(f"{key}: {nb_errors}")
-            total += nb_errors
+    all_errors = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                check_model_references, model, list(model_references), batch_size
+            ): model
+            for model, model_references in groupby(references, lambda i: i["model"])
+        }
+        # Results are reported model by model as soon as they are checked
+        for future in as_completed(futures):
+            model = futures[future]
+            count, errors, messages = future.result()
+            print(f"- doing {count} {model.__name__}…")
+            for message in messages:
+                print(message)
+            all_errors += [message.strip() for message in messages]
+            for key, nb_errors in errors.items():
+                print(f"{key}: {nb_errors}")
+                total += nb_errors
 
     print(f"\n Total errors: {total}")
 
@@ -375,7 +413,7 @@ def check_references(models_to_check=()):
             import sentry_sdk
 
             with sentry_sdk.push_scope() as scope:
-                scope.set_extra("errors", Log.errors)
+                scope.set_extra("errors", all_errors)
                 sentry_sdk.capture_message(f"{total} integrity errors", "fatal")
         except ImportError:
             print("`sentry_sdk` not installed. The errors weren't reported")
@@ -384,9 +422,10 @@ def check_references(models_to_check=()):
 
 @grp.command()
 @click.option("--models", multiple=True, default=[], help="Model(s) to check")
-def check_integrity(models):
+@click.option("-w", "--workers", default=4, type=int, help="Number of models checked in parallel")
+def check_integrity(models, workers):
     """Check the integrity of the database from a business perspective"""
-    check_references(models)
+    check_references(models, workers=workers)
 
 
 @grp.command()
@@ -1,6 +1,10 @@
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import UTC, datetime
+from functools import cache
 
+import bson
 from blinker import Signal
 from flask import g
 from mongoengine.base import TopLevelDocumentMetaclass
@@ -24,6 +28,8 @@ log = logging.getLogger(__name__)
 
 _registered_activities = {}
 
+_auditing_suspended = ContextVar("auditing_suspended", default=False)
+
 
 class EmitNewActivityMetaClass(TopLevelDocumentMetaclass):
     """Ensure any child class dispatches the on_new signal"""
@@ -93,49 +99,141 @@ class Activity(Document, metaclass=EmitNewActivityMetaClass):
         )
 
 
+@contextmanager
+def auditing_suspended():
+    """
+    Skip the auditing of the documents saved within this context.
+
+    Previous values are neither captured nor compared and `on_update` is not sent,
+    so importers saving documents in bulk must update the related metrics themselves.
+    """
+    token = _auditing_suspended.set(True)
+    try:
+        yield
+    finally:
+        _auditing_suspended.reset(token)
+
+
+@cache
+def get_auditable_fields(cls):
+    """The auditable fields of a class, `None` meaning all of them"""
+    try:
+        return {key for key, field, info in get_fields(cls) if info.get("auditable", True)}
+    except Exception:
+        # for backward compatibility, all fields are treated as auditable for classes not using field() function
+        return None
+
+
 class Auditable(object):
+    @classmethod
+    def _from_son(cls, son, *args, **kwargs):
+        document = super()._from_son(son, *args, **kwargs)
+        # Keep the stored state to know the previous values of the fields changed later
+        document._stored_son = son
+        return document
+
+    def _forget_stored_state(self):
+        """Drop the stored state after a write made outside `save`, it will be fetched if needed"""
+        self._stored_son = None
+
+    def reload(self, *fields, **kwargs):
+        document = super().reload(*fields, **kwargs)
+        self._forget_stored_state()
+        return document
+
+    def update(self, **kwargs):
+        result = super().update(**kwargs)
+        self._forget_stored_state()
+        return result
+
+    def modify(self, query=None, **update):
+        result = super().modify(query, **update)
+        self._forget_stored_state()
+        return result
+
+    def _get_stored_document(self, db_fields):
+        """
+        The stored version of this document, restricted to some root fields.
+
+        It is built from the stored state kept when the document was loaded or last saved,
+        and only fetched when this state is missing some of the fields.
+        """
+        son = getattr(self, "_stored_son", None)
+        if son is not None and all(db_field in son for db_field in db_fields):
+            return self._from_son(
+                {key: son[key] for key in ("_id", "_cls", *db_fields) if key in son}
+            )
+        # `only` does not support having nested list as expressed in changed fields, ex resources.0.title
+        # thus we only strip to direct attributes for simplicity
+        try:
+            return self.__class__.objects.only(*db_fields).get(pk=self.pk)
+        except DoesNotExist:
+            return None
+
+    def _store_saved_state(self, db_fields):
+        """
+        Update the stored state of some root fields with their saved values.
+
+        Values are round-tripped through BSON so that they are the ones a reload would give.
+        Returns a document holding these values.
+        """
+        codec_options = self._get_collection().codec_options
+        fields = [self._reverse_db_field_map.get(db_field, db_field) for db_field in db_fields]
+        values = self.to_mongo(fields=fields)
+        saved = bson.decode(bson.encode(values, codec_options=codec_options), codec_options)
+        son = getattr(self, "_stored_son", None)
+        if son is None:
+            son = self._stored_son = {"_id": self.pk}
+        for db_field in db_fields:
+            if db_field in saved:
+                son[db_field] = saved[db_field]
+            else:
+                son.pop(db_field, None)
+        return self._from_son(saved)
+
     def clean(self, **kwargs):
         super().clean()
         """
-        Fetch original document changed fields values before the new one erase it.
+        Capture original document changed fields values before the new one erase it.
         """
+        if _auditing_suspended.get():
+            return
         changed_fields = self._get_changed_fields()
         if changed_fields:
-            try:
-                # `only` does not support having nested list as expressed in changed fields, ex resources.0.title
-                # thus we only strip to direct attributes for simplicity
-                direct_attributes = set(field.split(".")[0] for field in changed_fields)
-                old_document = self.__class__.objects.only(*direct_attributes).get(pk=self.pk)
+            old_document = self._get_stored_document(
+                {field.split(".")[0] for field in changed_fields}
+            )
+            if old_document is not None:
                 self._previous_changed_fields = {}
                 for field_path in changed_fields:
                     field_value = get_field_value_from_path(old_document, field_path)
                     self._previous_changed_fields[field_path] = field_value
-            except DoesNotExist:
-                pass
 
     @classmethod
     def post_save(cls, sender, document, **kwargs):
-        try:
-            auditable_fields = [
-                key for key, field, info in get_fields(cls) if info.get("auditable", True)
+        changed_fields = document._get_changed_fields()
+        saved_document = None
+        if _auditing_suspended.get():
+            # The stored state is not maintained anymore, it will be fetched if needed
+            document._stored_son = None
+        elif changed_fields and not kwargs.get("created"):
+            saved_document = document._store_saved_state(
+                {field.split(".")[0] for field in changed_fields}
+            )
+        auditable_fields = get_auditable_fields(cls)
+        if auditable_fields is not None:
+            changed_fields = [
+                field for field in changed_fields if field.split(".")[0] in auditable_fields
             ]
-        except Exception:
-            # for backward compatibility, all fields are treated as auditable for classes not using field() function
-            auditable_fields = document._get_changed_fields()
-        changed_fields = [
-            field
-            for field in document._get_changed_fields()
-            if field.split(".")[0] in auditable_fields
-        ]
         if "post_save" in kwargs.get("ignores", []):
             return
         cls.after_save.send(document)
         if kwargs.get("created"):
             cls.on_create.send(document)
-        elif len(changed_fields):
+        elif len(changed_fields) and saved_document is not None:
             previous = getattr(document, "_previous_changed_fields", {})
             # Filter changed_fields since mongoengine raises some false positive occurences
-            changed_fields = filter_changed_fields(document, previous, changed_fields)
+            changed_fields = filter_changed_fields(saved_document, previous, changed_fields)
             if changed_fields:
                 cls.on_update.send(document, changed_fields=changed_fields, previous=previous)
         if getattr(document, "deleted_at", None) or getattr(document, "deleted", None):
@@ -1,17 +1,26 @@
+import atexit
 import hashlib
 import hmac
+import logging
 import secrets
+import threading
+import time
 from datetime import datetime, timezone
 
-from flask import current_app
+from flask import current_app, has_app_context
+from pymongo import UpdateOne
 
 from udata.api import api
 from udata.api_fields import field, generate_fields
 from udata.models import db
+from udata.utils import LocalCache
+
+log = logging.getLogger(__name__)
 
 TOKEN_BYTE_LENGTH = 48
 PREFIX_DISPLAY_LENGTH = 8
 MAX_USER_AGENTS = 20
+AUTHENTICATED_TOKENS_CACHE_SIZE = 10000
 
 
 def parse_future_datetime(value):
@@ -130,9 +139,37 @@ class ApiToken(db.Document):
                 return None, "expired"
         return token, None
 
+    @classmethod
+    def authenticate_cached(cls, plaintext_token):
+        """Same as `authenticate` but returns an `AuthenticatedToken` cached for a short time.
+
+        The cache is invalidated on revocation but only in the current process:
+        other processes may accept a revoked token for up to `API_TOKEN_CACHE_TTL` seconds.
+        Expiration is checked on every call and the user is loaded on every call.
+        """
+        tokens = get_authenticated_tokens()
+        if tokens is None:
+            token, error = cls.authenticate(plaintext_token)
+            return (AuthenticatedToken(token) if token else None), error
+        token_hash = _hash_token(plaintext_token)
+        authenticated = tokens.get(token_hash)
+        if authenticated is None:
+            token, error = cls.authenticate(plaintext_token)
+            if token is None:
+                return None, error
+            authenticated = AuthenticatedToken(token)
+            tokens.set(token_hash, authenticated)
+        elif authenticated.expired:
+            tokens.pop(token_hash)
+            return None, "expired"
+        return authenticated, None
+
     def revoke(self):
         self.revoked_at = datetime.now(timezone.utc)
         self.save()
+        tokens = get_authenticated_tokens() if has_app_context() else None
+        if tokens is not None:
+            tokens.pop(self.token_hash)
 
     def update_usage(self, user_agent=None):
         update_kwargs = {"set__last_used_at": datetime.now(timezone.utc)}
@@ -140,3 +177,105 @@ class ApiToken(db.Document):
         if user_agent and len(agents) < MAX_USER_AGENTS:
             update_kwargs["add_to_set__user_agents"] = user_agent
         type(self).objects(id=self.id).update_one(**update_kwargs)
+
+
+class AuthenticatedToken(object):
+    """
+    An authenticated API token with what is needed to log its user in.
+
+    Only the user id is kept: the user is loaded on each request so that
+    profile updates, role changes, deactivation and deletion are seen immediately.
+    """
+
+    def __init__(self, token):
+        self.id = token.id
+        self.user_agents = frozenset(token.user_agents or [])
+        expires_at = token.expires_at
+        if expires_at and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        self.expires_at = expires_at
+        self._user_class = type(token)._fields["user"].document_type
+        self.user_id = token.to_mongo()["user"]
+
+    @property
+    def expired(self):
+        return bool(self.expires_at) and self.expires_at < datetime.now(timezone.utc)
+
+    @property
+    def user(self):
+        """The token user, `None` if it has been deleted"""
+        return self._user_class.objects(id=self.user_id).first()
+
+    def update_usage(self, user_agent=None):
+        get_usage_tracker().record(self, user_agent)
+
+
+def get_authenticated_tokens():
+    """The application authenticated tokens cache, `None` when disabled"""
+    ttl = current_app.config["API_TOKEN_CACHE_TTL"]
+    if not ttl:
+        return None
+    tokens = current_app.extensions.get("api_token_cache")
+    if tokens is None:
+        tokens = current_app.extensions["api_token_cache"] = LocalCache(
+            AUTHENTICATED_TOKENS_CACHE_SIZE, ttl
+        )
+    return tokens
+
+
+class UsageTracker(object):
+    """
+    Aggregate the API tokens usages in memory and write them by batches.
+
+    Pending usages are written when a usage is recorded at least `interval` seconds
+    after the previous write, and on process exit.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._pending = {}
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, token, user_agent=None):
+        with self._lock:
+            _, user_agents = self._pending.get(token.id, (None, set()))
+            if (
+                user_agent
+                and user_agent not in token.user_agents
+                and len(token.user_agents) + len(user_agents) < MAX_USER_AGENTS
+            ):
+                user_agents.add(user_agent)
+            self._pending[token.id] = (datetime.now(timezone.utc), user_agents)
+            due = time.monotonic() - self._flushed_at >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the pending usages, returning the number of updated tokens"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return 0
+        operations = []
+        for token_id, (last_used_at, user_agents) in pending.items():
+            update = {"$max": {"last_used_at": last_used_at}}
+            if user_agents:
+                update["$addToSet"] = {"user_agents": {"$each": sorted(user_agents)}}
+            operations.append(UpdateOne({"_id": token_id}, update))
+        try:
+            ApiToken._get_collection().bulk_write(operations, ordered=False)
+        except Exception:
+            log.exception("Unable to save %d API tokens usages", len(operations))
+        return len(operations)
+
+
+def get_usage_tracker():
+    """The application API tokens usage tracker"""
+    tracker = current_app.extensions.get("api_token_usage")
+    if tracker is None:
+        tracker = UsageTracker(current_app.config["API_TOKEN_USAGE_FLUSH_INTERVAL"])
+        current_app.extensions["api_token_usage"] = tracker
+        atexit.register(tracker.flush)
+    return tracker
@@ -19,6 +19,12 @@ CONFIG = {
     "quotechar": '"',
 }
 
+# Number of documents fetched from MongoDB per round-trip
+BATCH_SIZE = 1000
+
+# Minimum size (in characters) of the chunks sent to the client
+CHUNK_SIZE = 64 * 1024
+
 
 def safestr(value):
     """Ensure type to string serialization"""
@@ -34,15 +40,42 @@ class Adapter(object):
     """A Base model CSV adapter"""
 
     fields = None
+    # Document fields read by callable getters, properties and dynamic fields.
+    # Declaring them allows to only load the exported fields from MongoDB.
+    requires = None
 
     def __init__(self, queryset):
         # no_cache() to avoid eating up too much RAM when iterating over large querysets.
         # Applied here rather than upstream to preserve custom QuerySet methods (like with_badge).
         if isinstance(queryset, QuerySet):
-            queryset = queryset.no_cache()
+            queryset = queryset.no_cache().batch_size(BATCH_SIZE)
+            projection = self.get_projection(queryset._document)
+            if projection:
+                queryset = queryset.only(*projection)
         self.queryset = queryset
         self._fields = None
 
+    def get_projection(self, document):
+        """
+        Compute the document fields to load from the adapter fields.
+
+        String fields and string getters give their root document field,
+        callable getters are expected to declare theirs in `requires`.
+        Returns `None` (whole documents are loaded) if `requires` is not declared.
+        """
+        if self.requires is None or not isinstance(self.fields, (list, tuple)):
+            return None
+        projection = set(self.requires)
+        for field in self.fields:
+            name, getter = (field, None) if isinstance(field, str) else (field + (None,))[:2]
+            if callable(getter) or (not getter and hasattr(self, "field_{0}".format(name))):
+                continue
+            root = (getter or name).split(".")[0]
+            # Properties are not stored: their dependencies are in `requires`
+            if root in document._fields:
+                projection.add(root)
+        return sorted(projection)
+
     def get_fields(self):
         if not self._fields:
             if not isinstance(self.fields, (list, tuple)):
@@ -116,6 +149,12 @@ class NestedAdapter(Adapter):
         super(NestedAdapter, self).__init__(queryset)
         self._nested_fields = None
 
+    def get_projection(self, document):
+        projection = super(NestedAdapter, self).get_projection(document)
+        if projection is not None and self.attribute not in projection:
+            projection.append(self.attribute)
+        return projection
+
     def header(self):
         """Generate the CSV header row"""
         return super(NestedAdapter, self).header() + [
@@ -212,21 +251,22 @@ def get_reader(infile):
     return csv.reader(infile, **CONFIG)
 
 
-def yield_rows(adapter):
-    """Yield a dataset catalog line by line"""
+def yield_rows(adapter, chunk_size=CHUNK_SIZE):
+    """Yield a CSV export by chunks of at least `chunk_size` characters"""
     csvfile = StringIO()
     writer = get_writer(csvfile)
     # Generate header
     writer.writerow(adapter.header())
-    yield csvfile.getvalue()
-    del csvfile
 
     for row in adapter.rows():
-        csvfile = StringIO()
-        writer = get_writer(csvfile)
         writer.writerow(row)
-        yield csvfile.getvalue()
-        del csvfile
+        if csvfile.tell() >= chunk_size:
+            yield csvfile.getvalue()
+            # Reuse the same buffer and writer for the next chunk
+            csvfile.seek(0)
+            csvfile.truncate()
+
+    yield csvfile.getvalue()
 
 
 def stream(queryset_or_adapter, basename=None):
@@ -1,3 +1,4 @@
+from udata.core.metrics import request_metrics_update
 from udata.core.reuse.models import Reuse
 
 from .models import Dataservice
@@ -17,4 +18,4 @@ def update_dataservice_reuses_metric(reuse, **kwargs):
     for dataservice_id in dataservices_delta:
         dataservice = Dataservice.objects(id=dataservice_id).first()
         if dataservice:
-            dataservice.count_reuses()
+            request_metrics_update(dataservice, "reuses")
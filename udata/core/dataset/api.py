@@ -27,7 +27,6 @@ from feedgenerator.django.utils.feedgenerator import Atom1Feed
 from flask import abort, current_app, make_response, redirect, request, url_for
 from flask_restx.inputs import boolean, positive
 from flask_security import current_user
-from mongoengine.queryset.visitor import Q
 
 from udata.api import API, add_pagination_arguments, api, errors
 from udata.api.parsers import ModelApiParser
@@ -44,9 +43,11 @@ from udata.core.organization.models import Organization
 from udata.core.reuse.models import Reuse
 from udata.core.storages.api import handle_upload, upload_parser
 from udata.core.storages.utils import CHECKSUM_TYPE
+from udata.core.suggest import suggest
 from udata.core.topic.models import Topic
 from udata.frontend.markdown import md
 from udata.i18n import gettext as _
+from udata.mongo.queryset import InvalidCursor
 from udata.rdf import RDF_EXTENSIONS, graph_response, negociate_content
 from udata.utils import get_by, get_rss_feed_list
 
@@ -82,12 +83,11 @@ from .models import (
     License,
     Resource,
     ResourceSchema,
-    get_resource,
+    resolve_resource_url,
 )
 from .rdf import dataset_to_rdf
 
 DEFAULT_SORTING = "-created_at_internal"
-SUGGEST_SORTING = "-metrics.followers"
 
 
 # Declares filters by hand, in parallel with the generic system that derives them
@@ -107,7 +107,7 @@ class DatasetApiParser(ModelApiParser):
     }
 
     def __init__(self):
-        super().__init__()
+        super().__init__(cursor=True)
         self.parser.add_argument("tag", type=str, location="args", action="append")
         self.parser.add_argument("license", type=str, location="args")
         self.parser.add_argument(
@@ -334,7 +334,12 @@ class DatasetListAPI(API):
         )
         datasets = dataset_parser.parse_filters(datasets, args)
         sort = args["sort"] or ("$text_score" if args["q"] else None) or DEFAULT_SORTING
-        return datasets.order_by(sort).paginate(args["page"], args["page_size"])
+        try:
+            return datasets.order_by(sort).paginate(
+                args["page"], args["page_size"], cursor=args["cursor"], cache_count=True
+            )
+        except InvalidCursor as e:
+            api.abort(400, str(e))
 
     @api.secure
     @api.doc("create_dataset", responses={400: "Validation error"})
@@ -547,8 +552,8 @@ class ResourceRedirectAPI(API):
         """
         Redirect to the latest version of a resource given its identifier.
         """
-        resource = get_resource(id)
-        return redirect(resource.url.strip()) if resource else abort(404, "Resource not found")
+        url = resolve_resource_url(id)
+        return redirect(url.strip()) if url else abort(404, "Resource not found")
 
 
 @ns.route("/<dataset:dataset>/resources/", endpoint="resources")
@@ -880,12 +885,8 @@ class DatasetSuggestAPI(API):
     @api.expect(suggest_parser)
     @api.marshal_with(dataset_suggestion_fields)
     def get(self):
-        """Datasets suggest endpoint using mongoDB contains"""
+        """Datasets suggest endpoint using the suggestion index"""
         args = suggest_parser.parse_args()
-        datasets_query = Dataset.objects(archived=None, deleted=None, private=False)
-        datasets = datasets_query.filter(
-            Q(title__icontains=args["q"]) | Q(acronym__icontains=args["q"])
-        )
         return [
             {
                 "id": dataset.id,
@@ -901,7 +902,7 @@ class DatasetSuggestAPI(API):
                 ),
                 "page": dataset.self_web_url(),
             }
-            for dataset in datasets.order_by(SUGGEST_SORTING).limit(args["size"])
+            for dataset in suggest(Dataset, args["q"], args["size"])
         ]
 
 
@@ -15,7 +15,7 @@ from udata.core.dataset.api_fields import license_fields
 from udata.core.organization.models import Member, Organization
 from udata.core.spatial.api_fields import geojson
 from udata.core.user.models import User
-from udata.mongo.queryset import paginate_embedded_list
+from udata.mongo.queryset import InvalidCursor, paginate_embedded_list
 from udata.utils import get_by
 
 from .api import DEFAULT_SORTING, DatasetApiParser, ResourceMixin
@@ -327,7 +327,12 @@ class DatasetListAPI(API):
         )
         datasets = dataset_parser.parse_filters(datasets, args)
         sort = args["sort"] or ("$text_score" if args["q"] else None) or DEFAULT_SORTING
-        return datasets.order_by(sort).paginate(args["page"], args["page_size"])
+        try:
+            return datasets.order_by(sort).paginate(
+                args["page"], args["page_size"], cursor=args["cursor"], cache_count=True
+            )
+        except InvalidCursor as e:
+            apiv2.abort(400, str(e))
 
 
 @ns.route("/<dataset_without_resources:dataset>/", endpoint="dataset", doc=common_doc)
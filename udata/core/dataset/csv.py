@@ -61,6 +61,19 @@ class DatasetCsvAdapter(csv.Adapter):
         ("quality_score", lambda o: format(o.quality["score"], ".2f")),
         # schema? what is the schema of a dataset?
     )
+    requires = (
+        "featured",
+        "badges",
+        "tags",
+        "archived",
+        "created_at_internal",
+        "last_modified_internal",
+        "resources.type",
+        "resources.format",
+        "harvest",
+        "quality_cached",
+        "metrics",
+    )
 
     def dynamic_fields(self):
         return csv.metric_fields(Dataset)
@@ -85,6 +98,7 @@ class ResourcesCsvAdapter(csv.NestedAdapter):
         dataset_field("private"),
         dataset_field("archived", lambda r: r.archived or False),
     )
+    requires = ("organization", "archived")
     nested_fields = (
         "id",
         "url",
@@ -1,4 +1,5 @@
 from udata.core.dataservices.models import Dataservice
+from udata.core.metrics import request_metrics_update
 from udata.core.reuse.models import Reuse
 
 from .models import Dataset
@@ -16,7 +17,7 @@ def update_dataset_reuses_metric(reuse, **kwargs):
     else:
         datasets_delta = set(dat.id for dat in reuse.datasets)
     for dataset in datasets_delta:
-        Dataset.get(dataset).count_reuses()
+        request_metrics_update(Dataset.get(dataset), "reuses")
 
 
 @Dataservice.on_create.connect
@@ -31,4 +32,4 @@ def update_dataset_dataservices_metric(dataservice, **kwargs):
     else:
         datasets_delta = set(dat.id for dat in dataservice.datasets)
     for dataset in datasets_delta:
-        Dataset.get(dataset).count_dataservices()
+        request_metrics_update(Dataset.get(dataset), "dataservices")
@@ -1,5 +1,6 @@
 import logging
 import re
+import time
 from datetime import UTC, datetime
 from pydoc import locate
 from typing import Self
@@ -8,7 +9,7 @@ from urllib.parse import urlparse
 import Levenshtein
 import requests
 from blinker import signal
-from flask import current_app, url_for
+from flask import current_app, has_app_context, url_for
 from flask_babel import LazyString
 from mongoengine import NULLIFY, PULL, EmbeddedDocument, Q
 from mongoengine import ValidationError as MongoEngineValidationError
@@ -25,7 +26,7 @@ from mongoengine.fields import (
     ReferenceField,
     StringField,
 )
-from mongoengine.signals import post_save, pre_init, pre_save
+from mongoengine.signals import post_delete, post_save, pre_init, pre_save
 from werkzeug.utils import cached_property
 
 from udata.api_fields import field, generate_fields
@@ -61,7 +62,7 @@ from udata.mongo.uuid_fields import AutoUUIDField
 from udata.search import reindex_model_on_save
 from udata.uris import ValidationError, cdata_url
 from udata.uris import validate as validate_url
-from udata.utils import get_by, hash_url, to_naive_datetime
+from udata.utils import LocalCache, get_by, hash_url, to_naive_datetime
 
 from .constants import (
     CHECKSUM_TYPES,
@@ -141,6 +142,9 @@ class HarvestDatasetMetadata(EmbeddedDocument):
     ckan_name = StringField()
     ckan_source = StringField()
 
+    # Hash of the remote content of the last harvest, used to skip unchanged datasets
+    fingerprint = StringField()
+
 
 class HarvestResourceMetadata(EmbeddedDocument):
     issued_at = DateTimeField()
@@ -314,66 +318,133 @@ class License(Document):
         """
         if not text:
             return
-        qs = cls.objects
-        text = text.strip().lower()  # Stored identifiers are lower case
-        slug = cls.slug.slugify(text)  # Use slug as it normalize string
-        license = qs(
-            Q(id__iexact=text) | Q(slug=slug) | Q(url__iexact=text) | Q(alternate_urls__iexact=text)
-        ).first()
+        return get_license_index().guess(text)
 
-        if license is None:
-            # If we're dealing with an URL, let's try some specific stuff
-            # like getting rid of trailing slash and scheme mismatch
-            try:
-                url = validate_url(text)
-            except ValidationError:
-                pass
-            else:
-                parsed = urlparse(url)
-                path = parsed.path.rstrip("/")
-                query = f"{parsed.netloc}{path}"
-                license = qs(Q(url__icontains=query) | Q(alternate_urls__contains=query)).first()
+    @classmethod
+    def default(cls):
+        return get_license_index().by_id.get(DEFAULT_LICENSE["id"])
 
-        if license is None:
-            # Try to single match `slug` with a low Damerau-Levenshtein distance
-            computed = (
-                (license_, Levenshtein.distance(license_.slug, slug)) for license_ in cls.objects
-            )
-            candidates = [license_ for license_, d in computed if d <= MAX_DISTANCE]
-            # If there is more that one match, we cannot determinate
-            # which one is closer to safely choose between candidates
-            if len(candidates) == 1:
-                license = candidates[0]
 
+# Other processes saving licenses can't invalidate the index, it is rebuilt periodically
+LICENSE_INDEX_TTL = 5 * 60
+LICENSE_INDEX_MEMO_SIZE = 10000
+
+
+class LicenseIndex(object):
+    """
+    An in-memory index of all the licenses to resolve them without querying Mongo.
+
+    Licenses are matched in the same order as the database would:
+    on multiple matches, the first stored license wins.
+    """
+
+    def __init__(self, licenses):
+        self.licenses = licenses
+        self.by_id = {license.id: license for license in reversed(licenses)}
+        self._by_slug = {license.slug: license for license in reversed(licenses)}
+        # Identifiers and URLs are matched case insensitively
+        self._by_text = {}
+        for license in licenses:
+            for key in (license.id, license.url, *license.alternate_urls):
+                if key:
+                    self._by_text.setdefault(key.lower(), license)
+        self._urls = [
+            (license, (license.url or "").lower(), license.alternate_urls) for license in licenses
+        ]
+        self._slugs = [(license, license.slug) for license in licenses]
+        self._titles = [(license, license.title.lower()) for license in licenses]
+        self._alternate_titles = [
+            (license, License.slug.slugify(title))
+            for license in licenses
+            for title in license.alternate_titles
+        ]
+        self._resolved = LocalCache(maxsize=LICENSE_INDEX_MEMO_SIZE, ttl=LICENSE_INDEX_TTL)
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        return cls(list(License.objects))
+
+    @property
+    def expired(self):
+        return time.monotonic() - self.built_at > LICENSE_INDEX_TTL
+
+    def guess(self, text):
+        license_id = self._resolved.get(text)
+        if license_id is None:
+            license = self._guess(text)
+            # Unmatched strings are remembered too
+            self._resolved.set(text, license.id if license else "")
+            return license
+        return self.by_id.get(license_id)
+
+    def _single(self, candidates):
+        # If there is more that one match, we cannot determinate
+        # which one is closer to safely choose between candidates
+        candidates = list(dict.fromkeys(candidates))
+        return candidates[0] if len(candidates) == 1 else None
+
+    def _guess(self, text):
+        text = text.strip().lower()  # Stored identifiers are lower case
+        slug = License.slug.slugify(text)  # Use slug as it normalize string
+        exact = [
+            license for license in (self._by_text.get(text), self._by_slug.get(slug)) if license
+        ]
+        if exact:
+            return min(exact, key=self.licenses.index)
+
+        # If we're dealing with an URL, let's try some specific stuff
+        # like getting rid of trailing slash and scheme mismatch
+        try:
+            url = validate_url(text)
+        except ValidationError:
+            pass
+        else:
+            parsed = urlparse(url)
+            path = parsed.path.rstrip("/")
+            query = f"{parsed.netloc}{path}"
+            for license, license_url, alternate_urls in self._urls:
+                if query in license_url or any(query in url_ for url_ in alternate_urls):
+                    return license
+
+        # Try to single match `slug` with a low Damerau-Levenshtein distance
+        license = self._single(
+            license
+            for license, slug_ in self._slugs
+            if Levenshtein.distance(slug_, slug) <= MAX_DISTANCE
+        )
         if license is None:
             # Try to match `title` with a low Damerau-Levenshtein distance
-            computed = (
-                (license_, Levenshtein.distance(license_.title.lower(), text))
-                for license_ in cls.objects
+            license = self._single(
+                license
+                for license, title in self._titles
+                if Levenshtein.distance(title, text) <= MAX_DISTANCE
             )
-            candidates = [license_ for license_, d in computed if d <= MAX_DISTANCE]
-            # If there is more that one match, we cannot determinate
-            # which one is closer to safely choose between candidates
-            if len(candidates) == 1:
-                license = candidates[0]
-
         if license is None:
             # Try to single match `alternate_titles` with a low Damerau-Levenshtein distance
-            computed = (
-                (license_, Levenshtein.distance(cls.slug.slugify(title_), slug))
-                for license_ in cls.objects
-                for title_ in license_.alternate_titles
+            license = self._single(
+                license
+                for license, title in self._alternate_titles
+                if Levenshtein.distance(title, slug) <= MAX_DISTANCE
             )
-            candidates = [license_ for license_, distance_ in computed if distance_ <= MAX_DISTANCE]
-            # If there is more that one license matching, we cannot determinate
-            # which one is closer to safely choose between candidates
-            if len(set(candidates)) == 1:
-                license = candidates[0]
         return license
 
-    @classmethod
-    def default(cls):
-        return cls.objects(id=DEFAULT_LICENSE["id"]).first()
+
+def get_license_index():
+    """The application license index, (re)built when missing or expired"""
+    index = current_app.extensions.get("license_index")
+    if index is None or index.expired:
+        index = current_app.extensions["license_index"] = LicenseIndex.build()
+    return index
+
+
+def invalidate_license_index(sender, document, **kwargs):
+    if has_app_context():
+        current_app.extensions.pop("license_index", None)
+
+
+post_save.connect(invalidate_license_index, sender=License)
+post_delete.connect(invalidate_license_index, sender=License)
 
 
 class DatasetQuerySet(OwnedQuerySet):
@@ -1036,6 +1107,7 @@ class Dataset(
             set__quality_cached=self.quality_cached,
             **kwargs,
         )
+        self._forget_stored_state()
         reindex_model_on_save(Dataset, self)
 
     def add_resource(self, resource: Resource):
@@ -1341,3 +1413,93 @@ def get_resource(id):
         return get_by(dataset.resources, id=id)
     else:
         return CommunityResource.objects(id=id).first()
+
+
+RESOURCE_URL_CACHE_KEY = "resource-url:{0}"
+
+# In-process cache in front of the shared one for the busiest permalinks.
+# Other processes can't invalidate it, so its entries only live a few seconds.
+_resource_urls = LocalCache(maxsize=10000, ttl=10)
+
+
+def query_resource_url(id):
+    """Fetch the URL of a resource (or community resource) without loading its dataset"""
+    query = Dataset.objects(resources__id=id)._query
+    datasets = list(Dataset._get_collection().find(query, {"resources.$": 1}).limit(2))
+    if len(datasets) > 1:
+        log.error(f"Resource #{id} is duplicated across several datasets")
+        return None
+    if datasets:
+        return datasets[0]["resources"][0].get("url")
+    community_resource = CommunityResource.objects(id=id).only("url").as_pymongo().first()
+    return community_resource.get("url") if community_resource else None
+
+
+def resolve_resource_url(id):
+    """
+    Resolve the URL a resource permalink redirects to.
+
+    Resolved URLs are cached for `RESOURCE_PERMALINK_CACHE_TTL` seconds,
+    unknown resources are not.
+    """
+    timeout = current_app.config["RESOURCE_PERMALINK_CACHE_TTL"]
+    if not timeout:
+        return query_resource_url(id)
+    key = RESOURCE_URL_CACHE_KEY.format(id)
+    url = _resource_urls.get(key)
+    if url is None:
+        url = cache.get(key)
+        if url is None:
+            url = query_resource_url(id)
+            if url is None:
+                return None
+            cache.set(key, url, timeout=timeout)
+        _resource_urls.set(key, url)
+    return url
+
+
+def invalidate_resource_urls(*ids):
+    keys = [RESOURCE_URL_CACHE_KEY.format(id) for id in ids]
+    if not keys:
+        return
+    for key in keys:
+        _resource_urls.pop(key)
+    cache.delete_many(*keys)
+
+
+@Dataset.on_resource_updated.connect
+@Dataset.on_resource_removed.connect
+def invalidate_resource_url(sender, document, resource_id=None, **kwargs):
+    invalidate_resource_urls(resource_id)
+
+
+def capture_previous_resources_ids(sender, document, **kwargs):
+    """Resources dropped by a whole dataset save must have their URLs invalidated too"""
+    document._previous_resources_ids = set()
+    if not document.pk:
+        return
+    if not any(field.split(".")[0] == "resources" for field in document._get_changed_fields()):
+        return
+    previous = document._get_stored_document({"resources"})
+    if previous is not None:
+        document._previous_resources_ids = {resource.id for resource in previous.resources}
+
+
+def invalidate_dataset_resources_urls(sender, document, **kwargs):
+    """Resources URLs can also change through a whole dataset save (ie. harvesting)"""
+    previous_ids = getattr(document, "_previous_resources_ids", set())
+    document._previous_resources_ids = set()
+    if "post_save" in kwargs.get("ignores", []):
+        return
+    invalidate_resource_urls(*previous_ids.union(resource.id for resource in document.resources))
+
+
+def invalidate_community_resource_url(sender, document, **kwargs):
+    invalidate_resource_urls(document.id)
+
+
+pre_save.connect(capture_previous_resources_ids, sender=Dataset)
+post_save.connect(invalidate_dataset_resources_urls, sender=Dataset)
+post_delete.connect(invalidate_dataset_resources_urls, sender=Dataset)
+post_save.connect(invalidate_community_resource_url, sender=CommunityResource)
+post_delete.connect(invalidate_community_resource_url, sender=CommunityResource)
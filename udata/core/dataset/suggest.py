@@ -0,0 +1,23 @@
+from udata.core import suggest
+
+from .models import Dataset
+
+__all__ = ("DatasetSuggest",)
+
+
+@suggest.register
+class DatasetSuggest(suggest.SuggestAdapter):
+    model = Dataset
+    fields = ("title", "acronym")
+
+    @classmethod
+    def queryset(cls):
+        return Dataset.objects(archived=None, deleted=None, private=False)
+
+    @classmethod
+    def is_suggestible(cls, dataset: Dataset):
+        return dataset.archived is None and dataset.deleted is None and not dataset.private
+
+    @classmethod
+    def score(cls, dataset: Dataset):
+        return dataset.metrics.get("followers", 0)
@@ -1,6 +1,9 @@
 import collections
 import gzip
+import multiprocessing
 import os
+import shutil
+import time
 from datetime import UTC, date, datetime
 from tempfile import NamedTemporaryFile
 
@@ -102,14 +105,17 @@ def get_queryset(model_cls):
     return model_cls.objects.filter(**params)
 
 
-def get_resource_for_csv_export_model(model, dataset):
+def get_resource_for_csv_export_model(model, dataset, compression=None):
     for resource in dataset.resources:
-        if resource.extras.get("csv-export:model", "") == model:
+        if (
+            resource.extras.get("csv-export:model", "") == model
+            and resource.extras.get("csv-export:compression") == compression
+        ):
             return resource
 
 
-def get_or_create_resource(r_info, model, dataset):
-    resource = get_resource_for_csv_export_model(model, dataset)
+def get_or_create_resource(r_info, model, dataset, compression=None):
+    resource = get_resource_for_csv_export_model(model, dataset, compression)
     if resource:
         for k, v in r_info.items():
             setattr(resource, k, v)
@@ -117,33 +123,42 @@ def get_or_create_resource(r_info, model, dataset):
         return False, resource
     else:
         r_info["extras"] = {"csv-export:model": model}
+        if compression:
+            r_info["extras"]["csv-export:compression"] = compression
         return True, Resource(**r_info)
 
 
-def store_resource(csvfile, model, dataset):
+def store_resource(path, model, dataset, compression=None):
     timestr = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
     filename = "export-%s-%s.csv" % (model, timestr)
+    if compression == "gzip":
+        filename += ".gz"
     prefix = "/".join((dataset.slug, timestr))
     storage = storages.resources
-    with open(csvfile.name, "rb") as infile:
+    with open(path, "rb") as infile:
         r_info = storages.utils.save_upload(storage, infile, filename, prefix=prefix)
     r_info["checksum"] = Checksum(type=CHECKSUM_TYPE, value=r_info.pop(CHECKSUM_TYPE))
     r_info["filesize"] = r_info.pop("size")
     del r_info["filename"]
     r_info["title"] = filename
-    return get_or_create_resource(r_info, model, dataset)
+    return get_or_create_resource(r_info, model, dataset, compression)
 
 
-def export_csv_for_model(model, dataset, replace: bool = False):
+CsvExport = collections.namedtuple("CsvExport", ("model", "path", "gzip_path", "rows", "duration"))
+
+
+def build_csv_export(model):
+    """
+    Write the CSV export of a model into a temporary file
+    (and its gzipped version if `EXPORT_CSV_GZIP` is set).
+
+    This does not touch the export dataset so it can run in a worker process.
+    """
     model_cls = getattr(udata_models, model.capitalize(), None)
     if not model_cls:
         log.error("Unknow model %s" % model)
         return
 
-    fs_filename_to_remove = None
-    if existing_resource := get_resource_for_csv_export_model(model, dataset):
-        fs_filename_to_remove = existing_resource.fs_filename
-
     queryset = get_queryset(model_cls)
     adapter = csv.get_adapter(model_cls)
     if not adapter:
@@ -152,17 +167,41 @@ def export_csv_for_model(model, dataset, replace: bool = False):
     adapter = adapter(queryset)
 
     log.info("Exporting CSV for %s..." % model)
+    start = time.perf_counter()
 
-    csvfile = NamedTemporaryFile(mode="w", encoding="utf8", delete=False)
+    rows = 0
+    csvfile = NamedTemporaryFile(mode="w", encoding="utf8", suffix=".csv", delete=False)
+    gzip_path = csvfile.name + ".gz" if current_app.config["EXPORT_CSV_GZIP"] else None
     try:
-        # write adapter results into a tmp file
-        writer = csv.get_writer(csvfile)
-        writer.writerow(adapter.header())
-        for row in adapter.rows():
-            writer.writerow(row)
-        csvfile.flush()
-        # make a resource from this tmp file
-        created, resource = store_resource(csvfile, model, dataset)
+        with csvfile:
+            writer = csv.get_writer(csvfile)
+            writer.writerow(adapter.header())
+            for row in adapter.rows():
+                writer.writerow(row)
+                rows += 1
+        if gzip_path:
+            with open(csvfile.name, "rb") as infile, gzip.open(gzip_path, "wb") as outfile:
+                shutil.copyfileobj(infile, outfile)
+    except BaseException:
+        # Don't leave a partial export behind
+        remove_csv_export(CsvExport(model, csvfile.name, gzip_path, rows, None))
+        raise
+
+    return CsvExport(model, csvfile.name, gzip_path, rows, time.perf_counter() - start)
+
+
+def store_csv_export(export, dataset, replace: bool = False):
+    """Store a built CSV export (and its variants) as resources of the export dataset"""
+    variants = [(export.path, None)]
+    if export.gzip_path:
+        variants.append((export.gzip_path, "gzip"))
+
+    resources = {}
+    for path, compression in variants:
+        fs_filename_to_remove = None
+        if existing := get_resource_for_csv_export_model(export.model, dataset, compression):
+            fs_filename_to_remove = existing.fs_filename
+        created, resource = store_resource(path, export.model, dataset, compression)
         # add it to the dataset
         if created:
             dataset.add_resource(resource)
@@ -177,10 +216,64 @@ def export_csv_for_model(model, dataset, replace: bool = False):
                 log.error(
                     f"File not found while deleting resource #{resource.id} ({fs_filename_to_remove}) in export_csv_for_model cleanup"
                 )
-        return resource
+        resources[compression] = resource
+    return resources
+
+
+def remove_csv_export(export):
+    for path in (export.path, export.gzip_path):
+        if path and os.path.exists(path):
+            os.unlink(path)
+
+
+def export_csv_for_model(model, dataset, replace: bool = False):
+    export = build_csv_export(model)
+    if not export:
+        return
+    try:
+        return store_csv_export(export, dataset, replace)[None]
     finally:
-        csvfile.close()
-        os.unlink(csvfile.name)
+        remove_csv_export(export)
+
+
+def init_export_worker(app):
+    """Prepare a forked worker process for building CSV exports"""
+    app.app_context().push()
+
+
+def build_csv_exports(models, workers=1):
+    """
+    Build the CSV exports of the given models,
+    concurrently in as many forked worker processes as `workers`.
+
+    Exports are yielded as soon as they are built.
+    """
+    workers = min(workers, len(models))
+    if workers <= 1:
+        yield from map(build_csv_export, models)
+        return
+    ctx = multiprocessing.get_context("fork")
+    app = current_app._get_current_object()
+    with ctx.Pool(workers, initializer=init_export_worker, initargs=(app,)) as pool:
+        yield from pool.imap_unordered(build_csv_export, models)
+
+
+def archive_csv_export(export, resource):
+    """Upload a gzipped copy of a CSV export to `EXPORT_CSV_ARCHIVE_S3_BUCKET`"""
+    log.info(
+        f"Archiving {export.model} csv catalog on {current_app.config['EXPORT_CSV_ARCHIVE_S3_BUCKET']} bucket"
+    )
+    if export.gzip_path:
+        with open(export.gzip_path, "rb") as f:
+            data = f.read()
+    else:
+        with open(export.path, "rb") as f:
+            data = gzip.compress(f.read())
+    store_bytes(
+        bucket=current_app.config["EXPORT_CSV_ARCHIVE_S3_BUCKET"],
+        filename=f"{current_app.config['EXPORT_CSV_ARCHIVE_S3_FILENAME_PREFIX']}{resource.title}.gz",
+        bytes=data,
+    )
 
 
 @job("export-csv")
@@ -205,24 +298,24 @@ def export_csv(self, model=None):
         return
 
     models = (model,) if model else ALLOWED_MODELS
-    for model in models:
-        resource = export_csv_for_model(model, dataset, replace=True)
-
-        # If we are the first day of the month, archive today catalogs
-        if (
-            current_app.config["EXPORT_CSV_ARCHIVE_S3_BUCKET"]
-            and resource
-            and date.today().day == 1
-        ):
-            log.info(
-                f"Archiving {model} csv catalog on {current_app.config['EXPORT_CSV_ARCHIVE_S3_BUCKET']} bucket"
-            )
-            with storages.resources.open(resource.fs_filename, "rb") as f:
-                store_bytes(
-                    bucket=current_app.config["EXPORT_CSV_ARCHIVE_S3_BUCKET"],
-                    filename=f"{current_app.config['EXPORT_CSV_ARCHIVE_S3_FILENAME_PREFIX']}{resource.title}.gz",
-                    bytes=gzip.compress(f.read()),
-                )
+    start = time.perf_counter()
+    report = {}
+    for export in build_csv_exports(models, current_app.config["EXPORT_CSV_WORKERS"]):
+        if not export:
+            continue
+        try:
+            resource = store_csv_export(export, dataset, replace=True)[None]
+
+            # If we are the first day of the month, archive today catalogs
+            if current_app.config["EXPORT_CSV_ARCHIVE_S3_BUCKET"] and date.today().day == 1:
+                archive_csv_export(export, resource)
+        finally:
+            remove_csv_export(export)
+        log.info(f"Exported {export.rows} {export.model} rows in {export.duration:.2f}s")
+        report[export.model] = {"rows": export.rows, "duration": round(export.duration, 2)}
+
+    log.info(f"Exported {len(report)} CSV catalogs in {time.perf_counter() - start:.2f}s")
+    return report
 
 
 @job("bind-tabular-dataservice")
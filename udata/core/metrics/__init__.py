@@ -1,3 +1,55 @@
+import logging
+from collections import defaultdict
+
+from flask import current_app
+
+from udata.mongo import db
+
+from .models import PendingMetricsUpdate
+
+log = logging.getLogger(__name__)
+
+
+def request_metrics_update(document, *metrics):
+    """
+    Recompute some metrics of a document using its `count_<metric>` methods.
+
+    The metrics are only marked as pending when `METRICS_COALESCE` is enabled,
+    otherwise they are recomputed right away.
+    """
+    if current_app.config["METRICS_COALESCE"]:
+        for metric in metrics:
+            PendingMetricsUpdate.mark(document.__class__.__name__, str(document.pk), metric=metric)
+    else:
+        for metric in metrics:
+            getattr(document, f"count_{metric}")()
+
+
+def flush_pending_metrics(batch_size=1000):
+    """
+    Recompute metrics marked as pending, by batches of `batch_size` marks.
+
+    See `PendingUpdate.flush` for the marks consumed by a flush.
+    Each object is fetched once per batch and each of its metrics computed once.
+    """
+
+    def compute_batch(batch):
+        metrics_by_object = defaultdict(set)
+        for pending in batch:
+            metrics_by_object[(pending.classname, pending.object_id)].add(pending.metric)
+        for (classname, object_id), metrics in metrics_by_object.items():
+            try:
+                document = db.resolve_model(classname).objects(pk=object_id).first()
+                if document is None:
+                    continue
+                for metric in sorted(metrics):
+                    getattr(document, f"count_{metric}")()
+            except Exception:
+                log.exception('Unable to compute %s "%s" metrics', classname, object_id)
+
+    return PendingMetricsUpdate.flush(compute_batch, batch_size)
+
+
 def init_app(app):
     # Load all core metrics
     import udata.core.user.metrics  # noqa
@@ -5,7 +5,8 @@ from flask import current_app
 
 from udata.commands import cli, success
 from udata.core.dataservices.models import Dataservice
-from udata.models import Dataset, GeoZone, Organization, Reuse, Site, User
+from udata.core.spatial.models import count_geozones_datasets
+from udata.models import Dataset, Organization, Reuse, Site, User
 
 log = logging.getLogger(__name__)
 
@@ -42,25 +43,7 @@ def update(
         log.info("Update site metrics")
         try:
             site = Site.objects(id=current_app.config["SITE_ID"]).first()
-            if drop:
-                site.metrics.clear()
-            site.count_users()
-            site.count_org()
-            site.count_datasets()
-            site.count_resources()
-            site.count_reuses()
-            site.count_dataservices()
-            site.count_followers()
-            site.count_discussions()
-            site.count_harvesters()
-            site.count_max_dataset_followers()
-            site.count_max_dataset_reuses()
-            site.count_max_reuse_datasets()
-            site.count_max_reuse_followers()
-            site.count_max_org_followers()
-            site.count_max_org_reuses()
-            site.count_max_org_datasets()
-            site.count_stock_metrics()
+            site.compute_metrics(drop=drop)
         except Exception as e:
             log.info(f"Error during update: {e}")
 
@@ -147,15 +130,7 @@ def update(
 
     if do_all or geozones:
         log.info("Update GeoZone metrics")
-        all_geozones = GeoZone.objects.timeout(False)
-        with click.progressbar(all_geozones, length=GeoZone.objects.count()) as geozones_bar:
-            for geozone in geozones_bar:
-                try:
-                    if drop:
-                        geozone.metrics.clear()
-                    geozone.count_datasets()
-                except Exception as e:
-                    log.info(f"Error during update: {e}")
-                    continue
+        count = count_geozones_datasets(drop=drop)
+        log.info(f"Updated {count} geozones")
 
     success("All metrics have been updated")
@@ -93,7 +93,34 @@ def get_stock_metrics(objects: QuerySet, date_label: str = "created_at") -> Orde
     """
     Get stock metrics for a particular model object
     """
-    pipeline = [
+    aggregation_res = objects.aggregate(*stock_metrics_pipeline(date_label))
+
+    return compute_monthly_aggregated_metrics(aggregation_res)
+
+
+def get_aggregated_metrics(
+    objects: QuerySet, totals: dict, date_label: str = "created_at", match: dict | None = None
+) -> tuple[dict, OrderedDict]:
+    """
+    Compute both some totals and the stock metrics of a model objects in a single aggregation.
+
+    `totals` are `$group` accumulators, optionally restricted by a raw `match` query.
+    Missing or null totals are returned as 0.
+    """
+    totals_pipeline = [{"$match": match}] if match else []
+    totals_pipeline.append({"$group": {"_id": None, **totals}})
+    [result] = objects.aggregate(
+        {"$facet": {"totals": totals_pipeline, "stock": stock_metrics_pipeline(date_label)}}
+    )
+    values = result["totals"][0] if result["totals"] else {}
+    return (
+        {key: values.get(key) or 0 for key in totals},
+        compute_monthly_aggregated_metrics(result["stock"]),
+    )
+
+
+def stock_metrics_pipeline(date_label: str) -> list[dict]:
+    return [
         {"$match": {date_label: {"$gte": datetime.now() - timedelta(days=365)}}},
         {
             "$group": {
@@ -108,6 +135,3 @@ def get_stock_metrics(objects: QuerySet, date_label: str = "created_at") -> Orde
             }
         },
     ]
-    aggregation_res = objects.aggregate(*pipeline)
-
-    return compute_monthly_aggregated_metrics(aggregation_res)
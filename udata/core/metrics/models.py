@@ -1,8 +1,9 @@
-from mongoengine.fields import DictField
+from mongoengine.fields import DictField, StringField
 
 from udata.api_fields import field
+from udata.mongo.pending import PendingUpdate
 
-__all__ = ("WithMetrics",)
+__all__ = ("WithMetrics", "PendingMetricsUpdate")
 
 
 class WithMetrics(object):
@@ -17,3 +18,23 @@ class WithMetrics(object):
 
     def get_metrics(self):
         return {key: self.metrics.get(key, 0) for key in self.__metrics_keys__}
+
+
+class PendingMetricsUpdate(PendingUpdate):
+    """
+    A metric of an object which is out of date.
+
+    When `METRICS_COALESCE` is enabled, metrics depending on other objects are marked here
+    instead of being recomputed on each change of these objects, so that any number
+    of changes between two flushes results in a single computation.
+    """
+
+    metric = StringField(required=True)
+
+    meta = {
+        "collection": "metrics_pending_updates",
+        "indexes": [
+            {"fields": ["classname", "object_id", "metric"], "unique": True},
+            "created_at",
+        ],
+    }
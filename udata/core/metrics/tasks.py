@@ -8,6 +8,7 @@ import requests
 from flask import current_app
 
 from udata.core.dataservices.models import Dataservice
+from udata.core.metrics import flush_pending_metrics
 from udata.core.metrics.signals import on_site_metrics_computed
 from udata.models import CommunityResource, Dataset, Organization, Reuse, Site
 from udata.mongo.document import UDataDocument as Document
@@ -154,22 +155,13 @@ def update_metrics(self):
 @job("compute-site-metrics")
 def compute_site_metrics(self):
     site = Site.objects(id=current_app.config["SITE_ID"]).first()
-    site.count_users()
-    site.count_org()
-    site.count_datasets()
-    site.count_resources()
-    site.count_reuses()
-    site.count_dataservices()
-    site.count_followers()
-    site.count_discussions()
-    site.count_harvesters()
-    site.count_max_dataset_followers()
-    site.count_max_dataset_reuses()
-    site.count_max_reuse_datasets()
-    site.count_max_reuse_followers()
-    site.count_max_org_followers()
-    site.count_max_org_reuses()
-    site.count_max_org_datasets()
-    site.count_stock_metrics()
+    site.compute_metrics()
     # Sending signal
     on_site_metrics_computed.send(site)
+
+
+@job("flush-metrics")
+def flush_metrics(self, batch_size=1000):
+    """Recompute metrics marked as pending since the last flush"""
+    flushed = flush_pending_metrics(batch_size)
+    self.log.info("Flushed %d pending metrics updates", flushed)
@@ -28,6 +28,7 @@ from udata.core.storages.api import (
     parse_uploaded_image,
     uploaded_image_fields,
 )
+from udata.core.suggest import suggest
 from udata.mongo import db
 from udata.mongo.errors import FieldValidationError
 from udata.rdf import RDF_EXTENSIONS, graph_response, negociate_content
@@ -51,7 +52,6 @@ from .tasks import (
 )
 
 DEFAULT_SORTING = "-created_at"
-SUGGEST_SORTING = "-metrics.followers"
 
 
 def resolve_assignment_subjects(raw_assignments, org):
@@ -688,11 +688,8 @@ class OrganizationSuggestAPI(API):
     @api.expect(suggest_parser)
     @api.marshal_list_with(org_suggestion_fields)
     def get(self):
-        """Organizations suggest endpoint using mongoDB contains"""
+        """Organizations suggest endpoint using the suggestion index"""
         args = suggest_parser.parse_args()
-        orgs = Organization.objects(
-            Q(name__icontains=args["q"]) | Q(acronym__icontains=args["q"]), deleted=None
-        )
         return [
             {
                 "id": org.id,
@@ -702,7 +699,7 @@ class OrganizationSuggestAPI(API):
                 "image_url": org.logo,
                 "page": org.self_web_url(),
             }
-            for org in orgs.order_by(SUGGEST_SORTING).limit(args["size"])
+            for org in suggest(Organization, args["q"], args["size"])
         ]
 
 
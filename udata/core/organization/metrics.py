@@ -1,4 +1,5 @@
 from udata.core.dataservices.models import Dataservice
+from udata.core.metrics import request_metrics_update
 from udata.core.owned import Owned
 from udata.models import Dataset, Organization, Reuse
 
@@ -10,7 +11,7 @@ def update_datasets_metrics(document, **kwargs):
     if "metrics" in kwargs.get("ignores", []):
         return
     if document.organization:
-        document.organization.count_datasets()
+        request_metrics_update(document.organization, "datasets")
 
 
 @Reuse.on_create.connect
@@ -18,7 +19,7 @@ def update_datasets_metrics(document, **kwargs):
 @Reuse.on_delete.connect
 def update_reuses_metrics(document, **kwargs):
     if document.organization:
-        document.organization.count_reuses()
+        request_metrics_update(document.organization, "reuses")
 
 
 @Dataservice.on_create.connect
@@ -26,7 +27,7 @@ def update_reuses_metrics(document, **kwargs):
 @Dataservice.on_delete.connect
 def update_dataservices_metrics(document, **kwargs):
     if document.organization:
-        document.organization.count_dataservices()
+        request_metrics_update(document.organization, "dataservices")
 
 
 @Owned.on_owner_change.connect
@@ -34,8 +35,8 @@ def update_org_metrics(document, previous, **kwargs):
     if not isinstance(previous, Organization):
         return
     if isinstance(document, Dataset):
-        previous.count_datasets()
+        request_metrics_update(previous, "datasets")
     elif isinstance(document, Reuse):
-        previous.count_reuses()
+        request_metrics_update(previous, "reuses")
     elif isinstance(document, Dataservice):
-        previous.count_dataservices()
+        request_metrics_update(previous, "dataservices")
@@ -0,0 +1,23 @@
+from udata.core import suggest
+
+from .models import Organization
+
+__all__ = ("OrganizationSuggest",)
+
+
+@suggest.register
+class OrganizationSuggest(suggest.SuggestAdapter):
+    model = Organization
+    fields = ("name", "acronym")
+
+    @classmethod
+    def queryset(cls):
+        return Organization.objects(deleted=None)
+
+    @classmethod
+    def is_suggestible(cls, org: Organization):
+        return org.deleted is None
+
+    @classmethod
+    def score(cls, org: Organization):
+        return org.metrics.get("followers", 0)
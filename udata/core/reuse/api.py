@@ -22,6 +22,7 @@ from udata.core.storages.api import (
     parse_uploaded_image,
     uploaded_image_fields,
 )
+from udata.core.suggest import suggest
 from udata.frontend.markdown import md
 from udata.i18n import gettext as _
 from udata.models import Dataset
@@ -35,7 +36,6 @@ from .api_fields import (
 from .models import Reuse
 
 DEFAULT_SORTING = "-created_at"
-SUGGEST_SORTING = "-metrics.followers"
 
 
 # Duplicates by hand the filters declared with `filterable=` on the Reuse model:
@@ -90,7 +90,7 @@ class ReuseListAPI(API):
         query = Reuse.objects.visible_by_user(
             current_user, mongoengine.Q(private__ne=True, deleted=None)
         )
-        return Reuse.apply_pagination(Reuse.apply_sort_filters(query))
+        return Reuse.apply_pagination(Reuse.apply_sort_filters(query), cache_count=True)
 
     @api.secure
     @api.doc("create_reuse")
@@ -319,11 +319,8 @@ class ReusesSuggestAPI(API):
     @api.expect(suggest_parser)
     @api.marshal_list_with(reuse_suggestion_fields)
     def get(self):
-        """Reuses suggest endpoint using mongoDB contains"""
+        """Reuses suggest endpoint using the suggestion index"""
         args = suggest_parser.parse_args()
-        reuses = Reuse.objects(
-            archived=None, deleted=None, private__ne=True, title__icontains=args["q"]
-        )
         return [
             {
                 "id": reuse.id,
@@ -332,7 +329,7 @@ class ReusesSuggestAPI(API):
                 "image_url": reuse.image,
                 "page": reuse.self_web_url(),
             }
-            for reuse in reuses.order_by(SUGGEST_SORTING).limit(args["size"])
+            for reuse in suggest(Reuse, args["q"], args["size"])
         ]
 
 
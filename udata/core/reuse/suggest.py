@@ -0,0 +1,23 @@
+from udata.core import suggest
+
+from .models import Reuse
+
+__all__ = ("ReuseSuggest",)
+
+
+@suggest.register
+class ReuseSuggest(suggest.SuggestAdapter):
+    model = Reuse
+    fields = ("title",)
+
+    @classmethod
+    def queryset(cls):
+        return Reuse.objects(archived=None, deleted=None, private__ne=True)
+
+    @classmethod
+    def is_suggestible(cls, reuse: Reuse):
+        return reuse.archived is None and reuse.deleted is None and not reuse.private
+
+    @classmethod
+    def score(cls, reuse: Reuse):
+        return reuse.metrics.get("followers", 0)
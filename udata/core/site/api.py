@@ -169,7 +169,7 @@ class SiteHarvestsCsv(API):
 @api.route("/site/tags.csv", endpoint="site_tags_csv")
 class SiteTagsCsv(API):
     def get(self):
-        adapter = TagCsvAdapter(Tag.objects.order_by("-total"))
+        adapter = TagCsvAdapter(Tag.objects.top())
         return csv.stream(adapter, "tags")
 
 
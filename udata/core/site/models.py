@@ -1,3 +1,6 @@
+import logging
+import time
+
 from flask import current_app, g
 from mongoengine import EmbeddedDocument
 from mongoengine.fields import (
@@ -15,7 +18,11 @@ from udata.api_fields import field, generate_fields
 from udata.core.dataset.models import Dataset
 from udata.core.edito_blocs.base import Bloc
 from udata.core.edito_blocs.models import SITE_BLOCS_FIELDS
-from udata.core.metrics.helpers import get_metrics_for_model, get_stock_metrics
+from udata.core.metrics.helpers import (
+    get_aggregated_metrics,
+    get_metrics_for_model,
+    get_stock_metrics,
+)
 from udata.core.metrics.models import WithMetrics
 from udata.core.organization.models import Organization
 from udata.core.reuse.models import Reuse
@@ -24,6 +31,8 @@ from udata.utils import get_udata_version
 
 __all__ = ("Site", "SiteSettings")
 
+log = logging.getLogger(__name__)
+
 
 DEFAULT_FEED_SIZE = 20
 
@@ -81,6 +90,115 @@ class Site(WithMetrics, Document):
     def version(self):
         return get_udata_version()
 
+    def compute_metrics(self, drop: bool = False) -> None:
+        """
+        Compute all the site metrics with one aggregation per collection
+        and persist them at once with a single atomic update.
+
+        With `drop`, metrics not computed here are removed.
+        """
+        metrics = {}
+        for stage in (
+            self.compute_users_metrics,
+            self.compute_organizations_metrics,
+            self.compute_datasets_metrics,
+            self.compute_reuses_metrics,
+            self.compute_dataservices_metrics,
+            self.compute_discussions_metrics,
+            self.compute_harvesters_metrics,
+            self.compute_visits_metrics,
+        ):
+            start = time.perf_counter()
+            metrics.update(stage())
+            log.info(
+                "%s done in %.3f seconds",
+                stage.__name__.removeprefix("compute_"),
+                time.perf_counter() - start,
+            )
+
+        if drop:
+            update = {"$set": {"metrics": metrics}}
+            self.metrics.clear()
+        else:
+            update = {"$set": {f"metrics.{key}": value for key, value in metrics.items()}}
+        Site.objects(id=self.id).update_one(__raw__=update)
+        self.metrics.update(metrics)
+
+    def compute_users_metrics(self) -> dict:
+        from udata.models import Follow, User
+
+        totals, stock = get_aggregated_metrics(
+            User.objects(),
+            {"users": {"$sum": 1}},
+            match={"confirmed_at": {"$ne": None}, "deleted": None},
+        )
+        return {**totals, "users_by_months": stock, "followers": Follow.objects(until=None).count()}
+
+    def compute_organizations_metrics(self) -> dict:
+        totals, stock = get_aggregated_metrics(
+            Organization.objects.visible(),
+            {
+                "organizations": {"$sum": 1},
+                "max_org_followers": {"$max": "$metrics.followers"},
+                "max_org_reuses": {"$max": "$metrics.reuses"},
+                "max_org_datasets": {"$max": "$metrics.datasets"},
+            },
+        )
+        return {**totals, "organizations_by_months": stock}
+
+    def compute_datasets_metrics(self) -> dict:
+        totals, stock = get_aggregated_metrics(
+            Dataset.objects.visible(),
+            {
+                "datasets": {"$sum": 1},
+                "resources": {"$sum": {"$size": {"$ifNull": ["$resources", []]}}},
+                "max_dataset_followers": {"$max": "$metrics.followers"},
+                "max_dataset_reuses": {"$max": "$metrics.reuses"},
+            },
+            date_label="created_at_internal",
+        )
+        return {**totals, "datasets_by_months": stock}
+
+    def compute_reuses_metrics(self) -> dict:
+        totals, stock = get_aggregated_metrics(
+            Reuse.objects.visible(),
+            {
+                "reuses": {"$sum": 1},
+                "max_reuse_datasets": {"$max": "$metrics.datasets"},
+                "max_reuse_followers": {"$max": "$metrics.followers"},
+            },
+        )
+        return {**totals, "reuses_by_months": stock}
+
+    def compute_dataservices_metrics(self) -> dict:
+        from udata.core.dataservices.models import Dataservice
+
+        return {"dataservices": Dataservice.objects.visible().count()}
+
+    def compute_discussions_metrics(self) -> dict:
+        from udata.models import Discussion
+
+        totals, stock = get_aggregated_metrics(
+            Discussion.objects(), {"discussions": {"$sum": 1}}, date_label="created"
+        )
+        return {**totals, "discussions_by_months": stock}
+
+    def compute_harvesters_metrics(self) -> dict:
+        from udata.harvest.models import HarvestSource
+
+        totals, stock = get_aggregated_metrics(HarvestSource.objects(), {"harvesters": {"$sum": 1}})
+        return {**totals, "harvesters_by_months": stock}
+
+    def compute_visits_metrics(self) -> dict:
+        metrics = {}
+        visits = get_metrics_for_model("site", None, ["visit_dataset"])
+        if visits is not None:
+            metrics["datasets_visits_by_months"] = visits[0]
+        downloads = get_metrics_for_model("site", None, ["download_resource"])
+        if downloads is not None:
+            metrics["resources_downloads_by_months"] = downloads[0]
+        return metrics
+
     def count_users(self):
         from udata.models import User
 
@@ -1,6 +1,11 @@
-from dataclasses import dataclass
-from xml.etree import ElementTree
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from io import BytesIO
+from xml.sax.saxutils import escape
 
+from bson import ObjectId
 from flask import current_app
 
 from udata.core.dataservices.models import Dataservice
@@ -9,7 +14,7 @@ from udata.core.organization.models import Organization
 from udata.core.post.models import Post
 from udata.core.reuse.models import Reuse
 from udata.core.topic.models import Topic
-from udata.storage.s3 import store_bytes
+from udata.storage.s3 import get_bytes, store_bytes
 
 SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
 
@@ -17,6 +22,11 @@ BATCH_SIZE = 1000
 
 S3_PUBLIC_ACL = "public-read"
 
+MANIFEST_FILENAME = "manifest.json"
+
+# Bump to invalidate the shards of previous runs when the rendering changes
+MANIFEST_VERSION = 1
+
 
 @dataclass
 class SitemapConfig:
@@ -47,38 +57,117 @@ _SITEMAP_CONFIGS = [
 ]
 
 
-def render_xml(root_tag, items, child_tag):
-    root = ElementTree.Element(root_tag, xmlns=SITEMAP_NS)
+def iter_xml(root_tag, items, child_tag):
+    """Render a sitemap (or a sitemap index) piece by piece"""
+    yield f'<?xml version="1.0" encoding="UTF-8"?><{root_tag} xmlns="{SITEMAP_NS}">'
+    empty = True
     for item in items:
-        child = ElementTree.SubElement(root, child_tag)
-        ElementTree.SubElement(child, "loc").text = item["loc"]
+        empty = False
+        yield f"\n  <{child_tag}>\n    <loc>{escape(item['loc'])}</loc>"
         if item.get("lastmod"):
-            ElementTree.SubElement(child, "lastmod").text = item["lastmod"]
-    ElementTree.indent(root)
-    return '<?xml version="1.0" encoding="UTF-8"?>' + ElementTree.tostring(root, encoding="unicode")
+            yield f"\n    <lastmod>{item['lastmod']}</lastmod>"
+        yield f"\n  </{child_tag}>"
+    yield f"</{root_tag}>" if empty else f"\n</{root_tag}>"
+
+
+def render_xml(root_tag, items, child_tag):
+    return "".join(iter_xml(root_tag, items, child_tag))
+
+
+def encode_xml(root_tag, items, child_tag, compress=False):
+    """Write a sitemap into a single buffer, optionally gzipped"""
+    buffer = BytesIO()
+    # A fixed mtime keeps the compressed output deterministic
+    out = gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) if compress else buffer
+    for piece in iter_xml(root_tag, items, child_tag):
+        out.write(piece.encode("utf-8"))
+    if compress:
+        out.close()
+    return buffer.getvalue()
+
+
+def format_lastmod(lastmod):
+    return lastmod.strftime("%Y-%m-%dT%H:%M:%SZ") if lastmod else None
+
+
+@dataclass
+class Shard:
+    start: ObjectId | None
+    entries: list = field(default_factory=list)
+
+    @property
+    def hash(self):
+        digest = hashlib.sha256()
+        for entry in self.entries:
+            digest.update("{_id}|{slug}|{lastmod}\n".format(**entry).encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def lastmod(self):
+        return max((e["lastmod"] for e in self.entries if e["lastmod"]), default=None)
 
 
-def _iter_urls(qs, only_fields, lastmod_attr):
-    for obj in qs.only(*only_fields).batch_size(BATCH_SIZE).no_cache().timeout(False):
-        lastmod = getattr(obj, lastmod_attr)
+def _iter_entries(qs, only_fields, lastmod_attr):
+    """Iterate over the raw (id, slug, lastmod) of the objects, sorted by id"""
+    slug_field = qs._document._fields["slug"].db_field
+    lastmod_field = qs._document._fields[lastmod_attr].db_field
+    qs = qs.only(*only_fields).order_by("id").batch_size(BATCH_SIZE).no_cache().timeout(False)
+    for raw in qs.as_pymongo():
         yield {
-            "loc": obj.self_web_url(),
-            "lastmod": lastmod.strftime("%Y-%m-%dT%H:%M:%SZ") if lastmod else None,
+            "_id": raw["_id"],
+            "slug": raw.get(slug_field),
+            "lastmod": format_lastmod(raw.get(lastmod_field)),
         }
 
 
-def _iter_chunks(urls, size):
-    chunk = []
-    for url in urls:
-        chunk.append(url)
-        if len(chunk) >= size:
-            yield chunk
-            chunk = []
-    if chunk:
-        yield chunk
+def _iter_shards(entries, size, starts=None):
+    """
+    Split the sorted entries into shards of at most `size` entries.
+
+    Shards keep the id ranges given by `starts` (the first id of each shard
+    during the previous run) so an object change only impacts its own shard.
+    A full shard is split and new objects are appended to the last shards.
+    """
+    starts = list(starts or [])
+    shard = Shard(starts.pop(0) if starts else None)
+    for entry in entries:
+        while starts and entry["_id"] >= starts[0]:
+            yield shard
+            shard = Shard(starts.pop(0))
+        if len(shard.entries) >= size:
+            yield shard
+            shard = Shard(entry["_id"])
+        if shard.start is None:
+            shard.start = entry["_id"]
+        shard.entries.append(entry)
+    yield shard
+    for start in starts:
+        yield Shard(start)
+
+
+def _load_manifest(bucket, key, settings):
+    """Load the previous run shards if it was generated with the same settings"""
+    try:
+        data = get_bytes(bucket, key)
+    except Exception as e:
+        current_app.logger.warning(f"Unable to load sitemap manifest: {e}")
+        return {}
+    if not data:
+        return {}
+    manifest = json.loads(data.decode("utf-8"))
+    if manifest.get("settings") != settings:
+        return {}
+    return manifest.get("shards", {})
 
 
-def generate_sitemaps():
+def generate_sitemaps(incremental=None):
+    """
+    Generate and upload the sitemaps of all visible objects.
+
+    In incremental mode (`SITEMAP_INCREMENTAL` by default), shards whose objects
+    did not change since the previous run (according to the manifest stored
+    along the sitemaps) are neither rendered nor uploaded again.
+    """
     bucket = current_app.config["SITEMAP_S3_BUCKET"]
     if not bucket:
         current_app.logger.warning("SITEMAP_S3_BUCKET not configured, skipping sitemap generation")
@@ -93,29 +182,69 @@ def generate_sitemaps():
         current_app.logger.warning("SITEMAP_BASE_URL not configured, skipping sitemap generation")
         return False
 
+    if incremental is None:
+        incremental = current_app.config["SITEMAP_INCREMENTAL"]
     prefix = current_app.config["SITEMAP_S3_FILENAME_PREFIX"].strip("/")
     max_per_file = current_app.config["SITEMAP_URLS_PER_FILE"]
+    compress = current_app.config["SITEMAP_GZIP"]
+    extension = "xml.gz" if compress else "xml"
+    manifest_key = f"{prefix}/{MANIFEST_FILENAME}"
+    # Any of those changes invalidates every shard
+    settings = {
+        "version": MANIFEST_VERSION,
+        "cdata_base_url": current_app.config["CDATA_BASE_URL"],
+        "urls_per_file": max_per_file,
+        "gzip": compress,
+    }
+    previous = _load_manifest(bucket, manifest_key, settings) if incremental else {}
 
     index_files = []
+    shards_manifest = {}
     total_urls = 0
+    uploaded = 0
 
     for config in _SITEMAP_CONFIGS:
         qs = config.model.objects
         if config.queryset_filter:
             qs = getattr(qs, config.queryset_filter)()
-        for index, chunk in enumerate(
-            _iter_chunks(_iter_urls(qs, config.only_fields, config.lastmod_attr), max_per_file), 1
-        ):
-            filename = f"{config.name}_{index}.xml"
-            store_bytes(
-                bucket,
-                f"{prefix}/{filename}",
-                render_xml("urlset", chunk, "url").encode("utf-8"),
-                ACL=S3_PUBLIC_ACL,
-                ContentType="application/xml",
+        previous_shards = previous.get(config.name, [])
+        starts = [ObjectId(s["start"]) for s in previous_shards]
+        entries = _iter_entries(qs, config.only_fields, config.lastmod_attr)
+        shards_manifest[config.name] = []
+        for index, shard in enumerate(_iter_shards(entries, max_per_file, starts), 1):
+            if not shard.entries:
+                # Keep the id range of emptied shards but don't reference them
+                if shard.start:
+                    shards_manifest[config.name].append({"start": str(shard.start), "hash": None})
+                continue
+            filename = f"{config.name}_{index}.{extension}"
+            shard_hash = shard.hash
+            unchanged = (
+                index <= len(previous_shards) and previous_shards[index - 1]["hash"] == shard_hash
+            )
+            if not unchanged:
+                urls = (
+                    {
+                        "loc": config.model._from_son(
+                            {"_id": entry["_id"], "slug": entry["slug"]}
+                        ).self_web_url(),
+                        "lastmod": entry["lastmod"],
+                    }
+                    for entry in shard.entries
+                )
+                store_bytes(
+                    bucket,
+                    f"{prefix}/{filename}",
+                    encode_xml("urlset", urls, "url", compress),
+                    ACL=S3_PUBLIC_ACL,
+                    ContentType="application/gzip" if compress else "application/xml",
+                )
+                uploaded += 1
+            shards_manifest[config.name].append({"start": str(shard.start), "hash": shard_hash})
+            index_files.append(
+                {"loc": f"{base_url.rstrip('/')}/{prefix}/{filename}", "lastmod": shard.lastmod}
             )
-            index_files.append({"loc": f"{base_url.rstrip('/')}/{prefix}/{filename}"})
-            total_urls += len(chunk)
+            total_urls += len(shard.entries)
 
     store_bytes(
         bucket,
@@ -124,6 +253,14 @@ def generate_sitemaps():
         ACL=S3_PUBLIC_ACL,
         ContentType="application/xml",
     )
+    store_bytes(
+        bucket,
+        manifest_key,
+        json.dumps({"settings": settings, "shards": shards_manifest}).encode("utf-8"),
+        ContentType="application/json",
+    )
 
-    current_app.logger.info(f"Uploaded {len(index_files)} sitemap files ({total_urls} total URLs)")
+    current_app.logger.info(
+        f"Uploaded {uploaded} of {len(index_files)} sitemap files ({total_urls} total URLs)"
+    )
     return True
@@ -1,11 +1,11 @@
 import re
 
 from flask_restx import inputs
-from mongoengine.queryset.visitor import Q
 
 from udata.api import API, api
 from udata.core.dataset.api_fields import dataset_ref_fields
-from udata.i18n import _
+from udata.core.suggest import suggest
+from udata.i18n import _, get_locale
 from udata.models import Dataset
 
 from .api_fields import (
@@ -14,7 +14,7 @@ from .api_fields import (
     level_fields,
     zone_suggestion_fields,
 )
-from .models import GeoLevel, GeoZone, spatial_granularities
+from .models import GeoLevel, GeoZone, get_spatial_coverage, spatial_granularities
 
 GEOM_TYPES = ("Point", "LineString", "Polygon", "MultiPoint", "MultiLineString", "MultiPolygon")
 LEGACY_GEOID_PATTERN = r"^([a-z]+:[a-z]+:\d+)@(\d{4}-\d{2}-\d{2})$"
@@ -52,16 +52,8 @@ class SuggestZonesAPI(API):
     @api.expect(suggest_parser)
     @api.doc("suggest_zones")
     def get(self):
-        """Geospatial zones suggest endpoint using mongoDB contains"""
+        """Geospatial zones suggest endpoint using the suggestion index"""
         args = suggest_parser.parse_args()
-        geozones = GeoZone.objects(
-            Q(name__icontains=args["q"]) | Q(code__icontains=args["q"]) | Q(id__icontains=args["q"])
-        )
-
-        # We're manually sorting based on zone level int (cause we don't have the int value directly in mongo document)
-        level_id_to_int_level = {level.id: level.admin_level for level in GeoLevel.objects()}
-        geozones = sorted(geozones, key=lambda zone: level_id_to_int_level[zone.level])
-
         return [
             {
                 "id": geozone.id,
@@ -70,7 +62,7 @@ class SuggestZonesAPI(API):
                 "level": geozone.level,
                 "uri": geozone.uri,
             }
-            for geozone in geozones[: args["size"]]
+            for geozone in suggest(GeoZone, args["q"], args["size"])
         ]
 
 
@@ -154,20 +146,4 @@ class SpatialCoverageAPI(API):
     def get(self, level):
         """List each zone for a given level with their datasets count"""
         level = GeoLevel.objects.get_or_404(id=level)
-        features = []
-
-        for zone in GeoZone.objects(level=level.id):
-            features.append(
-                {
-                    "id": zone.id,
-                    "type": "Feature",
-                    "properties": {
-                        "name": _(zone.name),
-                        "code": zone.code,
-                        "uri": zone.uri,
-                        "datasets": zone.metrics.get("datasets", 0),
-                    },
-                }
-            )
-
-        return {"type": "FeatureCollection", "features": features}
+        return get_spatial_coverage(level.id, get_locale())
@@ -13,10 +13,12 @@ import slugify
 from mongoengine import errors
 from mongoengine.context_managers import switch_collection
 
+from udata.app import cache
 from udata.commands import cli
 from udata.core.dataset.models import Dataset
 from udata.core.spatial import geoids
-from udata.core.spatial.models import GeoLevel, GeoZone, SpatialCoverage
+from udata.core.spatial.models import GeoLevel, GeoZone, SpatialCoverage, get_spatial_coverage
+from udata.core.suggest import index_model
 
 log = logging.getLogger(__name__)
 
@@ -142,6 +144,12 @@ def load(geozones_file, levels_file, drop=False):
             total = load_zones(GeoZone, json_geozones)
     log.info("Loaded {total} zones".format(total=total))
 
+    cache.delete_memoized(get_spatial_coverage)
+
+    log.info("Indexing zones suggestions")
+    total = index_model(GeoZone)
+    log.info(f"Indexed {total} zones suggestions")
+
     log.info("Clean removed geozones in datasets")
     count = fixup_removed_geozone()
     log.info(f"{count} geozones removed from datasets")
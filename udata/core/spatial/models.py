@@ -2,6 +2,7 @@ import geojson
 from mongoengine import EmbeddedDocument
 from mongoengine.errors import ValidationError
 from mongoengine.fields import IntField, ListField, MultiPolygonField, ReferenceField, StringField
+from pymongo import UpdateOne
 from werkzeug.local import LocalProxy
 from werkzeug.utils import cached_property
 
@@ -17,6 +18,9 @@ from .constants import ADMIN_LEVEL_MAX, ADMIN_LEVEL_MIN, BASE_GRANULARITIES
 
 __all__ = ("GeoLevel", "GeoZone", "SpatialCoverage", "spatial_granularities")
 
+# Coverages only change when zones are loaded or their counts recomputed, which clears them
+COVERAGE_CACHE_TIMEOUT = 24 * 60 * 60
+
 
 class GeoLevel(Document):
     id = StringField(primary_key=True)
@@ -98,6 +102,7 @@ class GeoZone(WithMetrics, Document[GeoZoneQuerySet]):
         return None
 
     def count_datasets(self):
+        """Count the visible datasets of this zone, see `count_geozones_datasets` for all zones"""
         from udata.models import Dataset
 
         self.metrics["datasets"] = Dataset.objects(spatial__zones=self.id).visible().count()
@@ -136,6 +141,66 @@ def get_spatial_admin_levels():
 admin_levels = LocalProxy(get_spatial_admin_levels)
 
 
+def count_geozones_datasets(drop=False):
+    """
+    Update the visible datasets count of every zone with a single aggregation.
+
+    Only the zones whose count changed are written.
+    If `drop` is True, zones metrics are cleared first.
+    Returns the number of updated zones.
+    """
+    from udata.models import Dataset
+
+    visible_with_zones = Dataset.objects.visible().filter(spatial__zones__0__exists=True)
+    counts = {
+        result["_id"]: result["count"]
+        for result in visible_with_zones.aggregate(
+            # A zone listed twice in a dataset still counts once
+            {"$project": {"zones": {"$setUnion": ["$spatial.zones", []]}}},
+            {"$unwind": "$zones"},
+            {"$group": {"_id": "$zones", "count": {"$sum": 1}}},
+        )
+    }
+    collection = GeoZone._get_collection()
+    if drop:
+        collection.update_many({}, {"$set": {"metrics": {}}})
+    operations = [
+        UpdateOne({"_id": zone["_id"]}, {"$set": {"metrics.datasets": counts.get(zone["_id"], 0)}})
+        for zone in collection.find({}, {"metrics.datasets": 1})
+        if zone.get("metrics", {}).get("datasets") != counts.get(zone["_id"], 0)
+    ]
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    cache.delete_memoized(get_spatial_coverage)
+    return len(operations)
+
+
+@cache.memoize(timeout=COVERAGE_CACHE_TIMEOUT)
+def get_spatial_coverage(level, lang):
+    """The zones of a level with their datasets count, as a GeoJSON FeatureCollection"""
+    zones = (
+        GeoZone.objects(level=level)
+        .only("id", "name", "code", "uri", "metrics")
+        .order_by("id")
+        .as_pymongo()
+    )
+    with language(lang):
+        features = [
+            {
+                "id": zone["_id"],
+                "type": "Feature",
+                "properties": {
+                    "name": _(zone["name"]),
+                    "code": zone["code"],
+                    "uri": zone.get("uri"),
+                    "datasets": zone.get("metrics", {}).get("datasets", 0),
+                },
+            }
+            for zone in zones
+        ]
+    return {"type": "FeatureCollection", "features": features}
+
+
 @generate_fields()
 class SpatialCoverage(EmbeddedDocument):
     """Represent a spatial coverage as a list of territories and/or a geometry."""
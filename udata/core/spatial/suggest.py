@@ -0,0 +1,17 @@
+from udata.core import suggest
+
+from .constants import ADMIN_LEVEL_MAX
+from .models import GeoZone, admin_levels
+
+__all__ = ("GeoZoneSuggest",)
+
+
+@suggest.register
+class GeoZoneSuggest(suggest.SuggestAdapter):
+    model = GeoZone
+    fields = ("name", "code", "id")
+
+    @classmethod
+    def score(cls, zone: GeoZone):
+        # Widest zones (lowest administrative levels) first
+        return -(admin_levels.get(zone.level) or ADMIN_LEVEL_MAX)
@@ -1,8 +1,8 @@
-from udata.core.spatial.models import GeoZone
+from udata.core.spatial.models import count_geozones_datasets
 from udata.tasks import job
 
 
 @job("compute-geozones-metrics")
 def compute_geozones_metrics(self):
-    for geozone in GeoZone.objects.timeout(False):
-        geozone.count_datasets()
+    count = count_geozones_datasets()
+    self.log.info("Updated %d geozones datasets count", count)
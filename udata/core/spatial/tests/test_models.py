@@ -1,9 +1,10 @@
 from datetime import timedelta
 
+from udata.core.dataset.factories import DatasetFactory, HiddenDatasetFactory
 from udata.tests.api import DBTestCase
 
-from ..factories import GeoZoneFactory
-from ..models import GeoZone, SpatialCoverage
+from ..factories import GeoZoneFactory, SpatialCoverageFactory
+from ..models import GeoZone, SpatialCoverage, count_geozones_datasets
 
 A_YEAR = timedelta(days=365)
 
@@ -29,3 +30,26 @@ class SpatialTemporalResolutionTest(DBTestCase):
         result = GeoZone.objects.resolve(geoid, id_only=True)
 
         self.assertEqual(result, zone.id)
+
+
+class CountGeozonesDatasetsTest(DBTestCase):
+    def test_count_visible_datasets(self):
+        paris = GeoZoneFactory()
+        arles = GeoZoneFactory()
+        empty = GeoZoneFactory(metrics={"datasets": 4})
+        unchanged = GeoZoneFactory(metrics={"datasets": 0})
+
+        for _ in range(3):
+            DatasetFactory(spatial=SpatialCoverageFactory(zones=[paris.id]))
+        DatasetFactory(spatial=SpatialCoverageFactory(zones=[paris.id, arles.id, arles.id]))
+        HiddenDatasetFactory(spatial=SpatialCoverageFactory(zones=[arles.id]))
+
+        # Paris, Arles and the emptied zone
+        self.assertEqual(count_geozones_datasets(), 3)
+
+        self.assertEqual(paris.reload().metrics["datasets"], 4)
+        self.assertEqual(arles.reload().metrics["datasets"], 1)
+        self.assertEqual(empty.reload().metrics["datasets"], 0)
+        self.assertEqual(unchanged.reload().metrics["datasets"], 0)
+
+        self.assertEqual(count_geozones_datasets(), 0)
@@ -1,16 +1,34 @@
+import collections
 import io
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 
-from flask import json
+from botocore.exceptions import BotoCoreError, ClientError
+from flask import current_app, json
+from flask_storage.backends.s3 import S3Backend
+from flask_storage.errors import FileExists, UnauthorizedFileType
 from werkzeug.datastructures import FileStorage
 
 from udata.api import api, fields
 
 from . import chunks, utils
 
+log = logging.getLogger(__name__)
+
 META = "meta.json"
 
+# S3 refuses the parts of a multipart upload smaller than that, except for the last one
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10000
+# Maximum number of keys S3 deletes in a single request
+S3_MAX_DELETE = 1000
+# Number of parts copied at once when assembling a chunked upload on S3
+S3_COPY_WORKERS = 8
+# Size of the blocks digested out of an upload assembled on S3
+DIGEST_BLOCK_SIZE = 1024 * 1024
+
 IMAGES_MIMETYPES = ("image/jpeg", "image/png", "image/webp")
 
 
@@ -115,35 +133,154 @@ def save_chunk(file, args):
 class ChunksReader(io.RawIOBase):
     """A read-only stream over the parts of a chunked upload, in order.
 
-    Parts are fetched one at a time so a single chunk sits in memory at any
-    point: the destination storage pulls from this stream instead of being
-    handed the whole reassembled file.
+    While a part is read, the `prefetch` next ones are fetched in a background thread,
+    so at most `prefetch + 1` chunks (the one being read and the ones fetched ahead) sit
+    in memory at any point: the destination storage pulls from this stream instead of
+    being handed the whole reassembled file.
+    Parts are handed over through a `memoryview`, without copying what remains of them.
     """
 
-    def __init__(self, uuid, totalparts):
+    def __init__(self, uuid, totalparts, prefetch=1):
         self.uuid = uuid
         self.totalparts = totalparts
+        self.prefetch = prefetch
         self.next_part = 0
-        self.buffer = b""
+        self.buffer = memoryview(b"")
+        self.fetching = collections.deque()
+        self.executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
 
     def readable(self):
         return True
 
-    def readinto(self, target):
-        while not self.buffer and self.next_part < self.totalparts:
-            self.buffer = chunks.read(chunk_filename(self.uuid, self.next_part))
+    def fetch_part(self):
+        """The content of the next part, keeping the following ones being fetched"""
+        if self.executor is None:
             self.next_part += 1
+            return chunks.read(chunk_filename(self.uuid, self.next_part - 1))
+        while self.next_part < self.totalparts and len(self.fetching) <= self.prefetch:
+            filename = chunk_filename(self.uuid, self.next_part)
+            self.fetching.append(self.executor.submit(chunks.read, filename))
+            self.next_part += 1
+        return self.fetching.popleft().result()
+
+    def readinto(self, target):
+        while not self.buffer and (self.fetching or self.next_part < self.totalparts):
+            # Release the consumed part before waiting for the next one
+            self.buffer = memoryview(b"")
+            self.buffer = memoryview(self.fetch_part())
 
         size = min(len(target), len(self.buffer))
         target[:size] = self.buffer[:size]
         self.buffer = self.buffer[size:]
         return size
 
+    def close(self):
+        if self.executor is not None:
+            for future in self.fetching:
+                future.cancel()
+            self.executor.shutdown(wait=False)
+        super().close()
+
+
+def assemble_chunks_on_s3(storage, uuid, totalparts, filename, prefix=None):
+    """Store the parts of a chunked upload into `storage` with a S3 multipart copy.
+
+    The file is assembled server-side by S3, but the parts are still downloaded
+    through the worker to compute the file checksum: only the upload back is saved.
+    Returns the stored file infos, or `None` when the parts can't be assembled this way
+    (storages on different services, parts too small...) and have to be streamed.
+    """
+    source, target = chunks.backend, storage.backend
+    if not isinstance(source, S3Backend) or not isinstance(target, S3Backend):
+        return None
+    if source.config.endpoint != target.config.endpoint or totalparts > S3_MAX_PARTS:
+        return None
+
+    # Same checks and naming as `Storage.save`
+    if not storage.file_allowed(None, filename):
+        raise UnauthorizedFileType()
+    if prefix:
+        filename = "/".join((prefix() if callable(prefix) else prefix, filename))
+    if storage.upload_to:
+        upload_to = storage.upload_to() if callable(storage.upload_to) else storage.upload_to
+        filename = "/".join((upload_to, filename))
+    if not storage.overwrite and storage.exists(filename):
+        raise FileExists(filename)
+
+    keys = [chunks._prefixed(chunk_filename(uuid, part)) for part in range(totalparts)]
+    key = storage._prefixed(filename)
+    extra_args = target.get_object_extra_args(key)
+    # Copied parts are assembled as-is: no checksum is asked for the multipart upload
+    extra_args.pop("ChecksumAlgorithm", None)
+    client = target.client
+    upload_id = None
+    completed = False
+
+    def part_size(source_key):
+        response = source.client.head_object(Bucket=source.bucket.name, Key=source_key)
+        return response["ContentLength"]
+
+    def copy_part(number, source_key):
+        result = client.upload_part_copy(
+            Bucket=target.bucket.name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=number,
+            CopySource={"Bucket": source.bucket.name, "Key": source_key},
+        )["CopyPartResult"]
+        return {"PartNumber": number, "ETag": result["ETag"]}
+
+    executor = ThreadPoolExecutor(max_workers=S3_COPY_WORKERS)
+    try:
+        sizes = list(executor.map(part_size, keys))
+        if any(size < S3_MIN_PART_SIZE for size in sizes[:-1]):
+            return None
+        upload_id = client.create_multipart_upload(
+            Bucket=target.bucket.name, Key=key, **extra_args
+        )["UploadId"]
+        copies = [executor.submit(copy_part, n, k) for n, k in enumerate(keys, start=1)]
+        prefetch = current_app.config["UPLOAD_CHUNKS_PREFETCH"]
+        with io.BufferedReader(ChunksReader(uuid, totalparts, prefetch)) as source_stream:
+            stream = utils.MeasuredStream(source_stream)
+            while stream.read(DIGEST_BLOCK_SIZE):
+                pass
+        parts = [copy.result() for copy in copies]
+        client.complete_multipart_upload(
+            Bucket=target.bucket.name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+        completed = True
+    except (ClientError, BotoCoreError):
+        log.exception("Unable to assemble upload %s on S3, streaming it instead", uuid)
+        return None
+    finally:
+        executor.shutdown(cancel_futures=True)
+        if upload_id is not None and not completed:
+            try:
+                client.abort_multipart_upload(
+                    Bucket=target.bucket.name, Key=key, UploadId=upload_id
+                )
+            except (ClientError, BotoCoreError):
+                log.exception("Unable to abort the multipart upload of %s", uuid)
+    return utils.stored_file_infos(storage, filename, stream)
+
 
 def discard_chunks(uuid, totalparts):
-    for part in range(totalparts):
-        chunks.delete(chunk_filename(uuid, part))
-    chunks.delete(chunk_filename(uuid, META))
+    filenames = [chunk_filename(uuid, part) for part in range(totalparts)]
+    filenames.append(chunk_filename(uuid, META))
+    backend = chunks.backend
+    if not isinstance(backend, S3Backend):
+        for filename in filenames:
+            chunks.delete(filename)
+        return
+    keys = [chunks._prefixed(filename) for filename in filenames]
+    for start in range(0, len(keys), S3_MAX_DELETE):
+        backend.client.delete_objects(
+            Bucket=backend.bucket.name,
+            Delete={"Objects": [{"Key": key} for key in keys[start : start + S3_MAX_DELETE]]},
+        )
 
 
 def handle_upload(storage, prefix=None):
@@ -157,15 +294,22 @@ def handle_upload(storage, prefix=None):
             save_chunk(uploaded_file, args)
         # Normalize filename including extension
         filename = utils.normalize(args["filename"])
-        source = io.BufferedReader(ChunksReader(args["uuid"], args["totalparts"]))
+        infos = None
+        if current_app.config["UPLOAD_CHUNKS_S3_COPY"]:
+            infos = assemble_chunks_on_s3(
+                storage, args["uuid"], args["totalparts"], filename, prefix=prefix
+            )
+        if infos is None:
+            prefetch = current_app.config["UPLOAD_CHUNKS_PREFETCH"]
+            reader = ChunksReader(args["uuid"], args["totalparts"], prefetch)
+            with io.BufferedReader(reader) as source:
+                infos = utils.save_upload(storage, source, filename, prefix=prefix)
     elif not uploaded_file:
         raise UploadError("Missing file parameter")
     else:
         # Normalize filename including extension
         filename = utils.normalize(uploaded_file.filename)
-        source = uploaded_file
-
-    infos = utils.save_upload(storage, source, filename, prefix=prefix)
+        infos = utils.save_upload(storage, uploaded_file, filename, prefix=prefix)
 
     if is_chunk:
         # Chunks are dropped once the whole file made it to its destination, so
@@ -0,0 +1,149 @@
+import logging
+import re
+from datetime import UTC, datetime
+
+from flask import current_app
+from mongoengine.signals import post_delete, post_save
+from pymongo import UpdateOne
+
+from .models import SuggestEntry, prefixes, tokenize
+
+log = logging.getLogger(__name__)
+
+adapter_catalog = {}
+
+BATCH_SIZE = 1000
+
+
+class SuggestAdapter:
+    """This class allow to describe and customize the suggest behavior."""
+
+    model = None
+    # The attributes whose words are suggested
+    fields = ()
+
+    @classmethod
+    def queryset(cls):
+        """The suggestible objects"""
+        return cls.model.objects
+
+    @classmethod
+    def is_suggestible(cls, document):
+        return True
+
+    @classmethod
+    def score(cls, document):
+        """The popularity of a suggestion, the most popular ones come first"""
+        return 0
+
+
+def entry_for(adapter, document):
+    """Build the raw suggestion index entry of a document"""
+    texts = [getattr(document, field, None) or "" for field in adapter.fields]
+    words = [word for text in texts for word in tokenize(text)]
+    return {
+        "classname": adapter.model.__name__,
+        "object_id": str(document.id),
+        "text": " ".join(words),
+        "prefixes": prefixes(words, current_app.config["SUGGEST_PREFIX_MAX_LENGTH"]),
+        "score": float(adapter.score(document) or 0),
+    }
+
+
+def _upsert(entry, indexed_at):
+    return UpdateOne(
+        {"classname": entry["classname"], "object_id": entry["object_id"]},
+        {"$set": dict(entry, indexed_at=indexed_at)},
+        upsert=True,
+    )
+
+
+def index_document(document):
+    """Add, update or remove a document from the suggestion index"""
+    adapter = adapter_catalog[type(document)]
+    if not adapter.is_suggestible(document):
+        unindex_document(document)
+        return
+    collection = SuggestEntry._get_collection()
+    collection.bulk_write([_upsert(entry_for(adapter, document), datetime.now(UTC))])
+
+
+def unindex_document(document):
+    SuggestEntry.objects(classname=type(document).__name__, object_id=str(document.id)).delete()
+
+
+def index_model(model):
+    """
+    (Re)Build the suggestion index of a model.
+
+    Scores are refreshed along the way: metrics updates don't trigger a reindexation.
+    """
+    adapter = adapter_catalog[model]
+    collection = SuggestEntry._get_collection()
+    started = datetime.now(UTC)
+    operations = []
+    count = 0
+    for document in adapter.queryset().no_cache().batch_size(BATCH_SIZE):
+        if not adapter.is_suggestible(document):
+            continue
+        operations.append(_upsert(entry_for(adapter, document), started))
+        if len(operations) >= BATCH_SIZE:
+            collection.bulk_write(operations, ordered=False)
+            operations = []
+        count += 1
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    SuggestEntry.objects(classname=model.__name__, indexed_at__lt=started).delete()
+    return count
+
+
+def suggest(model, q, size=10):
+    """
+    Suggest the most popular objects of a model having words starting with the query ones.
+
+    Results are returned ordered by descending score.
+    """
+    adapter = adapter_catalog[model]
+    words = tokenize(q)
+    if not words or size <= 0:
+        return []
+    max_length = current_app.config["SUGGEST_PREFIX_MAX_LENGTH"]
+    entries = SuggestEntry.objects(
+        classname=model.__name__, prefixes__all=[word[:max_length] for word in words]
+    )
+    for word in words:
+        if len(word) > max_length:
+            # Longer words are indexed truncated, check the whole word on the matching entries
+            entries = entries.filter(text=re.compile(r"(^| ){0}".format(re.escape(word))))
+    ids = [entry.object_id for entry in entries.only("object_id").order_by("-score").limit(size)]
+    objects = {str(obj.id): obj for obj in adapter.queryset().filter(id__in=ids)}
+    return [objects[id] for id in ids if id in objects]
+
+
+def index_on_save(sender, document, **kwargs):
+    """(Re/Un)Index Mongo document suggestions on post_save"""
+    if "post_save" in kwargs.get("ignores", []):
+        return
+    index_document(document)
+
+
+def unindex_on_delete(sender, document, **kwargs):
+    """Unindex Mongo document suggestions on post_delete"""
+    unindex_document(document)
+
+
+def register(adapter):
+    """Register a suggest adapter"""
+    if adapter.model and adapter.model not in adapter_catalog:
+        adapter_catalog[adapter.model] = adapter
+        post_save.connect(index_on_save, sender=adapter.model)
+        post_delete.connect(unindex_on_delete, sender=adapter.model)
+    return adapter
+
+
+def init_app(app):
+    # Side-effect imports to register suggest adapters
+    import udata.core.dataset.suggest  # noqa
+    import udata.core.organization.suggest  # noqa
+    import udata.core.reuse.suggest  # noqa
+    import udata.core.spatial.suggest  # noqa
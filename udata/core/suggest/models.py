@@ -0,0 +1,51 @@
+import re
+import unicodedata
+
+from mongoengine.fields import DateTimeField, FloatField, ListField, StringField
+
+from udata.mongo.document import UDataDocument as Document
+
+__all__ = ("SuggestEntry",)
+
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Lower case and fold accents so that `Ministère` and `ministere` match"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    """Split a text into its normalized words"""
+    return WORD_RE.findall(normalize(text))
+
+
+def prefixes(words, max_length):
+    """All the prefixes of some words, truncated to `max_length`"""
+    return sorted({word[:i] for word in words for i in range(1, min(len(word), max_length) + 1)})
+
+
+class SuggestEntry(Document):
+    """
+    The suggestion index entry of an object.
+
+    Objects are matched on the prefixes of the normalized words of their texts
+    and ranked by a popularity score, both precomputed on save.
+    """
+
+    classname = StringField(required=True)
+    object_id = StringField(required=True)
+    text = StringField()
+    prefixes = ListField(StringField())
+    score = FloatField(default=0)
+    indexed_at = DateTimeField()
+
+    meta = {
+        "collection": "suggest_entries",
+        "indexes": [
+            {"fields": ["classname", "object_id"], "unique": True},
+            ("classname", "prefixes", "-score"),
+            ("classname", "indexed_at"),
+        ],
+    }
@@ -0,0 +1,13 @@
+from udata.mongo import db
+from udata.tasks import job
+
+from . import adapter_catalog, index_model
+
+
+@job("index-suggestions")
+def index_suggestions(self, *classnames):
+    """(Re)Build the suggestion index, refreshing the popularity scores"""
+    models = [db.resolve_model(classname) for classname in classnames] or list(adapter_catalog)
+    for model in models:
+        count = index_model(model)
+        self.log.info("Indexed %d %s suggestions", count, model.__name__)
@@ -27,5 +27,4 @@ class SuggestTagsAPI(API):
         """Suggest tags"""
         args = parser.parse_args()
         q = slug(args["q"])
-        results = [{"text": i.name} for i in Tag.objects(name__icontains=q).limit(args["size"])]
-        return sorted(results, key=lambda o: len(o["text"]))
+        return [{"text": tag.name} for tag in Tag.objects.top(args["size"], prefix=q).only("name")]
@@ -15,3 +15,4 @@ class TagCsvAdapter(csv.Adapter):
         counts("reuses"),
         "total",
     )
+    requires = ("counts",)
@@ -3,6 +3,7 @@ import logging
 from mongoengine.fields import DictField, IntField, StringField
 
 from udata.mongo.document import UDataDocument as Document
+from udata.mongo.queryset import UDataQuerySet
 
 log = logging.getLogger(__name__)
 
@@ -10,9 +11,19 @@ log = logging.getLogger(__name__)
 __all__ = ("Tag",)
 
 
-class Tag(Document):
+class TagQuerySet(UDataQuerySet):
+    def top(self, size=None, prefix=None):
+        """The most used tags, optionally only the ones starting with `prefix`"""
+        tags = self(total__gt=0)
+        if prefix:
+            tags = tags(name__startswith=prefix)
+        tags = tags.order_by("-total")
+        return tags.limit(size) if size else tags
+
+
+class Tag(Document[TagQuerySet]):
     """
-    This collection is auto-populated every hour map-reducing tag properties
+    This collection is auto-populated every hour aggregating tag counts
     from Datasets dans Reuses.
     """
 
@@ -25,6 +36,7 @@ class Tag(Document):
         "ordering": [
             "-total",
         ],
+        "queryset_class": TagQuerySet,
     }
 
     def clean(self):
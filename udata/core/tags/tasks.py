@@ -1,4 +1,7 @@
 import logging
+from collections import defaultdict
+
+from pymongo import UpdateOne
 
 from udata.models import Dataset, Reuse
 from udata.tasks import job
@@ -7,37 +10,48 @@ from .models import Tag
 
 log = logging.getLogger(__name__)
 
-map_tags = """
-function() {
-    this.tags.forEach(function(tag) {
-        emit(tag, 1);
-    });
-}
-"""
-
-reduce_tags = """
-function(key, values) {
-    var total = 0;
-    for(var i = 0; i < values.length; i++) {
-        total += values[i];
-    }
-    return total;
-}
-"""
-
 TAGGED = {
     "datasets": Dataset,
     "reuses": Reuse,
 }
 
 
+def aggregate_tags(model):
+    """Count tag occurences for a given model"""
+    return model.objects(tags__exists=True).aggregate(
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+    )
+
+
 @job("count-tags")
 def count_tags(self):
     """Count tag occurences by type and update the tag collection"""
+    counts = defaultdict(lambda: dict.fromkeys(TAGGED, 0))
     for key, model in TAGGED.items():
-        collection = "{0}_tags".format(key)
-        results = model.objects(tags__exists=True).map_reduce(map_tags, reduce_tags, collection)
-        for result in results:
-            tag, _ = Tag.objects.get_or_create(name=result.key)
-            tag.counts[key] = int(result.value) if result.value else 0
-            tag.save()
+        for result in aggregate_tags(model):
+            counts[result["_id"]][key] = result["count"]
+
+    collection = Tag._get_collection()
+    operations = []
+    for tag in collection.find({}, {"name": 1, "counts": 1, "total": 1}):
+        # Tags which are not used anymore are zeroed
+        tag_counts = counts.pop(tag["name"], dict.fromkeys(TAGGED, 0))
+        if tag.get("counts") != tag_counts or tag.get("total") != sum(tag_counts.values()):
+            operations.append(
+                UpdateOne(
+                    {"_id": tag["_id"]},
+                    {"$set": {"counts": tag_counts, "total": sum(tag_counts.values())}},
+                )
+            )
+    for name, tag_counts in counts.items():
+        operations.append(
+            UpdateOne(
+                {"name": name},
+                {"$set": {"counts": tag_counts, "total": sum(tag_counts.values())}},
+                upsert=True,
+            )
+        )
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    log.info("Updated %d tags", len(operations))
@@ -25,8 +25,7 @@ from udata.mongo.document import UDataDocument as Document
 from udata.mongo.errors import FieldValidationError
 from udata.mongo.extras_fields import ExtrasField
 from udata.mongo.slug_fields import SlugField
-from udata.search import reindex
-from udata.tasks import as_task_param
+from udata.search import request_reindex
 from udata.uris import cdata_url
 
 __all__ = ("Topic", "TopicElement")
@@ -103,7 +102,7 @@ class TopicElement(Auditable, Document):
         # Call parent post_save for Auditable functionality
         super().post_save(sender, document, **kwargs)
         if document.topic and document.element and hasattr(document.element, "id"):
-            reindex.delay(*as_task_param(document.element))
+            request_reindex(document.element)
         if document.topic:
             document.topic.save()
 
@@ -112,7 +111,7 @@ class TopicElement(Auditable, Document):
         """Trigger reindex when element is deleted"""
         try:
             if document.topic and document.element and hasattr(document.element, "id"):
-                reindex.delay(*as_task_param(document.element))
+                request_reindex(document.element)
             if document.topic:
                 document.topic.save()
         except DoesNotExist:
@@ -1,5 +1,6 @@
 from udata.core.dataservices.models import Dataservice
 from udata.core.followers.signals import on_follow, on_unfollow
+from udata.core.metrics import request_metrics_update
 from udata.core.owned import Owned
 from udata.models import Dataset, Reuse, User
 
@@ -9,7 +10,7 @@ from udata.models import Dataset, Reuse, User
 @Dataset.on_delete.connect
 def update_datasets_metrics(document, **kwargs):
     if document.owner:
-        document.owner.count_datasets()
+        request_metrics_update(document.owner, "datasets")
 
 
 @Reuse.on_create.connect
@@ -17,7 +18,7 @@ def update_datasets_metrics(document, **kwargs):
 @Reuse.on_delete.connect
 def update_reuses_metrics(document, **kwargs):
     if document.owner:
-        document.owner.count_reuses()
+        request_metrics_update(document.owner, "reuses")
 
 
 @Dataservice.on_create.connect
@@ -25,7 +26,7 @@ def update_reuses_metrics(document, **kwargs):
 @Dataservice.on_delete.connect
 def update_dataservices_metrics(document, **kwargs):
     if document.owner:
-        document.owner.count_dataservices()
+        request_metrics_update(document.owner, "dataservices")
 
 
 @on_follow.connect
@@ -39,8 +40,8 @@ def update_owner_metrics(document, previous, **kwargs):
     if not isinstance(previous, User):
         return
     if isinstance(document, Dataset):
-        previous.count_datasets()
+        request_metrics_update(previous, "datasets")
     elif isinstance(document, Reuse):
-        previous.count_reuses()
+        request_metrics_update(previous, "reuses")
     elif isinstance(document, Dataservice):
-        previous.count_dataservices()
+        request_metrics_update(previous, "dataservices")
@@ -25,12 +25,12 @@ class BaseQuerySet(QuerySet):
         obj = self.first()
         return obj if obj else abort(404, message) if message else abort(404)
 
-    def paginate(self, page, per_page, **kwargs):
+    def paginate(self, page, per_page, total=None, **kwargs):
         """
         Paginate the QuerySet with a certain number of docs per page
         and return docs for a given page.
         """
-        return Pagination(self, page, per_page)
+        return Pagination(self, page, per_page, total=total)
 
     def paginate_field(self, field_name, doc_id, page, per_page, total=None):
         """
@@ -5,7 +5,7 @@ from mongoengine.queryset import QuerySet
 
 
 class Pagination(object):
-    def __init__(self, iterable, page, per_page):
+    def __init__(self, iterable, page, per_page, total=None):
         if page < 1 or per_page < 1:
             abort(404)
 
@@ -13,7 +13,10 @@ class Pagination(object):
         self.page = page
         self.per_page = per_page
 
-        if isinstance(iterable, QuerySet):
+        if total is not None:
+            # Precomputed (possibly cached or estimated) total
+            self.total = total
+        elif isinstance(iterable, QuerySet):
             self.total = iterable.count()
         else:
             self.total = len(iterable)
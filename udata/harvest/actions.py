@@ -5,6 +5,7 @@ from datetime import UTC, datetime, timedelta
 
 from bson import ObjectId
 from flask import current_app
+from mongoengine import Q
 
 from udata.auth import current_user
 from udata.core.dataservices.models import Dataservice
@@ -137,7 +138,7 @@ def purge_jobs():
     expiration = datetime.now(UTC) - timedelta(days=retention)
 
     jobs_with_external_files = HarvestJob.objects(
-        data__filename__exists=True, created__lt=expiration
+        Q(data__filename__exists=True) | Q(data__pages__exists=True), created__lt=expiration
     )
     for job in jobs_with_external_files:
         bucket = current_app.config.get("HARVEST_GRAPHS_S3_BUCKET")
@@ -147,7 +148,10 @@ def purge_jobs():
             )
             break
 
-        delete_file(bucket, job.data["filename"])
+        if "filename" in job.data:
+            delete_file(bucket, job.data["filename"])
+        for page in job.data.get("pages", []):
+            delete_file(bucket, page["filename"])
 
     return HarvestJob.objects(created__lt=expiration).delete()
 
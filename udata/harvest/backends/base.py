@@ -1,6 +1,12 @@
+import contextvars
+import hashlib
+import json
 import logging
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, date, datetime, timedelta
+from typing import Callable, Iterable
 from uuid import UUID
 
 import requests
@@ -14,7 +20,7 @@ from udata.core.dataservices.models import HarvestMetadata as HarvestDataservice
 from udata.core.dataset.models import HarvestDatasetMetadata
 from udata.http import ssrf_session
 from udata.models import Dataset, User
-from udata.utils import raise_if_redirect, safe_unicode
+from udata.utils import get_udata_version, raise_if_redirect, safe_unicode, to_naive_datetime
 
 from ..exceptions import HarvestException, HarvestSkipException, HarvestValidationError
 from ..models import (
@@ -32,6 +38,9 @@ log = logging.getLogger(__name__)
 # Disable those annoying warnings
 requests.packages.urllib3.disable_warnings()
 
+# Marks a remote ID which has not been prefetched
+NOT_PREFETCHED = object()
+
 
 class HarvestFilter(object):
     TYPES = {
@@ -109,7 +118,7 @@ class BaseBackend(object):
     # Extra configs are public, don't store sensitive information
     extra_configs = tuple()
 
-    def __init__(self, source_or_job, dryrun=False, max_items=None):
+    def __init__(self, source_or_job, dryrun=False, max_items=None, workers=None):
         if isinstance(source_or_job, HarvestJob):
             self.source = source_or_job.source
             self.job = source_or_job
@@ -118,6 +127,12 @@ class BaseBackend(object):
             self.job = None
         self.dryrun = dryrun
         self.max_items = max_items or current_app.config["HARVEST_MAX_ITEMS"]
+        self.workers = workers or current_app.config["HARVEST_ITEMS_WORKERS"]
+        # Guards the state shared by items processed concurrently
+        self.lock = threading.RLock()
+        # Existing objects loaded in batch by remote ID, see `prefetch_datasets`
+        self.prefetched_datasets = {}
+        self.prefetched_dataservices = {}
         # Harvest source URLs are user-supplied: fetch them through the
         # SSRF-guarded session.
         self.session = ssrf_session()
@@ -185,6 +200,25 @@ class BaseBackend(object):
     def inner_process_dataservice(self, item: HarvestItem) -> Dataservice:
         raise NotImplementedError
 
+    def dataset_fingerprint(self, item: HarvestItem, **kwargs) -> str | None:
+        """
+        A stable hash of the remote content of a dataset item, see `fingerprint`.
+
+        When it matches the one stored on the existing dataset, the dataset is not
+        processed again. Backends not overriding it process every dataset.
+        """
+        return None
+
+    def fingerprint(self, content: str) -> str:
+        """
+        Hash some remote content along with everything else changing the harvested result:
+        the udata version (ie. the mapping code), the backend and the source configuration.
+        """
+        context = json.dumps(
+            [get_udata_version(), self.name, self.source.config], sort_keys=True, default=str
+        )
+        return hashlib.sha256(f"{context}\n{content}".encode("utf-8")).hexdigest()
+
     def harvest(self):
         log.debug(f"Starting harvesting {self.source.name} ({self.source.url})…")
         factory = HarvestJob if self.dryrun else HarvestJob.objects.create
@@ -252,19 +286,29 @@ class BaseBackend(object):
 
     def process_dataset(self, remote_id: str, **kwargs):
         log.debug(f"Processing dataset {remote_id}…")
+        self.process_dataset_item(self.start_item(remote_id), **kwargs)
 
-        # TODO add `type` to `HarvestItem` to differentiate `Dataset` from `Dataservice`
-        item = self.add_item(
-            HarvestItem(status="started", started=datetime.now(UTC), remote_id=remote_id)
-        )
+    def process_datasets(self, entries: Iterable[tuple[str, dict]]) -> None:
+        """
+        Process datasets given as `(remote_id, kwargs)` pairs,
+        concurrently if the backend has more than one worker.
+        Stops when the max items is reached.
+        """
+        self.process_items(entries, self.process_dataset_item)
 
+    def process_dataset_item(self, item: HarvestItem, **kwargs) -> None:
         log_catcher = LogCatcher()
 
         try:
-            if not remote_id:
+            if not item.remote_id:
                 raise HarvestSkipException("missing identifier")
 
             current_app.logger.addHandler(log_catcher)
+
+            fingerprint = self.dataset_fingerprint(item, **kwargs)
+            if fingerprint and self.skip_unchanged_dataset(item, fingerprint):
+                return
+
             dataset = self.inner_process_dataset(item, **kwargs)
             if dataset.harvest:
                 item.remote_url = dataset.harvest.remote_url
@@ -274,6 +318,7 @@ class BaseBackend(object):
             self.ensure_unique_remote_id(item)
 
             dataset.harvest = self.update_dataset_harvest_info(dataset.harvest, item.remote_id)
+            dataset.harvest.fingerprint = fingerprint
             dataset.archived = None
 
             # TODO: Apply editable mappings
@@ -313,7 +358,40 @@ class BaseBackend(object):
                 HarvestLog(level=record.levelname, message=record.getMessage())
                 for record in log_catcher.records
             ]
-            self.save_job()
+            self.save_item(item)
+
+    def skip_unchanged_dataset(self, item: HarvestItem, fingerprint: str) -> bool:
+        """
+        Mark the item as unchanged if its existing dataset has been harvested
+        from the same remote content and has not been modified since.
+        Only the harvest date of the dataset is updated, without saving it.
+        """
+        dataset = self.get_dataset(item.remote_id)
+        harvest = dataset.harvest
+        unchanged = (
+            dataset.pk is not None
+            and harvest is not None
+            and harvest.fingerprint == fingerprint
+            and harvest.source_id == str(self.source.id)
+            and harvest.last_update is not None
+            and not dataset.archived
+            # Local edits are overwritten by a new harvest
+            and to_naive_datetime(dataset.last_modified_internal)
+            <= to_naive_datetime(harvest.last_update)
+        )
+        if not unchanged:
+            # Give the dataset back to `inner_process_dataset` instead of querying it again
+            self.prefetched_datasets[str(item.remote_id)] = dataset if dataset.pk else None
+            return False
+
+        self.ensure_unique_remote_id(item)
+        harvest.last_update = datetime.now(UTC)
+        if not self.dryrun:
+            Dataset.objects(id=dataset.id).update_one(set__harvest__last_update=harvest.last_update)
+        item.remote_url = harvest.remote_url
+        item.dataset = dataset
+        item.status = "unchanged"
+        return True
 
     def has_reached_max_items(self) -> bool:
         """Should be called after process_dataset to know if we reach the max items"""
@@ -321,11 +399,18 @@ class BaseBackend(object):
 
     def process_dataservice(self, remote_id: str, **kwargs) -> None:
         log.debug(f"Processing dataservice {remote_id}…")
+        self.process_dataservice_item(self.start_item(remote_id), **kwargs)
 
-        # TODO add `type` to `HarvestItem` to differentiate `Dataset` from `Dataservice`
-        item = self.add_item(
-            HarvestItem(status="started", started=datetime.now(UTC), remote_id=remote_id)
-        )
+    def process_dataservices(self, entries: Iterable[tuple[str, dict]]) -> None:
+        """
+        Process dataservices given as `(remote_id, kwargs)` pairs,
+        concurrently if the backend has more than one worker.
+        Stops when the max items is reached.
+        """
+        self.process_items(entries, self.process_dataservice_item)
+
+    def process_dataservice_item(self, item: HarvestItem, **kwargs) -> None:
+        remote_id = item.remote_id
 
         try:
             if not remote_id:
@@ -368,13 +453,49 @@ class BaseBackend(object):
             item.errors.append(error)
         finally:
             item.ended = datetime.now(UTC)
-            self.save_job()
+            self.save_item(item)
+
+    def start_item(self, remote_id: str) -> HarvestItem:
+        # TODO add `type` to `HarvestItem` to differentiate `Dataset` from `Dataservice`
+        return self.add_item(
+            HarvestItem(status="started", started=datetime.now(UTC), remote_id=remote_id)
+        )
+
+    def process_items(
+        self, entries: Iterable[tuple[str, dict]], process_item: Callable[..., None]
+    ) -> None:
+        """
+        Process `(remote_id, kwargs)` pairs with `process_item`.
+
+        Items are always added to the job sequentially, in order, so the max items
+        limit is respected. With more than one worker, their processing (lookup,
+        conversion and save) is then spread over a bounded thread pool.
+        """
+        if self.workers <= 1:
+            for remote_id, kwargs in entries:
+                process_item(self.start_item(remote_id), **kwargs)
+                if self.has_reached_max_items():
+                    return
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = []
+            for remote_id, kwargs in entries:
+                item = self.start_item(remote_id)
+                # Each item runs in a copy of the current context to share the application context
+                context = contextvars.copy_context()
+                futures.append(executor.submit(context.run, process_item, item, **kwargs))
+                if self.has_reached_max_items():
+                    break
+            for future in futures:
+                future.result()
 
     def ensure_unique_remote_id(self, item):
-        if item.remote_id in self.remote_ids:
-            raise HarvestValidationError(f"Identifier '{item.remote_id}' already exists")
+        with self.lock:
+            if item.remote_id in self.remote_ids:
+                raise HarvestValidationError(f"Identifier '{item.remote_id}' already exists")
 
-        self.remote_ids.add(item.remote_id)
+            self.remote_ids.add(item.remote_id)
 
     def update_dataset_harvest_info(self, harvest: HarvestDatasetMetadata | None, remote_id: str):
         if not harvest:
@@ -413,10 +534,18 @@ class BaseBackend(object):
         return harvest
 
     def add_item(self, item: HarvestItem) -> HarvestItem:
-        self.job.items.append(item)
-        self.save_job()
+        with self.lock:
+            self.job.items.append(item)
+            if not self.dryrun:
+                self.job.push_item(item)
         return item
 
+    def save_item(self, item: HarvestItem) -> None:
+        """Persist a single item of the job, without rewriting the whole job"""
+        if not self.dryrun:
+            with self.lock:
+                self.job.update_item(item)
+
     def save_job(self):
         if not self.dryrun:
             self.job.save()
@@ -471,23 +600,68 @@ class BaseBackend(object):
                 )
             )
 
+    def harvested_from_source(self, remote_id) -> dict:
+        """Raw query matching objects harvested with this remote ID from this source"""
+        return {
+            "harvest.remote_id": remote_id,
+            "$or": [
+                {"harvest.domain": self.source.domain},
+                {"harvest.source_id": str(self.source.id)},
+            ],
+        }
+
+    def prefetch_datasets(self, remote_ids: Iterable[str]) -> None:
+        """
+        Load the existing datasets matching some remote IDs (ie. a page) in batch.
+
+        `get_dataset` then uses them instead of querying each one.
+        URI remote IDs are matched whatever their source, like in `get_dataset`.
+        """
+        uri_ids, source_ids = [], []
+        for remote_id in filter(None, remote_ids):
+            remote_id = str(remote_id)
+            try:
+                uris.validate(remote_id)
+                uri_ids.append(remote_id)
+            except uris.ValidationError:
+                source_ids.append(remote_id)
+        self.prefetched_datasets = self.prefetch_harvested(Dataset, uri_ids, source_ids)
+
+    def prefetch_dataservices(self, remote_ids: Iterable[str]) -> None:
+        """
+        Load the existing dataservices matching some remote IDs (ie. a page) in batch.
+
+        `get_dataservice` then uses them instead of querying each one.
+        """
+        source_ids = [str(remote_id) for remote_id in remote_ids if remote_id]
+        self.prefetched_dataservices = self.prefetch_harvested(Dataservice, [], source_ids)
+
+    def prefetch_harvested(self, model, uri_ids: list[str], source_ids: list[str]) -> dict:
+        prefetched = dict.fromkeys([*uri_ids, *source_ids])
+        querysets = []
+        if uri_ids:
+            querysets.append(model.objects(harvest__remote_id__in=uri_ids))
+        if source_ids:
+            querysets.append(model.objects(__raw__=self.harvested_from_source({"$in": source_ids})))
+        for queryset in querysets:
+            for obj in queryset:
+                # Keep the first match in the queryset order, like `.first()` would
+                if prefetched.get(obj.harvest.remote_id) is None:
+                    prefetched[obj.harvest.remote_id] = obj
+        return prefetched
+
     def get_dataset(self, remote_id):
         """Get or create a dataset given its remote ID (and its source)
         We first try to match `source_id` to be source domain independent
         """
-        try:
-            uris.validate(remote_id)
-            dataset = Dataset.objects(harvest__remote_id=remote_id).first()
-        except uris.ValidationError:
-            dataset = Dataset.objects(
-                __raw__={
-                    "harvest.remote_id": remote_id,
-                    "$or": [
-                        {"harvest.domain": self.source.domain},
-                        {"harvest.source_id": str(self.source.id)},
-                    ],
-                }
-            ).first()
+        # A prefetched dataset is only used once, later lookups see the saved state
+        dataset = self.prefetched_datasets.pop(str(remote_id), NOT_PREFETCHED)
+        if dataset is NOT_PREFETCHED:
+            try:
+                uris.validate(remote_id)
+                dataset = Dataset.objects(harvest__remote_id=remote_id).first()
+            except uris.ValidationError:
+                dataset = Dataset.objects(__raw__=self.harvested_from_source(remote_id)).first()
 
         if dataset:
             self.ensure_unique_ownership(dataset)
@@ -504,15 +678,9 @@ class BaseBackend(object):
         """Get or create a dataservice given its remote ID (and its source)
         We first try to match `source_id` to be source domain independent
         """
-        dataservice = Dataservice.objects(
-            __raw__={
-                "harvest.remote_id": remote_id,
-                "$or": [
-                    {"harvest.domain": self.source.domain},
-                    {"harvest.source_id": str(self.source.id)},
-                ],
-            }
-        ).first()
+        dataservice = self.prefetched_dataservices.pop(str(remote_id), NOT_PREFETCHED)
+        if dataservice is NOT_PREFETCHED:
+            dataservice = Dataservice.objects(__raw__=self.harvested_from_source(remote_id)).first()
 
         if dataservice:
             self.ensure_unique_ownership(dataservice)
@@ -590,11 +758,15 @@ class BaseBackend(object):
 
 
 class LogCatcher(logging.Handler):
+    """Catch the log records emitted by the current thread"""
+
     records: list[logging.LogRecord]
 
     def __init__(self):
         self.records = []
+        self.thread = threading.get_ident()
         super().__init__()
 
     def emit(self, record):
-        self.records.append(record)
+        if record.thread == self.thread:
+            self.records.append(record)
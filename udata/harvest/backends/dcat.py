@@ -1,11 +1,18 @@
+import gzip
+import json
 import logging
+import os
+import tempfile
 import traceback
 from abc import ABC, abstractmethod
 from datetime import date
-from typing import ClassVar, Generator
+from itertools import groupby
+from operator import itemgetter
+from typing import ClassVar, Generator, Iterator
 
 from flask import current_app
-from rdflib import Graph
+from rdflib import BNode, Graph, URIRef
+from rdflib.compare import to_isomorphic
 from rdflib.namespace import RDF
 from saxonche import PySaxonProcessor, PyXdmNode
 from typing_extensions import override
@@ -25,7 +32,7 @@ from udata.rdf import (
     rdf_value,
     url_from_rdf,
 )
-from udata.storage.s3 import store_as_json
+from udata.storage.s3 import get_bytes, get_from_json, store_bytes
 from udata.utils import safe_unicode, uniquify
 
 from .base import BaseBackend, HarvestExtraConfig, HarvestFeature
@@ -44,6 +51,9 @@ DCAT_NESTING = {
 # Fix some misnamed properties
 DCAT_NESTING[DCAT.distributions] = DCAT_NESTING[DCAT.distribution]
 
+# Types of the nodes described on their own in a catalog
+TOP_LEVEL_TYPES = {DCAT.Catalog, DCAT.Dataset, DCAT.DatasetSeries, DCAT.DataService}
+
 # Known pagination class and their next page property
 KNOWN_PAGINATION = (
     (HYDRA.PartialCollectionView, HYDRA.next),
@@ -66,6 +76,91 @@ def extract_graph(source, target, node, specs):
             extract_graph(source, target, o, specs[p])
 
 
+def node_digest(graph: Graph, node) -> str:
+    """
+    A digest of everything describing a node in a graph, stable across parsings:
+    the triples referencing the node and the ones of the nodes it links to
+    (distributions, contact points...) without following other top-level nodes
+    (catalogs, datasets, dataservices). Blank nodes are canonicalized.
+    """
+    subgraph = Graph()
+
+    def is_nested(other) -> bool:
+        return isinstance(other, (URIRef, BNode)) and not any(
+            t in TOP_LEVEL_TYPES for t in graph.objects(other, RDF.type)
+        )
+
+    to_visit, visited = [node], set()
+    for subject, predicate in graph.subject_predicates(node):
+        subgraph.add((subject, predicate, node))
+        if is_nested(subject):
+            to_visit.append(subject)
+    while to_visit:
+        current = to_visit.pop()
+        if current in visited:
+            continue
+        visited.add(current)
+        for predicate, obj in graph.predicate_objects(current):
+            subgraph.add((current, predicate, obj))
+            if is_nested(obj):
+                to_visit.append(obj)
+    return format(to_isomorphic(subgraph).graph_digest(), "x")
+
+
+class SpooledPages:
+    """
+    The serialized pages of a harvested catalog, spooled to a temporary file
+    so that only the page being processed is kept in memory as a `Graph`.
+    """
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        # (page_number, offset, length, has_dataservices) for each page
+        self.index: list[tuple[int, int, int, bool]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.file.close()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[tuple[int, str]]:
+        for page_number, offset, length, _has_dataservices in self.index:
+            yield page_number, self.read(offset, length)
+
+    def append(self, page_number: int, page: Graph, fmt: str) -> None:
+        data = page.serialize(format=fmt, indent=None).encode("utf-8")
+        offset = self.file.seek(0, os.SEEK_END)
+        self.file.write(data)
+        has_dataservices = (None, RDF.type, DCAT.DataService) in page
+        self.index.append((page_number, offset, len(data), has_dataservices))
+
+    def read(self, offset: int, length: int) -> str:
+        self.file.seek(offset)
+        return self.file.read(length).decode("utf-8")
+
+    @property
+    def size(self) -> int:
+        """The total size of the serialized pages in bytes"""
+        return sum(length for _page_number, _offset, length, _has in self.index)
+
+    def by_page_number(self) -> Iterator[tuple[int, list[str]]]:
+        """The serialized graphs grouped by page number (CSW pages yield one graph per record)"""
+        for page_number, graphs in groupby(self, key=itemgetter(0)):
+            yield page_number, [serialized for _, serialized in graphs]
+
+    def with_dataservices(self, fmt: str) -> Iterator[tuple[int, Graph]]:
+        """Parse back, one at a time, the pages holding some dataservices"""
+        for page_number, offset, length, has_dataservices in self.index:
+            if has_dataservices:
+                page = Graph(namespace_manager=namespace_manager)
+                page.parse(data=self.read(offset, length), format=fmt)
+                yield page_number, page
+
+
 class DcatBackend(BaseBackend):
     name = "dcat"
     display_name = "DCAT"
@@ -78,20 +173,21 @@ class DcatBackend(BaseBackend):
         fmt = self.get_format()
         self.job.data = {"format": fmt}
 
-        pages = []
+        with SpooledPages() as pages:
+            self.harvest_pages(fmt, pages)
 
+    def harvest_pages(self, fmt: str, pages: SpooledPages):
         for page_number, page in self.walk_graph(self.source.url, fmt):
             self.process_one_datasets_page(page_number, page)
-            pages.append((page_number, page))
+            pages.append(page_number, page, fmt)
 
         for org in self.organizations_to_update:
             org.compute_aggregate_metrics = True
             org.count_datasets()
 
         # We do a second pass to have all datasets in memory and attach datasets
-        # to dataservices. It could be better to be one pass of graph walking and
-        # then one pass of attaching datasets to dataservices.
-        for page_number, page in pages:
+        # to dataservices. Only the spooled pages holding dataservices are parsed again.
+        for page_number, page in pages.with_dataservices(fmt):
             self.process_one_dataservices_page(page_number, page)
 
         if not self.dryrun and self.has_reached_max_items():
@@ -110,24 +206,69 @@ class DcatBackend(BaseBackend):
 
         bucket = current_app.config.get("HARVEST_GRAPHS_S3_BUCKET")
 
-        serialized_graphs = [p.serialize(format=fmt, indent=None) for _, p in pages]
-
-        if (
-            bucket is not None
-            and sum([len(g.encode("utf-8")) for g in serialized_graphs])
-            >= max_harvest_graph_size_in_mongo
-        ):
-            prefix = current_app.config.get("HARVEST_GRAPHS_S3_FILENAME_PREFIX") or ""
-
-            # TODO: we could store each page in independant files to allow downloading only the require page in
-            # subsequent jobs. (less data to download in each job)
-            filename = f"{prefix}harvest_{self.job.id}_{date.today()}.json"
-
-            store_as_json(bucket, filename, serialized_graphs)
+        if bucket is not None and pages.size >= max_harvest_graph_size_in_mongo:
+            self.job.data["pages"] = self.store_pages(bucket, pages)
+        else:
+            self.job.data["graphs"] = [serialized for _, serialized in pages]
+            self.job.data["page_numbers"] = [page_number for page_number, _ in pages]
 
-            self.job.data["filename"] = filename
+    def store_pages(self, bucket: str, pages: SpooledPages) -> list[dict]:
+        """
+        Store each page in its own file, so a single page can be retrieved later on
+        without downloading the whole catalog (see `get_page_graph`).
+        Return the pages index to be stored in the job data.
+        """
+        prefix = current_app.config.get("HARVEST_GRAPHS_S3_FILENAME_PREFIX") or ""
+        compress = current_app.config.get("HARVEST_GRAPHS_S3_COMPRESS")
+        index = []
+        for page_number, serialized_graphs in pages.by_page_number():
+            filename = f"{prefix}harvest_{self.job.id}_{date.today()}_page_{page_number}.json"
+            data = json.dumps(serialized_graphs).encode("utf-8")
+            if compress:
+                filename += ".gz"
+                data = gzip.compress(data)
+            store_bytes(bucket, filename, data)
+            index.append({"page_number": page_number, "filename": filename, "compressed": compress})
+        return index
+
+    def get_page_graph(self, page_number: int) -> Graph:
+        """
+        Load a single page of the job from its stored graphs.
+        Only this page is downloaded when the graphs are stored page by page.
+        """
+        data = self.job.data
+        bucket = current_app.config.get("HARVEST_GRAPHS_S3_BUCKET")
+        if "pages" in data:
+            entry = next(e for e in data["pages"] if e["page_number"] == page_number)
+            content = get_bytes(bucket, entry["filename"])
+            if content is None:
+                raise ValueError(f"Missing graph file {entry['filename']}")
+            if entry.get("compressed"):
+                content = gzip.decompress(content)
+            serialized_graphs = json.loads(content.decode("utf-8"))
         else:
-            self.job.data["graphs"] = serialized_graphs
+            # Graphs stored in the job or, for older jobs, as a single file for the whole catalog
+            graphs = data["graphs"] if "graphs" in data else get_from_json(bucket, data["filename"])
+            if "page_numbers" in data:
+                page_numbers = data["page_numbers"]
+                serialized_graphs = [g for n, g in zip(page_numbers, graphs) if n == page_number]
+            else:
+                # Older jobs don't tell which page each graph comes from
+                # (CSW ones store a graph per record): look for the item in all of them.
+                serialized_graphs = graphs
+
+        graph = Graph(namespace_manager=namespace_manager)
+        for serialized in serialized_graphs:
+            graph.parse(data=serialized, format=data["format"])
+        return graph
+
+    def process_item(self, item: HarvestItem):
+        """Process again a dataset item of the job from its stored page"""
+        self.remote_ids = set()
+        page_number = item.kwargs["page_number"]
+        page = self.get_page_graph(page_number)
+        node = self.get_node_from_item(page, item)
+        self.process_dataset_item(item, page_number=page_number, page=page, node=node)
 
     def get_format(self) -> str:
         fmt = guess_format(self.source.url)
@@ -175,6 +316,11 @@ class DcatBackend(BaseBackend):
             page_number += 1
 
     def process_one_datasets_page(self, page_number: int, page: Graph):
+        entries = list(self.datasets_page_entries(page_number, page))
+        self.prefetch_datasets(remote_id for remote_id, _ in entries)
+        self.process_datasets(entries)
+
+    def datasets_page_entries(self, page_number: int, page: Graph):
         # Manually deduplicate subjects to ensure a node is only processed once.
         # Rdflib subjects() will return the same node multiple times if it matches different types,
         # which can occur with ISO series converted by SEMIC (by default it sets rdf:type to both
@@ -184,10 +330,7 @@ class DcatBackend(BaseBackend):
             if self.is_dataset_external_to_this_page(page, node):
                 continue
 
-            self.process_dataset(remote_id, page_number=page_number, page=page, node=node)
-
-            if self.has_reached_max_items():
-                return
+            yield remote_id, {"page_number": page_number, "page": page, "node": node}
 
     def is_dataset_external_to_this_page(self, page: Graph, node) -> bool:
         # In dataservice nodes we have `servesDataset` or `hasPart` that can contains nodes
@@ -218,15 +361,21 @@ class DcatBackend(BaseBackend):
         )
 
     def process_one_dataservices_page(self, page_number: int, page: Graph):
+        entries = list(self.dataservices_page_entries(page_number, page))
+        self.prefetch_dataservices(remote_id for remote_id, _ in entries)
+        self.process_dataservices(entries)
+
+    def dataservices_page_entries(self, page_number: int, page: Graph):
         access_services = {o for _, _, o in page.triples((None, DCAT.accessService, None))}
         for node in page.subjects(RDF.type, DCAT.DataService):
             if node in access_services:
                 continue
             remote_id = page.value(node, DCT.identifier)
-            self.process_dataservice(remote_id, page_number=page_number, page=page, node=node)
+            yield remote_id, {"page_number": page_number, "page": page, "node": node}
 
-            if self.has_reached_max_items():
-                return
+    def dataset_fingerprint(self, item: HarvestItem, page_number: int, page: Graph, node) -> str:
+        item.kwargs["page_number"] = page_number
+        return self.fingerprint(node_digest(page, node))
 
     def inner_process_dataset(self, item: HarvestItem, page_number: int, page: Graph, node):
         item.kwargs["page_number"] = page_number
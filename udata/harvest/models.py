@@ -68,6 +68,7 @@ HARVEST_ITEM_STATUS = OrderedDict(
         ("failed", _("Failed")),
         ("skipped", _("Skipped")),
         ("archived", _("Archived")),
+        ("unchanged", _("Unchanged")),
     )
 )
 
@@ -382,6 +383,15 @@ class HarvestSource(Owned, Document[HarvestSourceQuerySet]):
 post_save.connect(HarvestSource.post_save, sender=HarvestSource)
 
 
+def item_counters(item: HarvestItem) -> Counter:
+    """The contribution of a single item to the job `items_by_*` counters"""
+    counters = Counter({f"items_by_status.{item.status}": 1})
+    for key in ("dataset", "dataservice"):
+        if item._data.get(key):
+            counters[f"items_by_type.{key}"] += 1
+    return counters
+
+
 @generate_fields()
 class HarvestJob(Document):
     """Keep track of harvestings"""
@@ -444,6 +454,60 @@ class HarvestJob(Document):
         "ordering": ["-created"],
     }
 
+    def push_item(self, item: HarvestItem) -> None:
+        """
+        Append an item to the stored job with an atomic `$push`.
+
+        Item counters are incremented in the same update, so the job
+        document is never rewritten as a whole while items are added.
+        """
+        counters = item_counters(item)
+        HarvestJob.objects(id=self.id).update_one(
+            __raw__={
+                "$push": {"items": item.to_mongo()},
+                "$inc": {"items_total": 1, **counters},
+            }
+        )
+        self._mark_item_as_stored(item, counters)
+
+    def update_item(self, item: HarvestItem) -> None:
+        """
+        Replace a stored item with an atomic positional `$set`.
+
+        Item counters are adjusted from the item state previously stored.
+        Items loaded from the database have no known stored state:
+        their counters are left to the final job `save()`.
+        """
+        position = self._item_position(item)
+        counters = item_counters(item)
+        update = {"$set": {f"items.{position}": item.to_mongo()}}
+        stored = getattr(item, "_stored_counters", None)
+        if stored is not None:
+            increments = {
+                key: counters[key] - stored[key]
+                for key in counters.keys() | stored.keys()
+                if counters[key] != stored[key]
+            }
+            if increments:
+                update["$inc"] = increments
+        HarvestJob.objects(id=self.id).update_one(__raw__=update)
+        self._mark_item_as_stored(item, counters)
+
+    def _item_position(self, item: HarvestItem) -> int:
+        # Items being processed are the last added ones: search from the end.
+        for position in range(len(self.items) - 1, -1, -1):
+            if self.items[position] is item:
+                return position
+        raise ValueError(f"Item {item.remote_id} is not part of job {self.id}")
+
+    def _mark_item_as_stored(self, item: HarvestItem, counters: Counter) -> None:
+        # The item is persisted: a later `save()` must not rewrite the whole items list.
+        item._stored_counters = counters
+        item._clear_changed_fields()
+        self._changed_fields = [
+            key for key in self._changed_fields if key != "items" and not key.startswith("items.")
+        ]
+
     def clean(self):
         # Read the raw reference via `_data` rather than `item.dataset` /
         # `item.dataservice` so counting set references never dereferences each
@@ -1,3 +1,5 @@
+import logging
+import threading
 from datetime import UTC, datetime, timedelta
 from urllib.parse import urlparse
 
@@ -13,7 +15,7 @@ from udata.core.dataset.factories import DatasetFactory
 from udata.core.dataset.models import HarvestDatasetMetadata
 from udata.core.organization.factories import OrganizationFactory
 from udata.core.user.factories import UserFactory
-from udata.harvest.models import HarvestItem
+from udata.harvest.models import HarvestItem, HarvestJob
 from udata.models import Dataset
 from udata.ssrf import BlockedAddressError
 from udata.tests.api import PytestOnlyDBTestCase
@@ -27,6 +29,7 @@ from ..backends import (
     HarvestFilter,
     get_all_backends,
 )
+from ..backends.base import LogCatcher
 from ..exceptions import HarvestException
 from .factories import HarvestSourceFactory
 
@@ -107,6 +110,21 @@ class FetchingBackend(FakeBackend):
         self.get(self.source.url)
 
 
+class PageBackend(FakeBackend):
+    """A backend processing all items as a single page, like the DCAT backends."""
+
+    name = "page-backend"
+
+    def inner_harvest(self):
+        dataset_remote_ids = self.source.config.get("dataset_remote_ids", [])
+        self.prefetch_datasets(dataset_remote_ids)
+        self.process_datasets((remote_id, {}) for remote_id in dataset_remote_ids)
+
+        dataservice_remote_ids = self.source.config.get("dataservice_remote_ids", [])
+        self.prefetch_dataservices(dataservice_remote_ids)
+        self.process_dataservices((remote_id, {}) for remote_id in dataservice_remote_ids)
+
+
 class HarvestFilterTest:
     @pytest.mark.parametrize("type,expected", HarvestFilter.TYPES.items())
     def test_type_ok(self, type, expected):
@@ -159,6 +177,108 @@ class BaseBackendTest(PytestOnlyDBTestCase):
             assert dataset.harvest.remote_id.startswith("fake-")
             assert before_naive <= last_update_naive <= after_naive
 
+    def test_items_are_persisted_incrementally(self, mocker):
+        nb_datasets = 3
+        source = HarvestSourceFactory(config={"dataset_remote_ids": gen_remote_IDs(nb_datasets)})
+        backend = FakeBackend(source)
+        save = mocker.spy(HarvestJob, "save")
+
+        job = backend.harvest()
+
+        # The whole job is only written on creation and once it ends
+        assert save.call_count == 2
+        stored = HarvestJob.objects.get(id=job.id)
+        assert [item.remote_id for item in stored.items] == [item.remote_id for item in job.items]
+        assert all(item.status == "done" for item in stored.items)
+        assert all(item.dataset for item in stored.items)
+        assert stored.items_total == nb_datasets
+        assert stored.items_by_status["done"] == nb_datasets
+        assert stored.items_by_type["dataset"] == nb_datasets
+
+    def test_concurrent_harvest(self):
+        remote_ids = gen_remote_IDs(10)
+        source = HarvestSourceFactory(config={"dataset_remote_ids": remote_ids})
+        backend = PageBackend(source, workers=4)
+
+        job = backend.harvest()
+
+        assert job.status == "done"
+        assert [item.remote_id for item in job.items] == remote_ids
+        assert all(item.status == "done" for item in job.items)
+        assert Dataset.objects.count() == len(remote_ids)
+        stored = HarvestJob.objects.get(id=job.id)
+        assert stored.items_by_status["done"] == len(remote_ids)
+
+    def test_concurrent_harvest_duplicate_remote_ids(self):
+        dataset_remote_ids = ["dataset-id-1", "dataset-id-2", "dataset-id-1", "dataset-id-1"]
+        source = HarvestSourceFactory(config={"dataset_remote_ids": dataset_remote_ids})
+        backend = PageBackend(source, workers=4)
+
+        job = backend.harvest()
+
+        assert job.status == "done-errors"
+        assert Dataset.objects.count() == 2
+        statuses = [item.status for item in job.items]
+        assert statuses.count("done") == 2
+        assert statuses.count("failed") == 2
+
+    def test_concurrent_harvest_max_items(self):
+        source = HarvestSourceFactory(config={"dataset_remote_ids": gen_remote_IDs(10)})
+        backend = PageBackend(source, max_items=3, workers=4)
+
+        job = backend.harvest()
+
+        assert len(job.items) == 3
+        assert Dataset.objects.count() == 3
+
+    def test_prefetch_datasets(self):
+        source = HarvestSourceFactory()
+        backend = FakeBackend(source)
+        uri = "http://example.com/remote_id_uri"
+        from_source = DatasetFactory(
+            harvest={"domain": source.domain, "remote_id": "fake-0", "source_id": str(source.id)}
+        )
+        from_uri = DatasetFactory(
+            harvest={"domain": "other-domain", "remote_id": uri, "source_id": "other-source-id"}
+        )
+        DatasetFactory(
+            harvest={"domain": "other-domain", "remote_id": "fake-1", "source_id": "other-id"}
+        )
+
+        backend.prefetch_datasets(["fake-0", "fake-1", uri, None])
+
+        assert backend.prefetched_datasets == {"fake-0": from_source, "fake-1": None, uri: from_uri}
+        assert backend.get_dataset("fake-0") == from_source
+        assert backend.get_dataset(uri) == from_uri
+        assert backend.get_dataset("fake-1").id is None
+        # Prefetched datasets are only used once
+        assert backend.prefetched_datasets == {}
+
+    def test_prefetch_dataservices(self):
+        source = HarvestSourceFactory()
+        backend = FakeBackend(source)
+        dataservice = DataserviceFactory(
+            harvest={"domain": source.domain, "remote_id": "fake-0", "source_id": str(source.id)}
+        )
+
+        backend.prefetch_dataservices(["fake-0", "fake-1"])
+
+        assert backend.prefetched_dataservices == {"fake-0": dataservice, "fake-1": None}
+        assert backend.get_dataservice("fake-0") == dataservice
+        assert backend.get_dataservice("fake-1").id is None
+
+    def test_no_datasets_duplication_with_prefetch(self):
+        source = HarvestSourceFactory(config={"dataset_remote_ids": ["fake-0", "fake-1"]})
+        reused = DatasetFactory(
+            harvest={"domain": source.domain, "remote_id": "fake-0", "source_id": str(source.id)}
+        )
+
+        job = PageBackend(source).harvest()
+
+        assert job.status == "done"
+        assert Dataset.objects.count() == 2
+        assert job.items[0].dataset.id == reused.id
+
     def test_has_feature_defaults(self):
         source = HarvestSourceFactory()
         backend = FakeBackend(source)
@@ -719,6 +839,22 @@ class BaseBackendValidateTest(PytestOnlyDBTestCase):
         assert "[nested.1.other-bad-value] expected int: bad" in msg
 
 
+class LogCatcherTest:
+    def test_only_catch_records_from_current_thread(self):
+        logger = logging.getLogger("udata.harvest.tests.log_catcher")
+        log_catcher = LogCatcher()
+        logger.addHandler(log_catcher)
+        try:
+            logger.warning("from current thread")
+            thread = threading.Thread(target=logger.warning, args=("from another thread",))
+            thread.start()
+            thread.join()
+        finally:
+            logger.removeHandler(log_catcher)
+
+        assert [r.getMessage() for r in log_catcher.records] == ["from current thread"]
+
+
 class AllBackendsTest:
     def test_all_backends_have_unique_display_name(self):
         """Ensure all harvest backends have unique display_name values."""
@@ -1,11 +1,13 @@
 import logging
 import os
 import xml.etree.ElementTree as ET
-from datetime import date
+from datetime import UTC, date, datetime
 
 import pytest
 import requests
 from flask import current_app, url_for
+from rdflib import Graph
+from rdflib.namespace import RDF
 
 from udata.core.access_type.constants import AccessType, InspireLimitationCategory
 from udata.core.dataservices.factories import DataserviceFactory
@@ -17,12 +19,13 @@ from udata.harvest.backends import get_backend
 from udata.harvest.backends.dcat import CswDcatBackend
 from udata.harvest.models import HarvestJob
 from udata.models import Dataset
-from udata.storage.s3 import get_from_json
+from udata.rdf import DCAT, DCT
+from udata.storage.s3 import get_bytes
 from udata.tests.api import PytestOnlyAPITestCase, PytestOnlyDBTestCase
 from udata.tests.helpers import argvalues, assert200
 
 from .. import actions
-from ..backends.dcat import URIS_TO_REPLACE
+from ..backends.dcat import URIS_TO_REPLACE, DcatBackend, SpooledPages
 from .factories import HarvestSourceFactory
 
 log = logging.getLogger(__name__)
@@ -85,6 +88,26 @@ def mock_xslt(rmock, filename="iso-19139-to-dcat-ap.xsl"):
     rmock.get(current_app.config.get("HARVEST_ISO19139_XSLT_URL"), text=xslt)
 
 
+class SpooledPagesTest:
+    def test_spool_pages(self):
+        with open(os.path.join(DCAT_FILES_DIR, "flat.jsonld")) as f:
+            datasets_page = Graph().parse(data=f.read(), format="json-ld")
+        with open(os.path.join(DCAT_FILES_DIR, "bnodes.xml")) as f:
+            dataservices_page = Graph().parse(data=f.read(), format="xml")
+
+        with SpooledPages() as pages:
+            pages.append(0, datasets_page, "json-ld")
+            pages.append(1, dataservices_page, "json-ld")
+
+            assert len(pages) == 2
+            assert [page_number for page_number, _ in pages] == [0, 1]
+            assert pages.size == sum(len(serialized.encode("utf-8")) for _, serialized in pages)
+            [(page_number, page)] = list(pages.with_dataservices("json-ld"))
+            assert page_number == 1
+            assert len(page) == len(dataservices_page)
+            assert (None, RDF.type, DCAT.DataService) in page
+
+
 @pytest.mark.options(HARVESTER_BACKENDS=["dcat"])
 class DcatBackendTest(PytestOnlyDBTestCase):
     def test_simple_flat(self, rmock):
@@ -382,17 +405,12 @@ class DcatBackendTest(PytestOnlyDBTestCase):
         job = HarvestJob.objects.order_by("-id").first()
 
         assert job.source.slug == source.slug
-        assert (
-            get_from_json(current_app.config.get("HARVEST_GRAPHS_S3_BUCKET"), job.data["filename"])
-            is not None
-        )
+        bucket = current_app.config.get("HARVEST_GRAPHS_S3_BUCKET")
+        assert all(get_bytes(bucket, page["filename"]) is not None for page in job.data["pages"])
 
         # Retention is 0 days in config
         actions.purge_jobs()
-        assert (
-            get_from_json(current_app.config.get("HARVEST_GRAPHS_S3_BUCKET"), job.data["filename"])
-            is None
-        )
+        assert all(get_bytes(bucket, page["filename"]) is None for page in job.data["pages"])
 
     @pytest.mark.options(HARVEST_MAX_ITEMS=2)
     def test_harvest_max_items(self, rmock):
@@ -532,6 +550,56 @@ class DcatBackendTest(PytestOnlyDBTestCase):
         assert len(datasets["2"].resources) == 2
         assert len(datasets["3"].resources) == 1
 
+    def test_skip_unchanged_datasets(self, rmock, mocker):
+        url = mock_dcat(rmock, "flat.jsonld")
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=OrganizationFactory())
+        actions.run(source)
+        save = mocker.spy(Dataset, "save")
+
+        actions.run(source)
+
+        job = source.get_last_job()
+        assert [item.status for item in job.items] == ["unchanged"] * 3
+        assert all(item.dataset for item in job.items)
+        assert job.status == "done"
+        save.assert_not_called()
+        for dataset in Dataset.objects:
+            assert dataset.harvest.fingerprint is not None
+            assert dataset.harvest.last_update.date() == date.today()
+
+    def test_harvest_changed_datasets(self, rmock):
+        url = mock_dcat(rmock, "flat.jsonld")
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=OrganizationFactory())
+        actions.run(source)
+        with open(os.path.join(DCAT_FILES_DIR, "flat.jsonld")) as f:
+            body = f.read().replace("Dataset 1 description", "New description")
+        rmock.get(url, text=body)
+
+        actions.run(source)
+
+        job = source.get_last_job()
+        statuses = {item.remote_id: item.status for item in job.items}
+        assert statuses == {"1": "done", "2": "unchanged", "3": "unchanged"}
+        dataset = Dataset.objects.get(harvest__remote_id="1")
+        assert dataset.description == "New description"
+
+    def test_harvest_locally_modified_datasets(self, rmock):
+        url = mock_dcat(rmock, "flat.jsonld")
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=OrganizationFactory())
+        actions.run(source)
+        dataset = Dataset.objects.get(harvest__remote_id="1")
+        dataset.title = "Locally modified"
+        dataset.last_modified_internal = datetime.now(UTC)
+        dataset.save()
+
+        actions.run(source)
+
+        job = source.get_last_job()
+        statuses = {item.remote_id: item.status for item in job.items}
+        assert statuses == {"1": "done", "2": "unchanged", "3": "unchanged"}
+        dataset.reload()
+        assert dataset.title == "Dataset 1"
+
     def test_hydra_partial_collection_view_pagination(self, rmock):
         url = mock_dcat_pagination(rmock, "catalog.jsonld", "partial-collection-{page}.jsonld")
         org = OrganizationFactory()
@@ -544,6 +612,75 @@ class DcatBackendTest(PytestOnlyDBTestCase):
         job = source.get_last_job()
         assert len(job.items) == 4
 
+    def test_get_page_graph(self, rmock):
+        url = mock_dcat_pagination(rmock, "catalog.jsonld", "partial-collection-{page}.jsonld")
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=OrganizationFactory())
+        actions.run(source)
+        job = source.get_last_job()
+        assert job.data["page_numbers"] == [0, 1]
+
+        page = DcatBackend(job).get_page_graph(1)
+
+        identifiers = {
+            str(page.value(node, DCT.identifier)) for node in page.subjects(RDF.type, DCAT.Dataset)
+        }
+        assert identifiers == {"4"}
+
+    def test_get_page_graph_without_page_numbers(self, rmock):
+        """Older jobs don't store the page numbers: all their graphs are searched"""
+        url = mock_dcat_pagination(rmock, "catalog.jsonld", "partial-collection-{page}.jsonld")
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=OrganizationFactory())
+        actions.run(source)
+        job = source.get_last_job()
+        del job.data["page_numbers"]
+
+        page = DcatBackend(job).get_page_graph(1)
+
+        identifiers = {
+            str(page.value(node, DCT.identifier)) for node in page.subjects(RDF.type, DCAT.Dataset)
+        }
+        assert len(identifiers) == len(job.items)
+        assert "4" in identifiers
+
+    @pytest.mark.options(
+        HARVEST_MAX_CATALOG_SIZE_IN_MONGO=15,
+        HARVEST_GRAPHS_S3_BUCKET="test_bucket",
+        HARVEST_GRAPHS_S3_COMPRESS=True,
+    )
+    def test_store_graphs_per_page(self, rmock, mocker):
+        files = {}
+        mocker.patch(
+            "udata.harvest.backends.dcat.store_bytes",
+            side_effect=lambda bucket, filename, data: files.__setitem__(filename, data),
+        )
+        read_bytes = mocker.patch(
+            "udata.harvest.backends.dcat.get_bytes",
+            side_effect=lambda bucket, filename: files.get(filename),
+        )
+        url = mock_dcat_pagination(rmock, "catalog.jsonld", "partial-collection-{page}.jsonld")
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=OrganizationFactory())
+
+        actions.run(source)
+
+        job = source.get_last_job()
+        assert "graphs" not in job.data
+        assert [page["page_number"] for page in job.data["pages"]] == [0, 1]
+        assert all(page["compressed"] for page in job.data["pages"])
+        assert sorted(files) == sorted(page["filename"] for page in job.data["pages"])
+
+        backend = DcatBackend(job)
+        page = backend.get_page_graph(0)
+
+        read_bytes.assert_called_once_with("test_bucket", job.data["pages"][0]["filename"])
+        identifiers = {
+            str(page.value(node, DCT.identifier)) for node in page.subjects(RDF.type, DCAT.Dataset)
+        }
+        assert identifiers == {"1", "2", "3"}
+
+        item = next(item for item in job.items if item.remote_id == "4")
+        backend.process_item(item)
+        assert item.status == "unchanged"
+
     def test_hydra_legacy_paged_collection_pagination(self, rmock):
         url = mock_dcat_pagination(rmock, "catalog.jsonld", "paged-collection-{page}.jsonld")
         org = OrganizationFactory()
@@ -1,9 +1,11 @@
 import logging
 
+from udata.core.dataset.factories import DatasetFactory
 from udata.tests.api import PytestOnlyDBTestCase
 from udata.utils import faker
 
-from ..models import HarvestSource
+from ..models import HarvestItem, HarvestJob, HarvestSource
+from .factories import HarvestJobFactory
 
 log = logging.getLogger(__name__)
 
@@ -23,3 +25,54 @@ class HarvestSourceTest(PytestOnlyDBTestCase):
 
         source = HarvestSource(name="Test", url="http://www.somewhere.com:666/path/")
         assert source.domain == "www.somewhere.com"
+
+
+class HarvestJobItemsTest(PytestOnlyDBTestCase):
+    def test_push_item(self):
+        job = HarvestJobFactory()
+        item = HarvestItem(remote_id="remote-id")
+        job.items.append(item)
+
+        job.push_item(item)
+
+        stored = HarvestJob.objects.get(id=job.id)
+        assert [i.remote_id for i in stored.items] == ["remote-id"]
+        assert stored.items_total == 1
+        assert stored.items_by_status["pending"] == 1
+        assert job._get_changed_fields() == []
+
+    def test_update_item_adjusts_counters(self):
+        job = HarvestJobFactory()
+        first, second = HarvestItem(remote_id="first"), HarvestItem(remote_id="second")
+        for item in (first, second):
+            job.items.append(item)
+            job.push_item(item)
+
+        first.status = "done"
+        first.dataset = DatasetFactory()
+        job.update_item(first)
+
+        stored = HarvestJob.objects.get(id=job.id)
+        assert [i.status for i in stored.items] == ["done", "pending"]
+        assert stored.items[0].dataset.id == first.dataset.id
+        assert stored.items_total == 2
+        assert stored.items_by_status["done"] == 1
+        assert stored.items_by_status["pending"] == 1
+        assert stored.items_by_type["dataset"] == 1
+
+    def test_save_after_items_updates(self):
+        job = HarvestJobFactory()
+        item = HarvestItem(remote_id="remote-id")
+        job.items.append(item)
+        job.push_item(item)
+        item.status = "failed"
+        job.update_item(item)
+
+        job.status = "done-errors"
+        job.save()
+
+        stored = HarvestJob.objects.get(id=job.id)
+        assert stored.status == "done-errors"
+        assert len(stored.items) == 1
+        assert stored.items_by_status["failed"] == 1
+        assert stored.items_by_status["pending"] == 0
@@ -0,0 +1,17 @@
+"""
+This migration builds the suggestion index now serving the `/suggest/` endpoints.
+Objects are then indexed on save, the `index-suggestions` job refreshing the scores.
+"""
+
+import logging
+
+from udata.core.suggest import adapter_catalog, index_model
+
+log = logging.getLogger(__name__)
+
+
+def migrate(db):
+    for model in adapter_catalog:
+        log.info(f"Indexing {model.__name__} suggestions...")
+        count = index_model(model)
+        log.info(f"\tIndexed {count} {model.__name__} suggestions")
@@ -19,6 +19,7 @@ from udata.core.topic.models import *  # noqa
 from udata.core.post.models import *  # noqa
 from udata.core.jobs.models import *  # noqa
 from udata.core.tags.models import *  # noqa
+from udata.core.suggest.models import *  # noqa
 from udata.core.spam.models import *  # noqa
 from udata.core.reports.models import *  # noqa
 from udata.core.visualizations.models import *  # noqa
@@ -0,0 +1,54 @@
+from datetime import UTC, datetime
+
+from mongoengine.fields import DateTimeField, StringField
+
+from .document import UDataDocument
+
+__all__ = ("PendingUpdate",)
+
+
+class PendingUpdate(UDataDocument):
+    """
+    An object needing some deferred processing.
+
+    An object is marked at most once for a given set of fields whatever the number
+    of marks, and the marks are consumed by batches with `flush`.
+    Concrete subclasses declare their collection and a unique index on the marking fields.
+    """
+
+    classname = StringField(required=True)
+    object_id = StringField(required=True)
+    created_at = DateTimeField(default=lambda: datetime.now(UTC), required=True)
+
+    meta = {"abstract": True}
+
+    @classmethod
+    def mark(cls, classname, object_id, **fields):
+        """Mark an object as needing to be processed, at most once"""
+        cls.objects(classname=classname, object_id=object_id, **fields).update_one(
+            upsert=True, set_on_insert__created_at=datetime.now(UTC)
+        )
+
+    @classmethod
+    def flush(cls, process, batch_size):
+        """
+        Consume the marks by batches of `batch_size`, calling `process` with each batch.
+
+        Only marks made before the flush started are consumed: the ones made
+        during the flush are left for the next one.
+        Marks are removed before `process` is called, so any update happening
+        in the meantime is either processed now or marked again.
+        Returns the number of consumed marks.
+        """
+        started = datetime.now(UTC)
+        flushed = 0
+        while True:
+            batch = list(
+                cls.objects(created_at__lte=started).order_by("created_at").limit(batch_size)
+            )
+            if not batch:
+                break
+            cls.objects(id__in=[pending.id for pending in batch]).delete()
+            process(batch)
+            flushed += len(batch)
+        return flushed
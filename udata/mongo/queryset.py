@@ -1,6 +1,13 @@
+import base64
+import binascii
+import hashlib
+import json
 import logging
+from datetime import datetime
 
-from bson import DBRef, ObjectId
+from bson import DBRef, ObjectId, json_util
+from bson.errors import InvalidId
+from flask import current_app
 from mongoengine.signals import post_save
 
 from udata.flask_mongoengine.document import BaseQuerySet
@@ -38,11 +45,172 @@ class DBPaginator(Paginable):
         return self.queryset.items
 
 
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPaginator(Paginable):
+    """
+    A keyset paginable: the next page is fetched after an opaque cursor
+    (encoding the last sort key and `_id`) instead of skipping documents.
+
+    There is no total count nor previous page.
+    """
+
+    page = None
+    total = None
+
+    def __init__(self, objects, page_size, next_cursor=None):
+        self.objects = objects
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __len__(self):
+        return len(self.objects)
+
+    @property
+    def has_prev(self):
+        return False
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(ordering, values):
+    payload = json_util.dumps({"o": ordering, "v": values})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+# The types a cursor value can have, anything else (ie. a query operator) is rejected
+CURSOR_VALUE_TYPES = (str, int, float, bool, type(None), datetime, ObjectId)
+
+
+def decode_cursor(cursor):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        token = json_util.loads(payload.decode("utf-8"))
+        ordering, values = token["o"], token["v"]
+    except (
+        binascii.Error,
+        UnicodeDecodeError,
+        json.JSONDecodeError,
+        InvalidId,
+        KeyError,
+        TypeError,
+        ValueError,
+    ):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list) or not all(
+        isinstance(value, CURSOR_VALUE_TYPES) for value in values
+    ):
+        raise InvalidCursor("Malformed cursor")
+    return ordering, values
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the raw query matching the documents sorted after `values`
+    (the sort key value, if any, and the `_id` of the last returned document).
+    """
+    *sort_values, last_id = values
+    id_direction = ordering[0][1] if ordering else 1
+    after_id = {"_id": {"$gt" if id_direction > 0 else "$lt": last_id}}
+    if not ordering:
+        return after_id
+    [(key, direction)], [value] = ordering, sort_values
+    # Null values are sorted first but can't be compared with $gt/$lt
+    if value is None:
+        if direction > 0:
+            return {"$or": [{key: {"$ne": None}}, {key: None, **after_id}]}
+        return {key: None, **after_id}
+    clauses = [{key: {"$gt" if direction > 0 else "$lt": value}}, {key: value, **after_id}]
+    if direction < 0:
+        clauses.append({key: None})
+    return {"$or": clauses}
+
+
+def get_path(son, key):
+    for part in key.split("."):
+        if not isinstance(son, dict):
+            return None
+        son = son.get(part)
+    return son
+
+
 class UDataQuerySet(BaseQuerySet):
-    def paginate(self, page, per_page, **kwargs):
-        result = super(UDataQuerySet, self).paginate(page, per_page)
+    def paginate(self, page, per_page, cursor=None, cache_count=False, **kwargs):
+        """
+        Paginate with skip/limit and a total count,
+        or with keyset pagination if `cursor` is given (an empty one being the first page).
+
+        With `cache_count`, the total comes from `cached_count()`.
+        """
+        if cursor is not None:
+            return self.paginate_cursor(cursor, per_page)
+        total = self.cached_count() if cache_count else None
+        result = super(UDataQuerySet, self).paginate(page, per_page, total=total)
         return DBPaginator(result)
 
+    def cached_count(self):
+        """
+        Count the matching documents, caching the result for `PAGINATION_COUNT_CACHE_TTL` seconds
+        by collection and normalized query filter.
+
+        An unfiltered collection is counted from its metadata
+        if `PAGINATION_ESTIMATED_COUNT` is set.
+        """
+        from udata.app import cache
+
+        query = self._query
+        if not query and current_app.config["PAGINATION_ESTIMATED_COUNT"]:
+            return self._collection.estimated_document_count()
+        timeout = current_app.config["PAGINATION_COUNT_CACHE_TTL"]
+        if not timeout:
+            return self.count()
+        digest = hashlib.sha1(json_util.dumps(query, sort_keys=True).encode("utf-8")).hexdigest()
+        key = f"count:{self._collection.name}:{digest}"
+        count = cache.get(key)
+        if count is None:
+            count = self.count()
+            cache.set(key, count, timeout=timeout)
+        return count
+
+    def paginate_cursor(self, cursor, page_size):
+        """
+        Fetch a page after `cursor` sorted by the queryset ordering then `_id`.
+
+        Only orderings on a single key are supported.
+        Raises an `InvalidCursor` error if the cursor or the ordering are not supported.
+        """
+        ordering = self._ordering
+        if ordering is None and self._document._meta.get("ordering"):
+            ordering = self._get_order_by(self._document._meta["ordering"])
+        ordering = [[key, direction] for key, direction in ordering or [] if key != "_id"]
+        if len(ordering) > 1 or any(not isinstance(d, int) for _, d in ordering):
+            raise InvalidCursor("Cursor pagination only supports sorting on a single field")
+
+        qs = self.clone()
+        qs._ordering = [tuple(o) for o in ordering]
+        qs._ordering.append(("_id", ordering[0][1] if ordering else 1))
+        if cursor:
+            cursor_ordering, values = decode_cursor(cursor)
+            if cursor_ordering != ordering or len(values) != len(ordering) + 1:
+                raise InvalidCursor("Cursor does not match the requested sort")
+            qs = qs.filter(__raw__=keyset_filter(ordering, values))
+
+        objects = list(qs.limit(page_size + 1))
+        next_cursor = None
+        if len(objects) > page_size:
+            objects = objects[:page_size]
+            last = objects[-1].to_mongo()
+            values = [get_path(last, key) for key, _ in ordering] + [last["_id"]]
+            next_cursor = encode_cursor(ordering, values)
+        return CursorPaginator(objects, page_size, next_cursor)
+
     def bulk_list(self, ids):
         data = self.in_bulk(ids)
         return [data[id] for id in ids]
@@ -1,10 +1,13 @@
 import logging
+from collections import defaultdict
 
 from flask import current_app
 from mongoengine.signals import post_delete, post_save
 
 from udata.mongo import db
-from udata.tasks import as_task_param, task
+from udata.tasks import as_task_param, job, task
+
+from .models import PendingIndexation
 
 log = logging.getLogger(__name__)
 
@@ -64,16 +67,105 @@ def unindex(classname, id):
         log.exception('Unable to unindex %s "%s"', model.__name__, id)
 
 
+def index_objects(classname, ids):
+    """
+    (Re/Un)Index a batch of objects of a given model.
+
+    Indexable objects are sent in bulk, the others and the missing ones are unindexed.
+    """
+    model = db.resolve_model(classname)
+    adapter_class = adapter_catalog.get(model)
+    service = adapter_class.service_class(get_elastic_client())
+    entities = []
+    found = set()
+    to_unindex = []
+    for obj in model.objects(id__in=ids):
+        found.add(str(obj.id))
+        if not adapter_class.is_indexable(obj):
+            to_unindex.append(str(obj.id))
+            continue
+        try:
+            document = adapter_class.serialize(obj)
+            entities.append(adapter_class.consumer_class.load_from_dict(document))
+        except Exception:
+            log.exception('Unable to index %s "%s"', model.__name__, str(obj.id))
+    to_unindex.extend(id for id in ids if id not in found)
+
+    log.info("Indexing %d %s objects", len(entities), model.__name__)
+    try:
+        for ok, item in service.feed_bulk(entities):
+            if not ok:
+                result = next(iter(item.values()), {})
+                log.error(
+                    'Unable to index %s "%s": %s',
+                    model.__name__,
+                    result.get("_id"),
+                    result.get("error", result),
+                )
+    except Exception:
+        log.exception("Unable to index %s objects", model.__name__)
+
+    for id in to_unindex:
+        log.info("Unindexing %s (%s)", model.__name__, id)
+        try:
+            service.delete_one(id)
+        except Exception:
+            log.exception('Unable to unindex %s "%s"', model.__name__, id)
+
+
+def flush_pending_indexations(batch_size=None):
+    """
+    (Re/Un)Index objects marked as pending, by batches of `batch_size` objects.
+
+    See `PendingUpdate.flush` for the marks consumed by a flush.
+    """
+
+    def index_batch(batch):
+        ids_by_classname = defaultdict(list)
+        for pending in batch:
+            ids_by_classname[pending.classname].append(pending.object_id)
+        for classname, ids in ids_by_classname.items():
+            index_objects(classname, ids)
+
+    batch_size = batch_size or current_app.config["ELASTICSEARCH_BULK_CHUNK_SIZE"]
+    return PendingIndexation.flush(index_batch, batch_size)
+
+
+@job("flush-search-index", route="high.search")
+def flush_search_index(self, batch_size=None):
+    """(Re/Un)Index objects saved or deleted since the last flush"""
+    if not current_app.config["ELASTICSEARCH_URL"]:
+        return
+    flushed = flush_pending_indexations(batch_size)
+    self.log.info("Flushed %d pending indexations", flushed)
+
+
+def request_reindex(document):
+    """
+    Ask for a Mongo document to be (re|un)indexed.
+
+    The document is marked as pending when `AUTO_INDEX_COALESCE` is enabled,
+    otherwise a `reindex` task is enqueued right away.
+    """
+    if current_app.config["AUTO_INDEX_COALESCE"]:
+        PendingIndexation.mark(*as_task_param(document))
+    else:
+        reindex.delay(*as_task_param(document))
+
+
 def reindex_model_on_save(sender, document, **kwargs):
     """(Re/Un)Index Mongo document on post_save"""
     if current_app.config.get("AUTO_INDEX") and current_app.config["ELASTICSEARCH_URL"]:
-        reindex.delay(*as_task_param(document))
+        request_reindex(document)
 
 
 def unindex_model_on_delete(sender, document, **kwargs):
     """Unindex Mongo document on post_delete"""
     if current_app.config.get("AUTO_INDEX") and current_app.config["ELASTICSEARCH_URL"]:
-        unindex.delay(*as_task_param(document))
+        if current_app.config["AUTO_INDEX_COALESCE"]:
+            PendingIndexation.mark(*as_task_param(document))
+        else:
+            unindex.delay(*as_task_param(document))
 
 
 def register(adapter):
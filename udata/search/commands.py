@@ -1,10 +1,15 @@
 import logging
+import multiprocessing
+import queue
 import sys
+import time
 from datetime import UTC, datetime
+from functools import partial
 
 import click
 from flask import current_app
 
+from udata import search
 from udata.commands import cli
 from udata.search import adapter_catalog, get_elastic_client
 from udata_search_service.search_clients import ALL_DOCUMENT_CLASSES
@@ -20,6 +25,9 @@ def grp():
 
 TIMESTAMP_FORMAT = "%Y-%m-%d-%H-%M"
 
+# Number of documents a worker process indexes between two progress reports
+PROGRESS_STEP = 100
+
 
 def default_index_suffix_name(now):
     """Build a time based index suffix name"""
@@ -61,15 +69,108 @@ def iter_qs(qs, adapter):
             log.error('Unable to index %s "%s": %s', model, str(obj.id), str(e), exc_info=True)
 
 
-def index_model(adapter, start, reindex=False, from_datetime=None):
-    """Index or unindex all objects given a model"""
+def iter_entities(docs, adapter, service, reindex=False):
+    """
+    Build search entities from serialized documents, unindexing non indexable ones.
+
+    Unindexable documents are simply skipped when building a new index.
+    """
+    for indexable, doc in docs:
+        try:
+            if indexable:
+                yield adapter.consumer_class.load_from_dict(doc)
+            elif not reindex:
+                service.delete_one(doc["id"])
+        except Exception as e:
+            model = adapter.model.__name__
+            log.error('Unable to index %s "%s": %s', model, str(doc["id"]), str(e), exc_info=True)
+
+
+def bulk_feed(docs, adapter, service, index_name=None, reindex=False, batch_size=None):
+    """Feed serialized documents to the search service in `_bulk` batches"""
+    model = adapter.model.__name__
+    chunk_size = batch_size or current_app.config["ELASTICSEARCH_BULK_CHUNK_SIZE"]
+    max_chunk_bytes = current_app.config["ELASTICSEARCH_BULK_MAX_CHUNK_BYTES"]
+    entities = iter_entities(docs, adapter, service, reindex)
+    indexed = errors = 0
+    started = time.monotonic()
+    results = service.feed_bulk(
+        entities, index=index_name, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes
+    )
+    for ok, item in results:
+        if ok:
+            indexed += 1
+            continue
+        errors += 1
+        # Bulk item results are keyed by operation type: {"index": {"_id": ..., "error": ...}}
+        result = next(iter(item.values()), {})
+        log.error(
+            'Unable to index %s "%s": %s', model, result.get("_id"), result.get("error", result)
+        )
+    elapsed = time.monotonic() - started
+    log.info(
+        "Indexed %d %s objects in %.1fs (%.1f/s) with %d errors",
+        indexed,
+        model,
+        elapsed,
+        indexed / elapsed if elapsed else 0,
+        errors,
+    )
+    return indexed, errors
+
+
+def model_queryset(adapter, from_datetime=None):
+    """The queryset of objects to index, optionally restricted to recently modified ones"""
+    qs = adapter.model.objects
+    if from_datetime:
+        date_property = get_date_property(adapter.model.__name__.lower())
+        qs = qs.filter(**{f"{date_property}__gte": from_datetime})
+    return qs
+
+
+def split_id_ranges(qs, count, parts):
+    """
+    Split a queryset into at most `parts` contiguous ObjectId ranges of similar size.
+
+    Returns a list of `(lower, upper)` tuples where `lower` is inclusive, `upper` exclusive
+    and `None` stands for an unbounded side.
+    """
+    ordered_ids = qs.order_by("id").scalar("id")
+    bounds = [ordered_ids[count * part // parts] for part in range(1, min(parts, count))]
+    lowers = [None] + bounds
+    uppers = bounds + [None]
+    return list(zip(lowers, uppers))
+
+
+def feed_docs(docs, adapter, service, index_name=None, reindex=False, bulk=False, batch_size=None):
+    """Feed serialized documents to the search service, one by one or in bulk"""
+    if bulk:
+        bulk_feed(docs, adapter, service, index_name, reindex, batch_size)
+        return
+    for entity in iter_entities(docs, adapter, service, reindex):
+        try:
+            service.feed(entity, index=index_name)
+        except Exception as e:
+            model = adapter.model.__name__
+            log.error('Unable to index %s "%s": %s', model, str(entity.id), str(e), exc_info=True)
+
+
+def index_model(
+    adapter, start, reindex=False, from_datetime=None, bulk=None, batch_size=None, workers=1
+):
+    """
+    Index or unindex all objects given a model
+
+    Documents are sent through the Elasticsearch `_bulk` API when `bulk` is true,
+    which is the default when building a new index.
+
+    When `workers` is greater than 1, the collection is split into ObjectId ranges
+    serialized and indexed concurrently by as many worker processes.
+    """
     model = adapter.model
     log.info("Indexing %s objects", model.__name__)
     model_name = adapter.model.__name__.lower()
-    qs = model.objects
-    if from_datetime:
-        date_property = get_date_property(model_name)
-        qs = qs.filter(**{f"{date_property}__gte": from_datetime})
+    qs = model_queryset(adapter, from_datetime)
 
     es_client = get_elastic_client()
     service = adapter.service_class(es_client)
@@ -81,20 +182,101 @@ def index_model(adapter, start, reindex=False, from_datetime=None):
         index_name = f"{alias}-{suffix}"
         es_client.es.indices.create(index=index_name)
 
+    if bulk is None:
+        bulk = reindex
+
     count = qs.count()
     label = f"Indexing {model.__name__}"
+    if workers > 1 and count > 1:
+        id_ranges = split_id_ranges(qs, count, workers)
+        parallel_index(
+            adapter,
+            id_ranges,
+            count,
+            label,
+            index_name=index_name,
+            reindex=reindex,
+            from_datetime=from_datetime,
+            bulk=bulk,
+            batch_size=batch_size,
+        )
+        return
     with click.progressbar(iter_qs(qs, adapter), length=count, label=label) as docs:
-        for indexable, doc in docs:
-            try:
-                if indexable:
-                    entity = adapter.consumer_class.load_from_dict(doc)
-                    service.feed(entity, index=index_name)
-                elif not reindex:
-                    service.delete_one(doc["id"])
-            except Exception as e:
-                log.error(
-                    'Unable to index %s "%s": %s', model, str(doc["id"]), str(e), exc_info=True
-                )
+        feed_docs(docs, adapter, service, index_name, reindex, bulk, batch_size)
+
+
+_worker_progress = None
+
+
+def init_index_worker(app, progress):
+    """Prepare a forked worker process for indexing"""
+    global _worker_progress
+    _worker_progress = progress
+    # Don't share the parent HTTP connections pool with the parent process
+    search._elastic_client = None
+    app.app_context().push()
+
+
+def report_progress(docs):
+    """Forward the number of processed documents to the parent process"""
+    processed = 0
+    for doc in docs:
+        yield doc
+        processed += 1
+        if processed == PROGRESS_STEP:
+            _worker_progress.put(processed)
+            processed = 0
+    if processed:
+        _worker_progress.put(processed)
+
+
+def index_range(
+    adapter,
+    id_range,
+    index_name=None,
+    reindex=False,
+    from_datetime=None,
+    bulk=False,
+    batch_size=None,
+):
+    """Index the objects of a model within an ObjectId range (executed in a worker process)"""
+    lower, upper = id_range
+    qs = model_queryset(adapter, from_datetime)
+    if lower:
+        qs = qs.filter(id__gte=lower)
+    if upper:
+        qs = qs.filter(id__lt=upper)
+    service = adapter.service_class(get_elastic_client())
+    docs = iter_qs(qs, adapter)
+    if _worker_progress is not None:
+        docs = report_progress(docs)
+    feed_docs(docs, adapter, service, index_name, reindex, bulk, batch_size)
+
+
+def parallel_index(adapter, id_ranges, count, label, **kwargs):
+    """
+    Index ObjectId ranges of a model in forked worker processes.
+
+    Workers progress is merged into a single progress bar.
+    """
+    ctx = multiprocessing.get_context("fork")
+    progress = ctx.Queue()
+    app = current_app._get_current_object()
+    with ctx.Pool(len(id_ranges), initializer=init_index_worker, initargs=(app, progress)) as pool:
+        result = pool.map_async(partial(index_range, adapter, **kwargs), id_ranges)
+        with click.progressbar(length=count, label=label) as bar:
+            while not result.ready():
+                try:
+                    bar.update(progress.get(timeout=0.5))
+                except queue.Empty:
+                    pass
+            while True:
+                try:
+                    bar.update(progress.get(timeout=0.1))
+                except queue.Empty:
+                    break
+        # Propagate workers exceptions
+        result.get()
 
 
 def finalize_reindex(models, start):
@@ -188,7 +370,16 @@ def clean_es(models=None):
 @click.argument("models", nargs=-1, metavar="[<model> ...]")
 @click.option("-r", "--reindex", default=False, type=bool)
 @click.option("-f", "--from_datetime", type=str)
-def index(models=None, reindex=True, from_datetime=None):
+@click.option(
+    "--bulk/--no-bulk",
+    default=None,
+    help="Use the Elasticsearch bulk API (default when reindexing)",
+)
+@click.option("-b", "--batch-size", type=int, help="Number of documents per bulk request")
+@click.option(
+    "-w", "--workers", default=1, type=click.IntRange(min=1), help="Number of worker processes"
+)
+def index(models=None, reindex=True, from_datetime=None, bulk=None, batch_size=None, workers=1):
     """
     Initialize or rebuild the search index
 
@@ -198,6 +389,13 @@ def index(models=None, reindex=True, from_datetime=None):
     If reindex is true, indexation will be made on a new index and unindexable documents ignored.
 
     If from_datetime is specified, only models modified since this datetime will be indexed.
+
+    If bulk is true, documents are sent by batches of batch_size documents
+    (defaults to ELASTICSEARCH_BULK_CHUNK_SIZE). Bulk indexing is enabled by default
+    when reindexing.
+
+    If workers is greater than 1, each model is split into ObjectId ranges
+    indexed in parallel by as many worker processes.
     """
     if not current_app.config["ELASTICSEARCH_URL"]:
         log.error("Missing ELASTICSEARCH_URL configuration")
@@ -216,7 +414,7 @@ def index(models=None, reindex=True, from_datetime=None):
 
     for adapter in iter_adapters():
         if not models or adapter.model.__name__.lower() in models:
-            index_model(adapter, start, reindex, from_datetime)
+            index_model(adapter, start, reindex, from_datetime, bulk, batch_size, workers)
 
     if reindex:
         finalize_reindex(models, start)
@@ -0,0 +1,21 @@
+from udata.mongo.pending import PendingUpdate
+
+__all__ = ("PendingIndexation",)
+
+
+class PendingIndexation(PendingUpdate):
+    """
+    An object whose search index entry is out of date.
+
+    When `AUTO_INDEX_COALESCE` is enabled, saved and deleted objects are marked here
+    instead of being (un)indexed right away, so that any number of updates of the same
+    object between two flushes results in a single indexation.
+    """
+
+    meta = {
+        "collection": "search_pending_indexations",
+        "indexes": [
+            {"fields": ["classname", "object_id"], "unique": True},
+            "created_at",
+        ],
+    }
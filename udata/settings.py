@@ -31,6 +31,9 @@ class Defaults(object):
     # Search configuration
     ELASTICSEARCH_URL = None
     ELASTICSEARCH_INDEX_BASENAME = None
+    # Bounds of a single `_bulk` request when bulk indexing
+    ELASTICSEARCH_BULK_CHUNK_SIZE = 500
+    ELASTICSEARCH_BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
 
     # BROKER_TRANSPORT = 'redis'
     CELERY_BROKER_URL = "redis://localhost:6379"
@@ -192,8 +195,15 @@ class Defaults(object):
     SITEMAP_S3_FILENAME_PREFIX: str = "sitemaps"
     SITEMAP_URLS_PER_FILE: int = 50000
     SITEMAP_BASE_URL: str | None = None
+    # Only re-render and re-upload the sitemap files whose objects changed since the last run
+    SITEMAP_INCREMENTAL: bool = False
+    # Upload gzipped sitemap files (`.xml.gz`), the sitemap index stays uncompressed
+    SITEMAP_GZIP: bool = False
 
     AUTO_INDEX = True
+    # Mark saved/deleted objects as pending instead of enqueuing a task per change.
+    # Pending objects are (un)indexed in bulk by the `flush-search-index` job.
+    AUTO_INDEX_COALESCE = False
 
     SITE_ID = "default"
     SITE_TITLE = "uData"
@@ -216,6 +226,18 @@ class Defaults(object):
     # API Token settings
     API_TOKEN_PREFIX = "udata_"
     API_TOKEN_SECRET = ""
+    # Duration (in seconds) authenticated API tokens are cached for in each process (0 to disable)
+    API_TOKEN_CACHE_TTL = 10
+    # Minimal delay (in seconds) between two writes of the API tokens usages (0 to write on each use)
+    API_TOKEN_USAGE_FLUSH_INTERVAL = 60
+
+    # Duration (in seconds) the resources permalinks target URLs are cached for (0 to disable)
+    RESOURCE_PERMALINK_CACHE_TTL = 300
+
+    # Duration (in seconds) the totals of the main listings are cached for (0 to disable)
+    PAGINATION_COUNT_CACHE_TTL = 30
+    # Use the collection metadata estimate as the total of unfiltered listings
+    PAGINATION_ESTIMATED_COUNT = False
 
     # OAuth 2 settings
     OAUTH2_PROVIDER_ERROR_ENDPOINT = "oauth.oauth_error"
@@ -334,6 +356,9 @@ class Defaults(object):
     # Development setting to allow minimizing the number of harvested items
     HARVEST_MAX_ITEMS = None
 
+    # The number of threads processing the items of a harvest page concurrently
+    HARVEST_ITEMS_WORKERS = 1
+
     # Harvesters are scheduled at midnight by default
     HARVEST_DEFAULT_SCHEDULE = "0 0 * * *"
 
@@ -348,6 +373,7 @@ class Defaults(object):
     HARVEST_MAX_CATALOG_SIZE_IN_MONGO = None  # Defaults to the size of a MongoDB document
     HARVEST_GRAPHS_S3_BUCKET = None  # If the catalog is bigger than `HARVEST_MAX_CATALOG_SIZE_IN_MONGO` store the graph inside S3 instead of MongoDB
     HARVEST_GRAPHS_S3_FILENAME_PREFIX = ""  # Useful to store the graphs inside a subfolder of the bucket. For example by setting `HARVEST_GRAPHS_S3_FILENAME_PREFIX = 'graphs/'`
+    HARVEST_GRAPHS_S3_COMPRESS = False  # Gzip the graphs pages stored inside the bucket
 
     HARVEST_ISO19139_XSLT_URL = "https://raw.githubusercontent.com/datagouv/iso-19139-to-dcat-ap/refs/heads/3.x-datagouv/iso-19139-to-dcat-ap.xsl"
 
@@ -495,6 +521,10 @@ class Defaults(object):
 
     # How much time upload chunks are kept before cleanup
     UPLOAD_MAX_RETENTION = 24 * HOUR
+    # Number of upload chunks fetched ahead while combining them (0 to fetch them one at a time)
+    UPLOAD_CHUNKS_PREFETCH = 2
+    # Assemble chunked uploads server-side when the chunks and their destination are on S3
+    UPLOAD_CHUNKS_S3_COPY = True
 
     # Avatar providers parameters
     # Overrides themes and default parameters
@@ -576,6 +606,8 @@ class Defaults(object):
         "harvest",
     )
     EXPORT_CSV_DATASET_ID = None
+    EXPORT_CSV_WORKERS = 1  # Number of worker processes building the models exports concurrently
+    EXPORT_CSV_GZIP = False  # Also store a gzipped version of each export as a resource
     EXPORT_CSV_ARCHIVE_S3_BUCKET = None  # If this setting is set, an archive is uploaded to the corresponding S3 bucket every first day of the month (if export-csv is scheduled to run daily)
     EXPORT_CSV_ARCHIVE_S3_FILENAME_PREFIX = ""  # Useful to store the csv archives inside a subfolder of the bucket, ie setting 'csv-catalog-archives/'`
 
@@ -583,6 +615,9 @@ class Defaults(object):
     #########################
     SEARCH_AUTOCOMPLETE_ENABLED = True
     SEARCH_AUTOCOMPLETE_DEBOUNCE = 200  # in ms
+    # Longest words prefix indexed for the `/suggest/` endpoints, longer queries words are
+    # matched against the indexed text instead.
+    SUGGEST_PREFIX_MAX_LENGTH = 20
 
     # Archive parameters
     ####################
@@ -673,6 +708,10 @@ class Defaults(object):
     # Metrics settings
     ###########################################################################
     METRICS_API = None
+    # Mark metrics depending on other objects (ex: an organization datasets count)
+    # as pending instead of recomputing them on each change of these objects.
+    # Pending metrics are recomputed by the `flush-metrics` job.
+    METRICS_COALESCE = False
 
     # Format families for search filtering
     ###########################################################################
@@ -174,6 +174,7 @@ def init_app(app):
     import udata.core.badges.tasks  # noqa
     import udata.core.storages.tasks  # noqa
     import udata.core.sitemap.tasks  # noqa
+    import udata.core.suggest.tasks  # noqa
     import udata.core.visualizations.tasks  # noqa
     import udata.features.notifications.tasks  # noqa
     import udata.notifications.tchap  # noqa
@@ -456,6 +456,25 @@ class DataserviceAPITest(APITestCase):
         self.assertEqual(response.json["total"], 1)
         self.assertEqual(response.json["data"][0]["title"], "B")
 
+    def test_dataservice_api_index_with_cursor(self):
+        for views in (42, None, 1337, 42):
+            DataserviceFactory(metrics={"views": views} if views is not None else {})
+        # Sorted by descending views (missing ones last) then descending ids
+        by_id = sorted(Dataservice.objects, key=lambda d: d.id, reverse=True)
+        by_views = sorted(by_id, key=lambda d: d.metrics.get("views", -1), reverse=True)
+        expected = [str(d.id) for d in by_views]
+
+        ids = []
+        url = url_for("api.dataservices", sort="-views", page_size=1, cursor="")
+        while url:
+            response = self.get(url)
+            self.assert200(response)
+            ids += [d["id"] for d in response.json["data"]]
+            url = response.json["next_page"]
+
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(ids, expected)
+
     def test_dataservice_api_index_with_sorts(self):
         DataserviceFactory(title="A", created_at="2024-03-01", metadata_modified_at="2024-03-01")
         DataserviceFactory(
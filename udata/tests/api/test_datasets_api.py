@@ -1,6 +1,8 @@
+import base64
 import json
 from datetime import UTC, datetime, timedelta
 from io import BytesIO
+from urllib.parse import parse_qs, urlparse
 from uuid import uuid4
 
 import feedparser
@@ -161,6 +163,85 @@ class DatasetAPITest(APITestCase):
         self.assert200(response)
         self.assertEqual(response.json["data"][0]["id"], str(oldest_updated_dataset_.id))
 
+    def test_dataset_api_cursor_pagination(self):
+        datasets = [DatasetFactory(title=title) for title in ("b", "a", "b", "c", "b")]
+        expected = [str(d.id) for d in sorted(datasets, key=lambda d: (d.title, d.id))]
+
+        ids = []
+        url = url_for("api.datasets", sort="title", page_size=2, cursor="")
+        while url:
+            response = self.get(url)
+            self.assert200(response)
+            self.assertIsNone(response.json["total"])
+            self.assertIsNone(response.json["previous_page"])
+            ids += [d["id"] for d in response.json["data"]]
+            url = response.json["next_page"]
+
+        self.assertEqual(ids, expected)
+
+    def test_dataset_api_cursor_pagination_default_sorting(self):
+        datasets = DatasetFactory.create_batch(3)
+
+        response = self.get(url_for("api.datasets", page_size=2, cursor=""))
+        self.assert200(response)
+        self.assertEqual(
+            [d["id"] for d in response.json["data"]], [str(datasets[2].id), str(datasets[1].id)]
+        )
+
+        response = self.get(response.json["next_page"])
+        self.assert200(response)
+        self.assertEqual([d["id"] for d in response.json["data"]], [str(datasets[0].id)])
+        self.assertIsNone(response.json["next_page"])
+
+    @pytest.mark.options(PAGINATION_COUNT_CACHE_TTL=30)
+    def test_dataset_api_list_cached_total(self, mocker):
+        counts = {}
+        mocker.patch.object(cache, "get", side_effect=counts.get)
+        mocker.patch.object(cache, "set", side_effect=lambda k, v, timeout: counts.update({k: v}))
+        DatasetFactory.create_batch(2)
+
+        response = self.get(url_for("api.datasets"))
+        self.assert200(response)
+        self.assertEqual(response.json["total"], 2)
+
+        DatasetFactory()
+        response = self.get(url_for("api.datasets"))
+        self.assertEqual(response.json["total"], 2)
+        self.assertEqual(len(response.json["data"]), 3)
+
+        # Counts are cached per filter
+        response = self.get(url_for("api.datasets", tag="not-existing"))
+        self.assertEqual(response.json["total"], 0)
+        self.assertEqual(len(counts), 2)
+
+    @pytest.mark.options(PAGINATION_COUNT_CACHE_TTL=0)
+    def test_dataset_api_list_total_without_cache(self):
+        DatasetFactory.create_batch(2)
+        self.assertEqual(self.get(url_for("api.datasets")).json["total"], 2)
+        DatasetFactory()
+        self.assertEqual(self.get(url_for("api.datasets")).json["total"], 3)
+
+    def test_dataset_api_invalid_cursor(self):
+        DatasetFactory.create_batch(2)
+
+        response = self.get(url_for("api.datasets", cursor="not-a-cursor"))
+        self.assert400(response)
+
+        response = self.get(url_for("api.datasets", sort="title", page_size=1, cursor=""))
+        cursor = parse_qs(urlparse(response.json["next_page"]).query)["cursor"][0]
+        response = self.get(url_for("api.datasets", sort="-created", cursor=cursor))
+        self.assert400(response)
+
+        for payload in (
+            '{"o": [], "v": [{"$oid": "zz"}]}',
+            '{"o": [], "v": [{"$date": "bad"}]}',
+            '{"o": [], "v": 5}',
+            '{"o": [["title", 1]], "v": [{"$ne": null}, {"$oid": "5f0000000000000000000000"}]}',
+        ):
+            cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+            response = self.get(url_for("api.datasets", sort="title", cursor=cursor))
+            self.assert400(response)
+
     def test_dataset_api_list_with_filters(self):
         """Should filters datasets results based on query filters"""
         owner = UserFactory()
@@ -2525,6 +2606,58 @@ class DatasetResourceAPITest(APITestCase):
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response.location, "https://example.com/data.csv")
 
+    def test_resource_redirect_follows_url_update(self):
+        """A cached permalink should be invalidated when the resource URL changes"""
+        resource = ResourceFactory(url="https://example.com/data.csv")
+        dataset = DatasetFactory(resources=[resource])
+        redirect_url = url_for("api.resource_redirect", id=resource.id)
+
+        response = self.get(redirect_url, follow_redirects=False)
+        self.assertEqual(response.location, "https://example.com/data.csv")
+
+        dataset.resources[0].url = "https://example.com/data-v2.csv"
+        dataset.save()
+
+        response = self.get(redirect_url, follow_redirects=False)
+        self.assertEqual(response.location, "https://example.com/data-v2.csv")
+
+    def test_resource_redirect_removed_by_dataset_save(self):
+        """A cached permalink should be invalidated when a save drops the resource"""
+        resource = ResourceFactory(url="https://example.com/data.csv")
+        dataset = DatasetFactory(resources=[resource, ResourceFactory()])
+        redirect_url = url_for("api.resource_redirect", id=resource.id)
+
+        response = self.get(redirect_url, follow_redirects=False)
+        self.assertEqual(response.location, "https://example.com/data.csv")
+
+        dataset.resources = dataset.resources[1:]
+        dataset.save()
+
+        self.assert404(self.get(redirect_url, follow_redirects=False))
+
+    def test_resource_redirect_of_deleted_dataset(self):
+        """A cached permalink should be invalidated when the dataset is deleted"""
+        resource = ResourceFactory(url="https://example.com/data.csv")
+        dataset = DatasetFactory(resources=[resource])
+        redirect_url = url_for("api.resource_redirect", id=resource.id)
+
+        response = self.get(redirect_url, follow_redirects=False)
+        self.assertEqual(response.location, "https://example.com/data.csv")
+
+        dataset.delete()
+
+        self.assert404(self.get(redirect_url, follow_redirects=False))
+
+    def test_resource_redirect_community_resource(self):
+        """It should redirect to a community resource URL"""
+        community_resource = CommunityResourceFactory(url="https://example.com/community.csv")
+
+        response = self.get(
+            url_for("api.resource_redirect", id=community_resource.id), follow_redirects=False
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.location, "https://example.com/community.csv")
+
     def test_resource_redirect_ignores_ambiguous_id(self):
         """A duplicated resource id resolves to nothing rather than to an arbitrary dataset
 
@@ -1,5 +1,6 @@
 from datetime import UTC, datetime, timedelta, timezone
 from io import BytesIO
+from unittest.mock import patch
 
 from flask import url_for
 
@@ -558,6 +559,78 @@ class MeAPITest(APITestCase):
         self.assert401(response)
         self.assertIn("Revoked", response.json["message"])
 
+    def test_token_auth_is_cached(self):
+        """Should only lookup the token once for successive calls"""
+        from udata.core.api_token.models import ApiToken
+
+        user = UserFactory()
+        token, plaintext = ApiToken.generate(user)
+
+        with patch.object(ApiToken, "authenticate", wraps=ApiToken.authenticate) as authenticate:
+            for _ in range(3):
+                response = self.get(url_for("api.me"), headers={"X-API-KEY": plaintext})
+                self.assert200(response)
+                self.assertEqual(response.json["id"], str(user.id))
+
+        authenticate.assert_called_once()
+
+    def test_cached_token_revocation(self):
+        """Should not authenticate a cached token once revoked"""
+        from udata.core.api_token.models import ApiToken
+
+        user = UserFactory()
+        token, plaintext = ApiToken.generate(user)
+        self.assert200(self.get(url_for("api.me"), headers={"X-API-KEY": plaintext}))
+
+        token.revoke()
+
+        response = self.get(url_for("api.me"), headers={"X-API-KEY": plaintext})
+        self.assert401(response)
+        self.assertIn("Revoked", response.json["message"])
+
+    def test_cached_token_sees_user_updates(self):
+        """Should serve the up to date user with a cached token"""
+        from udata.core.api_token.models import ApiToken
+
+        user = UserFactory(first_name="Before")
+        token, plaintext = ApiToken.generate(user)
+        headers = {"X-API-KEY": plaintext}
+        self.assert200(self.get(url_for("api.me"), headers=headers))
+
+        data = user.to_dict()
+        data["first_name"] = "After"
+        self.assert200(self.put(url_for("api.me"), data, headers=headers))
+
+        response = self.get(url_for("api.me"), headers=headers)
+        self.assert200(response)
+        self.assertEqual(response.json["first_name"], "After")
+
+        user.reload()
+        user.active = False
+        user.save()
+        self.assert401(self.get(url_for("api.me"), headers=headers))
+
+    def test_token_usage_is_batched(self):
+        """Should write the token usages in a single update"""
+        from udata.core.api_token.models import ApiToken, get_usage_tracker
+
+        user = UserFactory()
+        token, plaintext = ApiToken.generate(user)
+        for user_agent in ("first-agent", "second-agent", "first-agent"):
+            response = self.get(
+                url_for("api.me"), headers={"X-API-KEY": plaintext, "User-Agent": user_agent}
+            )
+            self.assert200(response)
+
+        token.reload()
+        self.assertIsNone(token.last_used_at)
+
+        self.assertEqual(get_usage_tracker().flush(), 1)
+
+        token.reload()
+        self.assertIsNotNone(token.last_used_at)
+        self.assertEqual(sorted(token.user_agents), ["first-agent", "second-agent"])
+
     def test_revoke_already_revoked_token_returns_410(self):
         """Should return 410 when trying to revoke an already revoked token"""
         self.login()
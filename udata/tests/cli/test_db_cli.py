@@ -0,0 +1,40 @@
+import pytest
+
+from udata.commands.db import check_references
+from udata.core.dataset.factories import DatasetFactory
+from udata.core.organization.factories import OrganizationFactory
+from udata.core.reuse.factories import ReuseFactory
+from udata.models import Dataset, Organization, Reuse
+from udata.tests.api import PytestOnlyDBTestCase
+
+
+class CheckIntegrityTest(PytestOnlyDBTestCase):
+    def test_no_broken_references(self, capsys):
+        DatasetFactory(organization=OrganizationFactory())
+
+        check_references(["Dataset"])
+
+        assert "Total errors: 0" in capsys.readouterr().out
+
+    def test_broken_references(self, capsys):
+        org = OrganizationFactory()
+        dataset = DatasetFactory(organization=org)
+        deleted = DatasetFactory()
+        reuse = ReuseFactory(datasets=[deleted, dataset])
+        empty = ReuseFactory(datasets=[dataset])
+        Organization._get_collection().delete_one({"_id": org.id})
+        Dataset._get_collection().delete_one({"_id": deleted.id})
+        Reuse._get_collection().update_one({"_id": empty.id}, {"$unset": {"datasets": 1}})
+
+        with pytest.raises(SystemExit):
+            check_references(["Dataset", "Reuse"], batch_size=1)
+
+        out = capsys.readouterr().out
+        assert f"Dataset#{dataset.id} have a broken reference for `organization`" in out
+        assert f"Reuse#{reuse.id} have a broken reference for datasets[0]" in out
+        assert f"Reuse#{reuse.id} have a broken reference for datasets[1]" not in out
+        assert (
+            f"Reuse#{empty.id} have a non existing field `datasets`, instead of an empty list"
+            in out
+        )
+        assert "Total errors: 3" in out
@@ -878,6 +878,26 @@ class LicenseModelTest(PytestOnlyDBTestCase):
         assert isinstance(found, License)
         assert license.id == found.id
 
+    def test_guess_without_queries(self, mocker):
+        license = LicenseFactory()
+        License.guess("warm up the index")
+
+        objects = mocker.patch.object(License, "objects")
+        assert License.guess(license.id).id == license.id
+        assert License.guess(license.title).id == license.id
+        assert License.guess("should not be found") is None
+        assert not objects.mock_calls
+
+    def test_index_invalidated_on_save(self):
+        assert License.guess("new-license") is None
+
+        license = LicenseFactory(id="new-license")
+        assert License.guess("new-license").id == license.id
+
+        license.title = "Renamed license"
+        license.save()
+        assert License.guess("Renamed license").title == "Renamed license"
+
 
 class ResourceSchemaTest(PytestOnlyDBTestCase):
     @pytest.mark.options(SCHEMA_CATALOG_URL="https://example.com/notfound")
@@ -1,5 +1,11 @@
+import gzip
+from functools import partial
+from unittest.mock import patch
+
 import pytest
 
+from udata.core import storages
+
 # Those imports seem mandatory for the csv adapters to be registered.
 # This might be because of the decorator mechanism.
 from udata.core.dataservices.models import Dataservice
@@ -180,3 +186,56 @@ class DatasetTasksTest(PytestOnlyDBTestCase):
             assert model in extras
         fs_filenames = [r.fs_filename for r in dataset.resources if r.url.endswith(r.fs_filename)]
         assert len(fs_filenames) == len(dataset.resources)
+
+    @pytest.mark.usefixtures("instance_path")
+    @pytest.mark.options(EXPORT_CSV_MODELS=("dataset", "tag"), EXPORT_CSV_GZIP=True)
+    def test_export_csv_gzip(self, app):
+        dataset = DatasetFactory()
+        DatasetFactory.create_batch(2)
+        app.config["EXPORT_CSV_DATASET_ID"] = dataset.id
+
+        report = tasks.export_csv()
+
+        assert report["dataset"]["rows"] == 3
+        dataset = Dataset.objects.get(id=dataset.id)
+        assert len(dataset.resources) == 4
+        for model in ("dataset", "tag"):
+            csv_resource = tasks.get_resource_for_csv_export_model(model, dataset)
+            gz_resource = tasks.get_resource_for_csv_export_model(model, dataset, "gzip")
+            assert csv_resource.format == "csv"
+            assert gz_resource.format == "csv.gz"
+            with storages.resources.open(csv_resource.fs_filename, "rb") as f:
+                content = f.read()
+            with storages.resources.open(gz_resource.fs_filename, "rb") as f:
+                assert gzip.decompress(f.read()) == content
+
+    @pytest.mark.options(EXPORT_CSV_GZIP=True)
+    def test_build_csv_export_failure_removes_files(self, tmp_path):
+        DatasetFactory()
+
+        def rows(self):
+            yield from ()
+            raise ValueError("boom")
+
+        temporary_file = partial(tasks.NamedTemporaryFile, dir=tmp_path)
+        with (
+            patch.object(tasks, "NamedTemporaryFile", temporary_file),
+            patch.object(DatasetCsvAdapter, "rows", rows),
+            pytest.raises(ValueError),
+        ):
+            tasks.build_csv_export("dataset")
+
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.usefixtures("instance_path")
+    @pytest.mark.options(EXPORT_CSV_MODELS=("dataset", "resource", "tag"), EXPORT_CSV_WORKERS=2)
+    def test_export_csv_workers(self, app):
+        dataset = DatasetFactory()
+        app.config["EXPORT_CSV_DATASET_ID"] = dataset.id
+
+        report = tasks.export_csv()
+
+        assert set(report) == {"dataset", "resource", "tag"}
+        dataset = Dataset.objects.get(id=dataset.id)
+        extras = sorted(r.extras["csv-export:model"] for r in dataset.resources)
+        assert extras == ["dataset", "resource", "tag"]
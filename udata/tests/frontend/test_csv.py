@@ -257,6 +257,60 @@ class CsvTest(APITestCase):
             self.assertEqual(row[0], obj.title)
             self.assertEqual(row[1], obj.description)
 
+    def test_adapter_projection(self):
+        class Adapter(csv.Adapter):
+            fields = (
+                "title",
+                ("key", "sub.key"),
+                ("tags", lambda o: ",".join(o.tags)),
+                "other_method",
+                "not_a_field",
+            )
+            requires = ("tags",)
+
+            def field_other_method(self, obj):
+                return obj.other
+
+        self.assertEqual(Adapter([]).get_projection(Fake), ["sub", "tags", "title"])
+
+    def test_adapter_without_requires_has_no_projection(self):
+        class Adapter(csv.Adapter):
+            fields = ("title", "description")
+
+        self.assertIsNone(Adapter([]).get_projection(Fake))
+
+    def test_adapter_only_loads_projected_fields(self):
+        class Adapter(csv.Adapter):
+            fields = ("title", ("tags", lambda o: ",".join(o.tags)))
+            requires = ("tags",)
+
+        fake = FakeFactory()
+        adapter = Adapter(Fake.objects)
+
+        [row] = list(adapter.rows())
+        self.assertEqual(row, [fake.title, ",".join(fake.tags)])
+        self.assertEqual(adapter.queryset._loaded_fields.as_dict(), {"title": 1, "tags": 1})
+
+    def test_nested_adapter_projection(self):
+        class Adapter(NestedAdapter):
+            requires = ()
+
+        self.assertEqual(Adapter([]).get_projection(Fake), ["description", "title", "nested"])
+
+    def test_yield_rows_by_chunks(self):
+        @csv.adapter(Fake)
+        class Adapter(csv.Adapter):
+            fields = ["title", "description"]
+
+        objects = FakeFactory.build_batch(10)
+        chunks = list(csv.yield_rows(Adapter(objects), chunk_size=200))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk.endswith("\r\n") for chunk in chunks))
+        reader = csv.get_reader(StringIO("".join(chunks)))
+        self.assertEqual(next(reader), ["title", "description"])
+        self.assertEqual([row[0] for row in reader], [obj.title for obj in objects])
+
     def assert_stream_csv(self, endpoint):
         return self.assert_csv(endpoint, [FakeFactory() for _ in range(3)])
 
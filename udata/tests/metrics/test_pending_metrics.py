@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import pytest
+
+from udata.core.dataset.factories import DatasetFactory
+from udata.core.metrics import flush_pending_metrics
+from udata.core.metrics.models import PendingMetricsUpdate
+from udata.core.organization.factories import OrganizationFactory
+from udata.core.reuse.factories import ReuseFactory
+from udata.models import Dataset, Organization
+from udata.tests.api import PytestOnlyDBTestCase
+
+
+@pytest.mark.options(METRICS_COALESCE=True)
+class PendingMetricsTest(PytestOnlyDBTestCase):
+    def test_changes_are_coalesced(self):
+        org = OrganizationFactory()
+        dataset = DatasetFactory(organization=org)
+
+        dataset.title = "New title"
+        dataset.save()
+        DatasetFactory(organization=org)
+
+        assert Organization.objects.get(id=org.id).get_metrics()["datasets"] == 0
+        [pending] = PendingMetricsUpdate.objects(classname="Organization")
+        assert pending.object_id == str(org.id)
+        assert pending.metric == "datasets"
+
+    def test_flush(self):
+        org = OrganizationFactory()
+        datasets = DatasetFactory.create_batch(2, organization=org)
+        ReuseFactory(organization=org, datasets=datasets)
+
+        flushed = flush_pending_metrics(batch_size=2)
+
+        assert flushed == 4  # Organization datasets and reuses, and each dataset reuses
+        assert PendingMetricsUpdate.objects.count() == 0
+        org.reload()
+        assert org.get_metrics()["datasets"] == 2
+        assert org.get_metrics()["reuses"] == 1
+        for dataset in Dataset.objects:
+            assert dataset.get_metrics()["reuses"] == 1
+
+    def test_flush_deleted_object(self):
+        org = OrganizationFactory()
+        DatasetFactory(organization=org)
+        org.delete()
+
+        assert flush_pending_metrics() == 1
+        assert PendingMetricsUpdate.objects.count() == 0
+
+    def test_flush_nothing_pending(self):
+        assert flush_pending_metrics() == 0
+
+    def test_flush_failing_metric(self):
+        org = OrganizationFactory()
+        datasets = DatasetFactory.create_batch(2, organization=org)
+        ReuseFactory(organization=org, datasets=datasets)
+
+        with patch.object(Organization, "count_datasets", side_effect=ValueError("boom")):
+            assert flush_pending_metrics() == 4
+
+        assert PendingMetricsUpdate.objects.count() == 0
+        for dataset in Dataset.objects:
+            assert dataset.get_metrics()["reuses"] == 1
@@ -58,3 +58,15 @@ class FakeSearch(search.ModelSearchAdapter):
             "title": fake.title,
             "description": fake.description,
         }
+
+
+class FakeBulkFeed:
+    """Consume entities like `BaseService.feed_bulk` and keep track of them"""
+
+    def __init__(self):
+        self.entities = []
+
+    def __call__(self, entities, **kwargs):
+        for entity in entities:
+            self.entities.append(entity)
+            yield True, {"index": {"_id": entity.id, "status": 201}}
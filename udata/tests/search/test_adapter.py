@@ -13,7 +13,7 @@ from udata.core.dataset.factories import (
     HiddenDatasetFactory,
     ResourceFactory,
 )
-from udata.core.dataset.models import Schema
+from udata.core.dataset.models import Dataset, Schema
 from udata.core.dataset.search import DatasetSearch
 from udata.core.organization.constants import (
     ASSOCIATION,
@@ -30,11 +30,11 @@ from udata.core.topic.factories import TopicElementDatasetFactory, TopicFactory
 from udata.core.user.factories import UserFactory
 from udata.i18n import gettext as _
 from udata.search import as_task_param, reindex
-from udata.search.commands import finalize_reindex, index_model
+from udata.search.commands import finalize_reindex, index_model, index_range, split_id_ranges
 from udata.tests.api import APITestCase
 from udata.utils import clean_string
 
-from . import FakeSearch
+from . import FakeBulkFeed, FakeSearch
 
 #############################################################################
 #                  Custom search adapters and metrics                       #
@@ -222,6 +222,47 @@ class ConfigureIndicesNoPrefixTest:
             assert cls._index._name == cls.Index.name
 
 
+class BulkIndexTest:
+    def test_bulk_index_targets_given_index(self):
+        from udata_search_service.entities import Organization
+        from udata_search_service.search_clients import ElasticClient
+        from udata_search_service.services import OrganizationService
+
+        client = ElasticClient("http://localhost:9200", "bulk")
+        organization = Organization(
+            id="org-1",
+            name="Ma structure",
+            description="test",
+            url="http://example.com",
+            orga_sp=1,
+            created_at="2024-01-01",
+            followers=0,
+            datasets=0,
+            views=0,
+            reuses=0,
+        )
+
+        def fake_streaming_bulk(es, actions, **kwargs):
+            for action in actions:
+                yield True, {"index": action}
+
+        with patch(
+            "udata_search_service.search_clients.streaming_bulk", side_effect=fake_streaming_bulk
+        ) as mock_bulk:
+            service = OrganizationService(client)
+            results = list(
+                service.feed_bulk([organization], index="bulk-organization-new", chunk_size=10)
+            )
+
+        assert mock_bulk.call_args[1]["chunk_size"] == 10
+        assert mock_bulk.call_args[1]["raise_on_error"] is False
+        [(ok, item)] = results
+        assert ok
+        assert item["index"]["_index"] == "bulk-organization-new"
+        assert item["index"]["_id"] == "org-1"
+        assert item["index"]["_source"]["name"] == "Ma structure"
+
+
 @pytest.mark.options(ELASTICSEARCH_URL="http://localhost:9200")
 class IndexingLifecycleTest(APITestCase):
     @patch("udata.search.get_elastic_client")
@@ -253,16 +294,66 @@ class IndexingLifecycleTest(APITestCase):
             mock_service.feed.assert_called_once()
 
     @patch("udata.search.commands.get_elastic_client")
-    def test_reindex_model_creates_index_and_feeds(self, mock_get_client):
+    def test_reindex_model_creates_index_and_feeds_in_bulk(self, mock_get_client):
         DatasetFactory(id="61fd30cb29ea95c7bc0e1211")
         mock_es = mock_get_client.return_value.es
 
         with patch.object(DatasetSearch, "service_class") as mock_service_class:
             mock_service = mock_service_class.return_value
+            mock_service.feed_bulk.side_effect = feed = FakeBulkFeed()
             index_model(DatasetSearch, start=datetime.datetime(2022, 2, 20, 20, 2), reindex=True)
             mock_es.indices.create.assert_called_once()
+            mock_service.feed.assert_not_called()
+            mock_service.feed_bulk.assert_called_once()
+            assert mock_service.feed_bulk.call_args[1]["index"] == (
+                "udata-test-dataset-2022-02-20-20-02"
+            )
+            assert [e.id for e in feed.entities] == ["61fd30cb29ea95c7bc0e1211"]
+
+    @patch("udata.search.commands.get_elastic_client")
+    def test_reindex_model_without_bulk(self, mock_get_client):
+        DatasetFactory(id="61fd30cb29ea95c7bc0e1211")
+
+        with patch.object(DatasetSearch, "service_class") as mock_service_class:
+            mock_service = mock_service_class.return_value
+            index_model(
+                DatasetSearch,
+                start=datetime.datetime(2022, 2, 20, 20, 2),
+                reindex=True,
+                bulk=False,
+            )
+            mock_service.feed_bulk.assert_not_called()
             mock_service.feed.assert_called_once()
 
+    @patch("udata.search.commands.get_elastic_client")
+    def test_index_model_in_bulk(self, mock_get_client):
+        DatasetFactory.create_batch(3)
+        HiddenDatasetFactory(id="61fd30cb29ea95c7bc0e1211")
+
+        with patch.object(DatasetSearch, "service_class") as mock_service_class:
+            mock_service = mock_service_class.return_value
+            mock_service.feed_bulk.side_effect = feed = FakeBulkFeed()
+            index_model(DatasetSearch, start=None, bulk=True, batch_size=2)
+            assert mock_service.feed_bulk.call_args[1]["chunk_size"] == 2
+            assert len(feed.entities) == 3
+            # Unindexable documents are still removed from the existing index
+            mock_service.delete_one.assert_called_once_with("61fd30cb29ea95c7bc0e1211")
+
+    @patch("udata.search.commands.get_elastic_client")
+    def test_index_model_in_bulk_reports_errors(self, mock_get_client):
+        DatasetFactory.create_batch(2)
+
+        def failing_feed_bulk(entities, **kwargs):
+            for entity in entities:
+                yield False, {"index": {"_id": entity.id, "error": "mapper_parsing_exception"}}
+
+        with patch.object(DatasetSearch, "service_class") as mock_service_class:
+            mock_service = mock_service_class.return_value
+            mock_service.feed_bulk.side_effect = failing_feed_bulk
+            with patch("udata.search.commands.log") as mock_log:
+                index_model(DatasetSearch, start=None, bulk=True)
+            assert mock_log.error.call_count == 2
+
     @patch("udata.search.commands.get_elastic_client")
     def test_index_model_from_datetime(self, mock_get_client):
         DatasetFactory(
@@ -283,6 +374,63 @@ class IndexingLifecycleTest(APITestCase):
             mock_service.feed.assert_called_once()
 
 
+@pytest.mark.options(ELASTICSEARCH_URL="http://localhost:9200")
+class ParallelIndexingTest(APITestCase):
+    def test_split_id_ranges(self):
+        datasets = DatasetFactory.create_batch(10)
+        ids = sorted(d.id for d in datasets)
+        qs = Dataset.objects
+
+        ranges = split_id_ranges(qs, 10, 3)
+
+        assert len(ranges) == 3
+        assert ranges[0][0] is None
+        assert ranges[-1][1] is None
+        for previous, following in zip(ranges, ranges[1:]):
+            assert previous[1] == following[0]
+        covered = []
+        for lower, upper in ranges:
+            part = qs
+            if lower:
+                part = part.filter(id__gte=lower)
+            if upper:
+                part = part.filter(id__lt=upper)
+            covered.extend(part.scalar("id"))
+        assert sorted(covered) == ids
+
+    def test_split_id_ranges_with_less_objects_than_parts(self):
+        DatasetFactory()
+
+        assert split_id_ranges(Dataset.objects, 1, 4) == [(None, None)]
+
+    @patch("udata.search.commands.get_elastic_client")
+    def test_index_range(self, mock_get_client):
+        datasets = sorted(DatasetFactory.create_batch(4), key=lambda d: d.id)
+
+        with patch.object(DatasetSearch, "service_class") as mock_service_class:
+            mock_service = mock_service_class.return_value
+            index_range(DatasetSearch, (datasets[1].id, datasets[3].id))
+            fed = [call.args[0].id for call in mock_service.feed.call_args_list]
+            assert fed == [str(datasets[1].id), str(datasets[2].id)]
+
+    @patch("udata.search.commands.parallel_index")
+    @patch("udata.search.commands.get_elastic_client")
+    def test_index_model_with_workers(self, mock_get_client, mock_parallel_index):
+        DatasetFactory.create_batch(4)
+
+        with patch.object(DatasetSearch, "service_class"):
+            index_model(
+                DatasetSearch, start=datetime.datetime(2022, 2, 20, 20, 2), reindex=True, workers=2
+            )
+
+        mock_parallel_index.assert_called_once()
+        args, kwargs = mock_parallel_index.call_args
+        assert len(args[1]) == 2
+        assert args[2] == 4
+        assert kwargs["index_name"] == "udata-test-dataset-2022-02-20-20-02"
+        assert kwargs["bulk"] is True
+
+
 @pytest.mark.options(ELASTICSEARCH_URL="http://localhost:9200")
 class FinalizeReindexTest(APITestCase):
     @patch("udata.search.commands.get_elastic_client")
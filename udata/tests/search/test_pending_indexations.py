@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+import pytest
+
+from udata.core.dataset.factories import DatasetFactory, HiddenDatasetFactory
+from udata.core.dataset.search import DatasetSearch
+from udata.search import flush_pending_indexations, reindex
+from udata.search.models import PendingIndexation
+from udata.tests.api import PytestOnlyDBTestCase
+
+from . import FakeBulkFeed
+
+
+@pytest.mark.options(
+    AUTO_INDEX=True, AUTO_INDEX_COALESCE=True, ELASTICSEARCH_URL="http://localhost:9200"
+)
+class PendingIndexationsTest(PytestOnlyDBTestCase):
+    def test_saves_are_coalesced(self, mocker):
+        job_reindex = mocker.patch.object(reindex, "delay")
+        dataset = DatasetFactory()
+
+        dataset.title = "New title"
+        dataset.save()
+        dataset.description = "New description"
+        dataset.save()
+
+        job_reindex.assert_not_called()
+        [pending] = PendingIndexation.objects(classname="Dataset")
+        assert pending.object_id == str(dataset.id)
+
+    def test_deletes_are_marked(self, mocker):
+        dataset = DatasetFactory()
+        PendingIndexation.drop_collection()
+
+        dataset.delete()
+
+        assert PendingIndexation.objects(object_id=str(dataset.id)).count() == 1
+
+    @patch("udata.search.get_elastic_client")
+    def test_flush(self, mock_get_client):
+        datasets = DatasetFactory.create_batch(3)
+        hidden = HiddenDatasetFactory()
+        deleted = DatasetFactory()
+        deleted.delete()
+
+        with patch.object(DatasetSearch, "service_class") as mock_service_class:
+            mock_service = mock_service_class.return_value
+            mock_service.feed_bulk.side_effect = feed = FakeBulkFeed()
+            flushed = flush_pending_indexations(batch_size=2)
+
+        assert flushed == 5
+        assert sorted(e.id for e in feed.entities) == sorted(str(d.id) for d in datasets)
+        unindexed = {call.args[0] for call in mock_service.delete_one.call_args_list}
+        assert unindexed == {str(hidden.id), str(deleted.id)}
+        assert PendingIndexation.objects.count() == 0
+
+    @patch("udata.search.get_elastic_client")
+    def test_flush_nothing_pending(self, mock_get_client):
+        with patch.object(DatasetSearch, "service_class") as mock_service_class:
+            assert flush_pending_indexations() == 0
+            mock_service_class.assert_not_called()
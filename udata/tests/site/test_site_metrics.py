@@ -7,6 +7,7 @@ from udata.core.dataset.factories import (
 from udata.core.organization.constants import PUBLIC_SERVICE
 from udata.core.reuse.factories import VisibleReuseFactory
 from udata.core.site.factories import SiteFactory
+from udata.core.site.models import Site
 from udata.harvest.tests.factories import HarvestSourceFactory
 from udata.tests.api import PytestOnlyDBTestCase
 
@@ -73,3 +74,37 @@ class SiteMetricTest(PytestOnlyDBTestCase):
         site.count_harvesters()
 
         assert site.get_metrics()["harvesters"] == len(sources)
+
+    def test_compute_metrics(self, app):
+        site = SiteFactory.create(id=app.config["SITE_ID"])
+        OrganizationFactory.create_batch(2)
+        DatasetFactory.create_batch(3, nb_resources=2)
+        DatasetFactory(metrics={"followers": 7, "reuses": 4})
+        HiddenDatasetFactory.create_batch(2, nb_resources=5)
+        VisibleReuseFactory.create_batch(4)
+        DataserviceFactory.create_batch(2)
+        sources = [HarvestSourceFactory() for _ in range(3)]
+
+        site.compute_metrics()
+
+        metrics = Site.objects.get(id=site.id).get_metrics()
+        assert metrics == site.get_metrics()
+        assert metrics["datasets"] == 4
+        assert metrics["resources"] == 6
+        assert metrics["max_dataset_followers"] == 7
+        assert metrics["max_dataset_reuses"] == 4
+        assert metrics["reuses"] == 4
+        assert metrics["dataservices"] == 2
+        assert metrics["harvesters"] == len(sources)
+        assert sum(metrics["datasets_by_months"].values()) == 4
+        assert sum(metrics["harvesters_by_months"].values()) == len(sources)
+
+    def test_compute_metrics_drop(self, app):
+        site = SiteFactory.create(id=app.config["SITE_ID"], metrics={"obsolete": 42})
+
+        site.compute_metrics(drop=True)
+
+        site = Site.objects.get(id=site.id)
+        assert "obsolete" not in site.metrics
+        assert site.metrics["datasets"] == 0
+        assert site.metrics["max_org_followers"] == 0
@@ -7,7 +7,7 @@ from mongoengine.signals import post_save
 
 from udata.api_fields import field
 from udata.auth import login_user
-from udata.core.activity.models import Activity, Auditable
+from udata.core.activity.models import Activity, Auditable, auditing_suspended
 from udata.core.organization.factories import OrganizationFactory
 from udata.core.user.factories import UserFactory
 from udata.mongo.datetime_fields import DateField, DateRange
@@ -248,3 +248,59 @@ class AuditableTest(APITestCase):
             fake.ref_list[1].save()
             fake.not_auditable = "changed"
             fake.save()
+
+    def test_previous_values_from_loaded_state(self):
+        """Previous values should come from the loaded document, without fetching it again"""
+        FakeAuditableSubject.objects.create(name="fake", tags=["some", "tags"])
+        fake = FakeAuditableSubject.objects.get(name="fake")
+        # Not seen by the loaded document
+        FakeAuditableSubject.objects(id=fake.id).update(set__name="elsewhere")
+
+        def check_previous_name(expected):
+            def check(kwargs):
+                self.assertEqual(kwargs["changed_fields"], ["name"])
+                self.assertEqual(kwargs["previous"]["name"], expected)
+
+            return check
+
+        fake.name = "different"
+        with assert_emit(
+            FakeAuditableSubject.on_update, assertions_callback=check_previous_name("fake")
+        ):
+            fake.save()
+
+        # The saved values are the previous ones of the next save
+        fake.name = "again"
+        with assert_emit(
+            FakeAuditableSubject.on_update, assertions_callback=check_previous_name("different")
+        ):
+            fake.save()
+
+    def test_previous_values_after_update_and_reload(self):
+        """Previous values should not come from a state outdated by an update"""
+        fake = FakeAuditableSubject.objects.create(name="A")
+        fake = FakeAuditableSubject.objects.get(id=fake.id)
+        fake.update(set__name="B")
+        fake.reload()
+
+        def check(kwargs):
+            self.assertEqual(kwargs["changed_fields"], ["name"])
+            self.assertEqual(kwargs["previous"]["name"], "B")
+
+        fake.name = "A"
+        with assert_emit(FakeAuditableSubject.on_update, assertions_callback=check):
+            fake.save()
+
+    def test_auditing_suspended(self):
+        """It should not audit documents saved in bulk"""
+        fake = FakeAuditableSubject.objects.create(name="fake")
+
+        fake.name = "different"
+        with auditing_suspended():
+            with assert_not_emit(FakeAuditableSubject.on_update):
+                with assert_emit(FakeAuditableSubject.after_save):
+                    fake.save()
+
+        fake.name = "again"
+        with assert_emit(FakeAuditableSubject.on_update):
+            fake.save()
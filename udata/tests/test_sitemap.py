@@ -1,3 +1,5 @@
+import gzip
+from datetime import datetime
 from unittest.mock import patch
 from xml.etree import ElementTree
 
@@ -6,6 +8,7 @@ from flask import current_app
 
 from udata.core.dataservices.factories import DataserviceFactory
 from udata.core.dataset.factories import DatasetFactory
+from udata.core.dataset.models import Dataset
 from udata.core.organization.factories import OrganizationFactory
 from udata.core.post.factories import PostFactory
 from udata.core.reuse.factories import VisibleReuseFactory
@@ -23,16 +26,22 @@ def parse_xml(bytes):
 @pytest.mark.options(SITEMAP_BASE_URL="https://data.gouv.fr")
 @pytest.mark.options(SITEMAP_S3_BUCKET="udata-sitemap")
 class SitemapGeneratorTest(PytestOnlyDBTestCase):
-    def _generate(self, **config):
+    def _generate(self, previous=None, **kwargs):
         uploaded = {}
 
         def fake_store_bytes(bucket, filename, bytes, **kwargs):
             uploaded[filename] = bytes
 
-        with patch("udata.core.sitemap.generator.store_bytes", side_effect=fake_store_bytes):
+        def fake_get_bytes(bucket, filename):
+            return (previous or {}).get(filename)
+
+        with (
+            patch("udata.core.sitemap.generator.store_bytes", side_effect=fake_store_bytes),
+            patch("udata.core.sitemap.generator.get_bytes", side_effect=fake_get_bytes),
+        ):
             from udata.core.sitemap.generator import generate_sitemaps
 
-            result = generate_sitemaps()
+            result = generate_sitemaps(**kwargs)
 
         return result, uploaded
 
@@ -168,3 +177,67 @@ class SitemapGeneratorTest(PytestOnlyDBTestCase):
             .decode("utf-8")
             .startswith('<?xml version="1.0" encoding="UTF-8"?>')
         )
+
+    @pytest.mark.options(SITEMAP_URLS_PER_FILE=2)
+    def test_incremental_only_uploads_changed_shards(self):
+        datasets = DatasetFactory.create_batch(5)
+        _, previous = self._generate()
+
+        Dataset.objects(id=datasets[2].id).update(last_modified_internal=datetime(2030, 1, 1))
+        result, uploaded = self._generate(previous, incremental=True)
+
+        assert result is True
+        assert "sitemaps/datasets_1.xml" not in uploaded
+        assert "sitemaps/datasets_3.xml" not in uploaded
+        shard = parse_xml(uploaded["sitemaps/datasets_2.xml"])
+        assert shard[0].find(f"{{{SITEMAP_NS}}}lastmod").text == "2030-01-01T00:00:00Z"
+        assert len(parse_xml(uploaded["sitemaps/sitemap.xml"])) == 3
+
+    @pytest.mark.options(SITEMAP_URLS_PER_FILE=2)
+    def test_incremental_keeps_shards_ranges(self):
+        datasets = DatasetFactory.create_batch(4)
+        _, previous = self._generate()
+
+        Dataset.objects(id=datasets[0].id).update(deleted=datetime(2024, 1, 1))
+        DatasetFactory()
+        result, uploaded = self._generate(previous, incremental=True)
+
+        assert result is True
+        # The deleted dataset only changes the first shard
+        assert len(parse_xml(uploaded["sitemaps/datasets_1.xml"])) == 1
+        assert "sitemaps/datasets_2.xml" not in uploaded
+        # New datasets are appended in a new shard
+        assert len(parse_xml(uploaded["sitemaps/datasets_3.xml"])) == 1
+        assert len(parse_xml(uploaded["sitemaps/sitemap.xml"])) == 3
+
+    @pytest.mark.options(SITEMAP_URLS_PER_FILE=2)
+    def test_incremental_ignores_manifest_with_other_settings(self):
+        DatasetFactory.create_batch(3)
+        _, previous = self._generate()
+
+        current_app.config["SITEMAP_URLS_PER_FILE"] = 3
+        result, uploaded = self._generate(previous, incremental=True)
+
+        assert result is True
+        assert len(parse_xml(uploaded["sitemaps/datasets_1.xml"])) == 3
+
+    def test_full_generation_ignores_manifest(self):
+        DatasetFactory()
+        _, previous = self._generate()
+
+        result, uploaded = self._generate(previous)
+
+        assert result is True
+        assert "sitemaps/datasets_1.xml" in uploaded
+
+    @pytest.mark.options(SITEMAP_GZIP=True)
+    def test_gzip(self):
+        dataset = DatasetFactory()
+
+        result, uploaded = self._generate()
+
+        assert result is True
+        url_elem = parse_xml(gzip.decompress(uploaded["sitemaps/datasets_1.xml.gz"]))[0]
+        assert url_elem.find(f"{{{SITEMAP_NS}}}loc").text == dataset.self_web_url()
+        loc = parse_xml(uploaded["sitemaps/sitemap.xml"])[0].find(f"{{{SITEMAP_NS}}}loc")
+        assert loc.text.endswith("/sitemaps/datasets_1.xml.gz")
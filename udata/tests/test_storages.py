@@ -11,7 +11,7 @@ from werkzeug.wrappers import Request
 
 from udata.core import storages
 from udata.core.storages import utils
-from udata.core.storages.api import META, ChunksReader, chunk_filename
+from udata.core.storages.api import META, ChunksReader, chunk_filename, discard_chunks
 from udata.core.storages.tasks import purge_chunks
 from udata.tests import PytestOnlyTestCase
 from udata.utils import faker
@@ -220,3 +220,35 @@ class ChunksReaderTest(PytestOnlyTestCase):
         assert reader.readinto(target) == 2
         assert bytes(target[:2]) == b"89"
         assert reader.readinto(target) == 0
+
+    @pytest.mark.parametrize("prefetch", [0, 1, 5])
+    def test_reads_every_part_whatever_the_prefetch(self, client, prefetch):
+        uuid = str(uuid4())
+        parts = [str(index).encode() * 100 for index in range(4)]
+        self.store_parts(uuid, parts)
+
+        stream = io.BufferedReader(ChunksReader(uuid, len(parts), prefetch), buffer_size=64)
+
+        assert stream.read() == b"".join(parts)
+
+    def test_fetches_the_next_parts_ahead(self, client):
+        uuid = str(uuid4())
+        self.store_parts(uuid, [b"first", b"second", b"third", b"fourth"])
+        reader = ChunksReader(uuid, 4, prefetch=2)
+        target = bytearray(1)
+
+        assert reader.readinto(target) == 1
+
+        # The first part is being read while the two next ones are fetched
+        assert len(reader.fetching) == 2
+        assert reader.next_part == 3
+        reader.close()
+
+    def test_discard_chunks(self, client):
+        uuid = str(uuid4())
+        self.store_parts(uuid, [b"first", b"second"])
+        storages.chunks.write(chunk_filename(uuid, META), "{}")
+
+        discard_chunks(uuid, 2)
+
+        assert list(storages.chunks.list_files()) == []
@@ -1,3 +1,4 @@
+import hashlib
 from io import BytesIO
 from uuid import uuid4
 
@@ -7,6 +8,7 @@ from flask_storage.errors import UnauthorizedFileType
 
 from udata.core import storages
 from udata.core.dataset.factories import DatasetFactory
+from udata.core.storages.api import S3_MIN_PART_SIZE
 from udata.tests import PytestOnlyTestCase
 from udata.tests.api import APITestCase
 from udata.tests.helpers import requires_s3_service
@@ -127,3 +129,44 @@ class S3ResourceUploadTest(APITestCase):
             "type": "sha1",
             "value": "81fe8bfe87576c3ecb22426f8e57847382917acf",
         }
+
+    def test_chunked_upload_assembled_by_s3(self):
+        user = self.login()
+        dataset = DatasetFactory(owner=user)
+        url = url_for("api.upload_new_dataset_resource", dataset=dataset)
+        uuid = str(uuid4())
+        # Every part but the last one must be at least 5MB to be copied by S3
+        parts = [b"a" * S3_MIN_PART_SIZE, b"b" * S3_MIN_PART_SIZE, b"c"]
+
+        for index, part in enumerate(parts):
+            response = self.post(
+                url,
+                {
+                    "file": (BytesIO(part), "blob"),
+                    "uuid": uuid,
+                    "filename": "test.txt",
+                    "partindex": index,
+                    "partbyteoffset": 0,
+                    "totalparts": len(parts),
+                    "chunksize": len(part),
+                },
+                json=False,
+            )
+            self.assert200(response)
+
+        response = self.post(
+            url,
+            {"uuid": uuid, "filename": "test.txt", "totalparts": len(parts)},
+            json=False,
+        )
+
+        self.assert201(response)
+        dataset.reload()
+        resource = dataset.resources[0]
+        assert storages.resources.read(resource.fs_filename) == b"".join(parts)
+        assert list(storages.chunks.list_files()) == []
+        assert response.json["filesize"] == sum(len(part) for part in parts)
+        assert response.json["checksum"] == {
+            "type": "sha1",
+            "value": hashlib.sha1(b"".join(parts)).hexdigest(),
+        }
@@ -0,0 +1,79 @@
+import pytest
+
+from udata.core.dataset.factories import DatasetFactory
+from udata.core.dataset.models import Dataset
+from udata.core.organization.factories import OrganizationFactory
+from udata.core.organization.models import Organization
+from udata.core.suggest import index_model, suggest
+from udata.core.suggest.models import SuggestEntry, normalize, prefixes, tokenize
+from udata.tests import PytestOnlyTestCase
+from udata.tests.api import PytestOnlyDBTestCase
+
+
+class SuggestTokenizationTest(PytestOnlyTestCase):
+    def test_normalize_folds_accents_and_case(self):
+        assert normalize("Ministère de l'Intérieur") == "ministere de l'interieur"
+
+    def test_tokenize(self):
+        assert tokenize("Ministère de l'Intérieur") == ["ministere", "de", "l", "interieur"]
+        assert tokenize("fr:commune:75056") == ["fr", "commune", "75056"]
+        assert tokenize("  ") == []
+
+    def test_prefixes(self):
+        assert prefixes(["data", "dat"], 3) == ["d", "da", "dat"]
+
+
+class SuggestTest(PytestOnlyDBTestCase):
+    def test_index_on_save(self):
+        dataset = DatasetFactory(title="Qualité de l'air", metrics={"followers": 3})
+
+        entry = SuggestEntry.objects.get(classname="Dataset", object_id=str(dataset.id))
+        assert entry.text == "qualite de l air"
+        assert "qual" in entry.prefixes
+        assert entry.score == 3
+
+        assert suggest(Dataset, "QUALITE air") == [dataset]
+        assert suggest(Dataset, "air qualité") == [dataset]
+        assert suggest(Dataset, "quality") == []
+
+    def test_unindex_hidden_and_deleted(self):
+        dataset = DatasetFactory(title="Qualité de l'air")
+        org = OrganizationFactory(name="Qualité de l'air")
+
+        dataset.private = True
+        dataset.save()
+        org.delete()
+
+        assert SuggestEntry.objects.count() == 0
+        assert suggest(Dataset, "qualite") == []
+        assert suggest(Organization, "qualite") == []
+
+    def test_ranked_by_score(self):
+        less_followed = DatasetFactory(title="air 1", metrics={"followers": 1})
+        most_followed = DatasetFactory(title="air 2", metrics={"followers": 10})
+        followed = DatasetFactory(title="air 3", metrics={"followers": 5})
+
+        assert suggest(Dataset, "air", size=2) == [most_followed, followed]
+        assert suggest(Dataset, "air") == [most_followed, followed, less_followed]
+
+    @pytest.mark.options(SUGGEST_PREFIX_MAX_LENGTH=4)
+    def test_long_words(self):
+        dataset = DatasetFactory(title="transports")
+        DatasetFactory(title="transactions")
+
+        assert len(suggest(Dataset, "tran")) == 2
+        assert suggest(Dataset, "transp") == [dataset]
+        assert suggest(Dataset, "transports") == [dataset]
+
+    def test_index_model_refreshes_scores(self):
+        dataset = DatasetFactory(title="air", metrics={"followers": 1})
+        # Metrics updates don't trigger a reindexation
+        dataset.metrics["followers"] = 10
+        dataset.save(signal_kwargs={"ignores": ["post_save"]})
+        Dataset.objects(id=DatasetFactory(title="air stale").id).update(set__private=True)
+
+        assert index_model(Dataset) == 1
+
+        [entry] = SuggestEntry.objects(classname="Dataset")
+        assert entry.object_id == str(dataset.id)
+        assert entry.score == 10
@@ -64,6 +64,29 @@ class TagsTests:
             assert tag.counts["datasets"] == count
             assert tag.counts["reuses"] == count
 
+    def test_count_zeroes_unused_tags(self):
+        dataset = DatasetFactory(tags=["kept", "removed"])
+        count_tags.run()
+
+        dataset.tags = ["kept"]
+        dataset.save()
+        count_tags.run()
+
+        assert Tag.objects.get(name="kept").total == 1
+        removed = Tag.objects.get(name="removed")
+        assert removed.total == 0
+        assert removed.counts == {"datasets": 0, "reuses": 0}
+
+    def test_top(self):
+        Tag.objects.create(name="test", counts={"datasets": 15})
+        Tag.objects.create(name="test-more", counts={"datasets": 20})
+        Tag.objects.create(name="test-unused", counts={"datasets": 0})
+        Tag.objects.create(name="other", counts={"reuses": 30})
+
+        assert [tag.name for tag in Tag.objects.top()] == ["other", "test-more", "test"]
+        assert [tag.name for tag in Tag.objects.top(1)] == ["other"]
+        assert [tag.name for tag in Tag.objects.top(prefix="tes")] == ["test-more", "test"]
+
 
 class TagsUtilsTest(PytestOnlyTestCase):
     def test_tags_list(self):
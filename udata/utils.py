@@ -3,7 +3,9 @@ import itertools
 import logging
 import math
 import re
-from collections import Counter
+import threading
+import time
+from collections import Counter, OrderedDict
 from collections.abc import Hashable, Iterable
 from datetime import UTC, date, datetime, timedelta
 from importlib.metadata import version
@@ -73,12 +75,11 @@ def get_field_value_from_path(document, field_path: str):
 
 def filter_changed_fields(document, previous, changed_fields: list[str]):
     # Make sure that changed fields have actually changed.
-    # We compare the document values once it has been reloaded.
-    # It may have been cleaned or normalized when saved to mongo.
+    # We compare the document values as saved: it may have been cleaned or normalized
+    # when saved to mongo, so `document` must hold the values a reload would give.
     # We compare the field values one by one with the previous value stored in _previous_changed_fields.
     # We also ignore reordering in the case of list, ex tags or contact points.
     # See https://github.com/opendatateam/udata/pull/3412 for more context.
-    document.reload()
     filtered_changed_fields = []
     for field in changed_fields:
         # Sometimes, we nullify a field in the clean method (for exemple the `license` when we change
@@ -166,6 +167,48 @@ class Paginable(object):
                 last = num
 
 
+class LocalCache(object):
+    """
+    A thread-safe in-process LRU cache whose entries expire after `ttl` seconds.
+
+    Entries can't be invalidated from other processes: keep `ttl` short
+    and use it in front of a shared cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
 class Paginator(Paginable):
     """A simple paginable implementation"""
 
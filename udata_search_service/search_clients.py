@@ -1,9 +1,10 @@
 import logging
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import NotFoundError
+from elasticsearch.helpers import streaming_bulk
 from elasticsearch_dsl import (
     Date,
     Document,
@@ -30,6 +31,10 @@ from udata_search_service.entities import (
 
 log = logging.getLogger(__name__)
 
+# Default bounds of a single `_bulk` request
+BULK_CHUNK_SIZE = 500
+BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+
 SEARCH_SYNONYMS = [
     "AMD, administrateur ministériel des données, AMDAC",
     "lolf, loi de finance",
@@ -268,6 +273,13 @@ def configure_indices(prefix):
             cls._index._name = cls.Index.name
 
 
+def with_organization_id(to_index) -> dict:
+    data = to_index.to_dict()
+    if data.get("organization") and data.get("organization_name"):
+        data["organization_with_id"] = f"{data['organization']}|{data['organization_name']}"
+    return data
+
+
 class ElasticClient:
     def __init__(self, url: str, prefix: str):
         self.es = connections.create_connection(hosts=[url])
@@ -293,34 +305,73 @@ class ElasticClient:
     def delete_index(self, index_document: IndexDocument):
         index_document.delete_indices(self.es)
 
+    def build_organization_document(self, to_index: Organization) -> SearchableOrganization:
+        return SearchableOrganization(meta={"id": to_index.id}, **to_index.to_dict())
+
+    def build_dataset_document(self, to_index: Dataset) -> SearchableDataset:
+        return SearchableDataset(meta={"id": to_index.id}, **with_organization_id(to_index))
+
+    def build_reuse_document(self, to_index: Reuse) -> SearchableReuse:
+        return SearchableReuse(meta={"id": to_index.id}, **with_organization_id(to_index))
+
+    def build_dataservice_document(self, to_index: Dataservice) -> SearchableDataservice:
+        return SearchableDataservice(meta={"id": to_index.id}, **with_organization_id(to_index))
+
+    def build_topic_document(self, to_index: Topic) -> SearchableTopic:
+        return SearchableTopic(meta={"id": to_index.id}, **with_organization_id(to_index))
+
+    def build_discussion_document(self, to_index: Discussion) -> SearchableDiscussion:
+        return SearchableDiscussion(meta={"id": to_index.id}, **to_index.to_dict())
+
+    def build_post_document(self, to_index: Post) -> SearchablePost:
+        return SearchablePost(meta={"id": to_index.id}, **to_index.to_dict())
+
     def index_organization(self, to_index: Organization, index: str = None) -> None:
-        SearchableOrganization(meta={"id": to_index.id}, **to_index.to_dict()).save(
-            skip_empty=False, index=index
-        )
+        self.build_organization_document(to_index).save(skip_empty=False, index=index)
 
     def index_dataset(self, to_index: Dataset, index: str = None) -> None:
-        data = to_index.to_dict()
-        if data.get("organization") and data.get("organization_name"):
-            data["organization_with_id"] = f"{data['organization']}|{data['organization_name']}"
-        SearchableDataset(meta={"id": to_index.id}, **data).save(skip_empty=False, index=index)
+        self.build_dataset_document(to_index).save(skip_empty=False, index=index)
 
     def index_reuse(self, to_index: Reuse, index: str = None) -> None:
-        data = to_index.to_dict()
-        if data.get("organization") and data.get("organization_name"):
-            data["organization_with_id"] = f"{data['organization']}|{data['organization_name']}"
-        SearchableReuse(meta={"id": to_index.id}, **data).save(skip_empty=False, index=index)
+        self.build_reuse_document(to_index).save(skip_empty=False, index=index)
 
     def index_dataservice(self, to_index: Dataservice, index: str = None) -> None:
-        data = to_index.to_dict()
-        if data.get("organization") and data.get("organization_name"):
-            data["organization_with_id"] = f"{data['organization']}|{data['organization_name']}"
-        SearchableDataservice(meta={"id": to_index.id}, **data).save(skip_empty=False, index=index)
+        self.build_dataservice_document(to_index).save(skip_empty=False, index=index)
 
     def index_topic(self, to_index: Topic, index: str = None) -> None:
-        data = to_index.to_dict()
-        if data.get("organization") and data.get("organization_name"):
-            data["organization_with_id"] = f"{data['organization']}|{data['organization_name']}"
-        SearchableTopic(meta={"id": to_index.id}, **data).save(skip_empty=False, index=index)
+        self.build_topic_document(to_index).save(skip_empty=False, index=index)
+
+    def bulk_index(
+        self,
+        documents: Iterable[IndexDocument],
+        index: str = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        max_chunk_bytes: int = BULK_MAX_CHUNK_BYTES,
+    ) -> Iterator[Tuple[bool, dict]]:
+        """
+        Stream documents to Elasticsearch through the `_bulk` API.
+
+        Documents are sent in batches bounded both by `chunk_size` documents
+        and by `max_chunk_bytes` bytes of payload.
+        Yields an `(ok, item)` tuple per document, in order, so that callers
+        can report per-item failures without aborting the whole indexation.
+        """
+
+        def actions():
+            for document in documents:
+                action = document.to_dict(include_meta=True, skip_empty=False)
+                if index:
+                    action["_index"] = index
+                yield action
+
+        yield from streaming_bulk(
+            self.es,
+            actions(),
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            raise_on_error=False,
+            raise_on_exception=False,
+        )
 
     def query_organizations(
         self,
@@ -1677,9 +1728,7 @@ class ElasticClient:
             return None
 
     def index_discussion(self, to_index: Discussion, index: str = None) -> None:
-        SearchableDiscussion(meta={"id": to_index.id}, **to_index.to_dict()).save(
-            skip_empty=False, index=index
-        )
+        self.build_discussion_document(to_index).save(skip_empty=False, index=index)
 
     def query_discussions(
         self,
@@ -1788,9 +1837,7 @@ class ElasticClient:
             return None
 
     def index_post(self, to_index: Post, index: str = None) -> None:
-        SearchablePost(meta={"id": to_index.id}, **to_index.to_dict()).save(
-            skip_empty=False, index=index
-        )
+        self.build_post_document(to_index).save(skip_empty=False, index=index)
 
     def query_posts(
         self,
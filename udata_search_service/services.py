@@ -1,5 +1,5 @@
 from math import ceil
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from udata_search_service.entities import (
     Dataservice,
@@ -11,7 +11,11 @@ from udata_search_service.entities import (
     Reuse,
     Topic,
 )
-from udata_search_service.search_clients import ElasticClient
+from udata_search_service.search_clients import (
+    BULK_CHUNK_SIZE,
+    BULK_MAX_CHUNK_BYTES,
+    ElasticClient,
+)
 
 
 class BaseService:
@@ -26,6 +30,7 @@ class BaseService:
     def __init__(self, search_client: ElasticClient):
         self.search_client = search_client
         self._client_index = getattr(search_client, f"index_{self.entity_name}")
+        self._client_build_document = getattr(search_client, f"build_{self.entity_name}_document")
         self._client_query = getattr(search_client, f"query_{self.entity_name}s")
         self._client_find_one = getattr(search_client, f"find_one_{self.entity_name}")
         self._client_delete_one = getattr(search_client, f"delete_one_{self.entity_name}")
@@ -33,6 +38,23 @@ class BaseService:
     def feed(self, entity: EntityBase, index: str = None) -> None:
         self._client_index(entity, index)
 
+    def feed_bulk(
+        self,
+        entities: Iterable[EntityBase],
+        index: str = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        max_chunk_bytes: int = BULK_MAX_CHUNK_BYTES,
+    ) -> Iterator[Tuple[bool, dict]]:
+        """
+        Index entities in `_bulk` batches.
+
+        Entities are consumed lazily and a `(ok, item)` result is yielded for each one.
+        """
+        documents = (self._client_build_document(entity) for entity in entities)
+        return self.search_client.bulk_index(
+            documents, index=index, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes
+        )
+
     def search(self, filters: dict) -> Tuple[List[EntityBase], int, int, dict]:
         page = filters.pop("page")
         page_size = filters.pop("page_size")